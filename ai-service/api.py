@@ -1,16 +1,39 @@
 """
 FLUX Image Generation API
 RunPod üzerinde çalışır, Node.js backend'den çağrılır
+
+Hızlı açılış: torch/diffusers/boto3 modül seviyesinde import edilmez.
+Server hemen dinlemeye başlar, model arka planda yüklenir
+(FLUX_STARTUP_MODE=blocking ile eski davranış). Hazır olmadan gelen
+istekler zamanlayıcı kuyruğunda model yüklenene kadar bekler.
 """
+import time
+_IMPORT_START = time.time()
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional
-import torch
-import time
+from typing import Optional, List
+import gc
+import asyncio
 import os
-import boto3
-from botocore.config import Config
+import sys
+import threading
+
+import scheduler
+import postprocess
+import result_cache
+from model_manager import ModelManager, find_local_snapshot
+from batching import MAX_BATCH_SIZE
+
+# Proje artifact deposu (Video API ile ortak modül, monorepo'da yt-video/ altında)
+sys.path.insert(0, os.getenv("YT_VIDEO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yt-video")))
+try:
+    import project_store
+except ImportError:
+    project_store = None
+    print("⚠️ project_store bulunamadı, manifest tutulmayacak (YT_VIDEO_DIR ayarlayın)")
 
 app = FastAPI(title="FLUX API", version="1.0.0")
 
@@ -22,9 +45,10 @@ app.add_middleware(
 )
 
 # ============ Config ============
+MODEL_ID = "black-forest-labs/FLUX.1-schnell"
 MODELS_DIR = os.getenv("MODELS_DIR", "/app/models")
 OUTPUTS_DIR = os.getenv("OUTPUTS_DIR", "/app/outputs")
-PROJECTS_DIR = "/tmp/projects"  # Video API ile paylaşımlı dizin
+PROJECTS_DIR = os.getenv("PROJECTS_DIR", "/tmp/projects")  # Video API ile paylaşımlı dizin
 
 # R2 CDN Config (env'den)
 R2_ENDPOINT = os.getenv("R2_ENDPOINT", "")
@@ -33,39 +57,52 @@ R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY", "")
 R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "ai-voice")
 R2_PUBLIC_URL = os.getenv("R2_PUBLIC_URL", "https://voicy.site")
 
+STARTUP_MODE = os.getenv("FLUX_STARTUP_MODE", "background")  # background / blocking
+STARTUP_RETRY_MAX_SEC = int(os.getenv("FLUX_STARTUP_RETRY_MAX_SEC", "300"))  # Açılış yüklemesi tekrar denemesi üst sınırı
+
 
-# ============ Global Model State ============
-flux_pipe = None
+_s3_client = None
+_s3_lock = threading.Lock()
 
 
 # ============ R2 Upload ============
 def get_s3_client():
-    return boto3.client(
-        's3',
-        endpoint_url=R2_ENDPOINT,
-        aws_access_key_id=R2_ACCESS_KEY_ID,
-        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-        config=Config(signature_version='s3v4'),
-        region_name='auto'
+    """Paylaşılan S3 client - son işlem worker'ları aynı bağlantı havuzunu kullanır"""
+    global _s3_client
+    if _s3_client is None:
+        with _s3_lock:
+            if _s3_client is None:
+                import boto3
+                from botocore.config import Config
+                _s3_client = boto3.client(
+                    's3',
+                    endpoint_url=R2_ENDPOINT,
+                    aws_access_key_id=R2_ACCESS_KEY_ID,
+                    aws_secret_access_key=R2_SECRET_ACCESS_KEY,
+                    config=Config(signature_version='s3v4', max_pool_connections=postprocess.POSTPROCESS_WORKERS * 2),
+                    region_name='auto'
+                )
+    return _s3_client
+
+
+def upload_to_r2(data: bytes, key: str, content_type: str = "image/png") -> str:
+    """Bellekteki resmi R2'ye yükle, CDN URL döndür"""
+    print(f"☁️ R2'ye yükleniyor: {key} ({len(data) / 1024:.0f}KB)")
+    get_s3_client().put_object(
+        Bucket=R2_BUCKET_NAME,
+        Key=key,
+        Body=data,
+        ContentType=content_type
     )
-
-
-def upload_to_r2(filepath: str, key: str, content_type: str = "image/png") -> str:
-    """Dosyayı R2'ye yükle, CDN URL döndür"""
-    print(f"☁️ R2'ye yükleniyor: {key}")
-    client = get_s3_client()
-    with open(filepath, 'rb') as f:
-        client.put_object(
-            Bucket=R2_BUCKET_NAME,
-            Key=key,
-            Body=f,
-            ContentType=content_type
-        )
     url = f"{R2_PUBLIC_URL}/{key}"
     print(f"✅ R2 URL: {url}")
     return url
 
 
+if R2_ENDPOINT:
+    result_cache.set_remote(get_s3_client, R2_BUCKET_NAME, R2_PUBLIC_URL)
+
+
 # ============ Request/Response Models ============
 class ImageRequest(BaseModel):
     prompt: str
@@ -76,6 +113,8 @@ class ImageRequest(BaseModel):
     upload_to_cdn: bool = True
     project_id: Optional[str] = None
     scene_number: Optional[int] = None
+    image_format: Optional[str] = None  # png / webp / jpeg (varsayılan IMAGE_FORMAT)
+    quality: Optional[int] = None  # WebP/JPEG kalitesi (varsayılan IMAGE_QUALITY)
 
 
 class ImageResponse(BaseModel):
@@ -84,85 +123,407 @@ class ImageResponse(BaseModel):
     local_path: Optional[str] = None
     filename: Optional[str] = None
     generation_time: Optional[float] = None
+    seed: Optional[int] = None
+    batch_size: Optional[int] = None
+    cached: bool = False  # Sonuç cache'ten geldi (üretim yapılmadı)
+    error: Optional[str] = None
+
+
+class ImagesRequest(BaseModel):
+    items: List[ImageRequest]
+
+
+class ImagesResponse(BaseModel):
+    success: bool
+    results: List[ImageResponse] = []
+    batches: int = 0
+    total_time: Optional[float] = None
+    images_per_minute: Optional[float] = None
     error: Optional[str] = None
 
 
 # ============ Model Loading ============
+def _load_flux_pipeline(phase):
+    """FLUX pipeline'ı fazlar halinde yükle (ModelManager loader'ı)"""
+    with phase("resolve"):
+        # MODELS_DIR'de snapshot varsa hub'a gitmeden path'ten yüklenir
+        snapshot = find_local_snapshot(MODELS_DIR, MODEL_ID)
+        print(f"   📂 {snapshot or 'snapshot yok, hub üzerinden: ' + MODEL_ID}")
+
+    with phase("import_torch"):
+        import torch
+
+    with phase("import_diffusers"):
+        from diffusers import FluxPipeline
+
+    with phase("from_pretrained"):
+        # safetensors + low_cpu_mem_usage: rastgele init atlanır, ağırlıklar doğrudan yerine yüklenir
+        pipe = FluxPipeline.from_pretrained(
+            snapshot or MODEL_ID,
+            torch_dtype=torch.bfloat16,
+            cache_dir=MODELS_DIR,
+            token=os.getenv("HF_TOKEN"),
+            use_safetensors=True,
+            low_cpu_mem_usage=True,
+            local_files_only=snapshot is not None
+        )
+
+    # GPU VRAM kontrolü
+    with phase("device"):
+        if torch.cuda.is_available():
+            vram_gb = torch.cuda.get_device_properties(0).total_memory / (1024**3)
+            if vram_gb >= 40:
+                pipe.to("cuda")
+                print(f"⚡ FLUX direkt GPU ({vram_gb:.0f}GB VRAM)")
+            else:
+                pipe.enable_model_cpu_offload()
+                print(f"🔄 FLUX CPU offload ({vram_gb:.0f}GB VRAM)")
+        else:
+            print("⚠️ GPU yok, CPU modunda")
+
+    return pipe
+
+
+def _unload_flux_pipeline(pipe):
+    """VRAM'i hemen geri ver"""
+    del pipe
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+flux_model = ModelManager("flux", _load_flux_pipeline, _unload_flux_pipeline)
+
+
 def load_flux():
-    """FLUX modelini yükle (lazy loading - ilk istekte)"""
-    global flux_pipe
+    """FLUX modelini döndür (yüklü değilse yükle - unload sonrası ilk istekte tekrar yüklenir)"""
+    return flux_model.get()
+
+
+def make_generator(seed: int):
+    """Seed'li generator (zamanlayıcı her resim için ayrı generator verir)"""
+    import torch
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return torch.Generator(device).manual_seed(seed)
+
+
+# ============ Kaydetme / Upload ============
+def result_key(req: ImageRequest) -> str:
+    """Sonuç cache anahtarı (seed yoksa None) - çıktı formatı/kalitesi dahil"""
+    _, ext, _ = postprocess.image_format(req.image_format)
+    if ext == ".png":
+        quality = postprocess.PNG_COMPRESS_LEVEL
+    else:
+        quality = req.quality or postprocess.IMAGE_QUALITY
+    return result_cache.cache_key(req, MODEL_ID, ext, quality)
+
+
+def deliver_image(req: ImageRequest, data: bytes, ext: str, content_type: str, seed: int = None) -> tuple:
+    """
+    Encode edilmiş resmi CDN'e buffer'dan yükle (diske yazmadan) veya
+    proje dizinine/outputs'a yaz.
 
-    if flux_pipe is not None:
-        return flux_pipe
+    Returns:
+        (filename, cdn_url, local_path)
+    """
+    # Dosya adı
+    timestamp = int(time.time())
+    unique_id = f"{timestamp}_{os.urandom(3).hex()}"
 
-    print("🚀 FLUX modeli yükleniyor...")
-    start = time.time()
+    if req.project_id and req.scene_number is not None:
+        filename = f"{req.project_id}_scene_{str(req.scene_number).zfill(3)}_{unique_id}{ext}"
+    else:
+        filename = f"img_{unique_id}{ext}"
 
-    from diffusers import FluxPipeline
+    if req.upload_to_cdn and R2_ENDPOINT:
+        return filename, upload_to_r2(data, f"images/{filename}", content_type), None
 
-    flux_pipe = FluxPipeline.from_pretrained(
-        "black-forest-labs/FLUX.1-schnell",
-        torch_dtype=torch.bfloat16,
-        cache_dir=MODELS_DIR,
-        token=os.getenv("HF_TOKEN")
+    # Proje dizinine (video API ile paylaşımlı) veya outputs'a kaydet
+    if req.project_id and not req.upload_to_cdn:
+        save_dir = os.path.join(PROJECTS_DIR, str(req.project_id))
+    else:
+        save_dir = OUTPUTS_DIR
+    os.makedirs(save_dir, exist_ok=True)
+
+    filepath = os.path.join(save_dir, filename)
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+    # Video API resmi manifest'ten lokal olarak çözer, toplu upload'ta da manifest'ten yükler
+    if project_store and req.project_id:
+        try:
+            project_store.register(req.project_id, "image", filepath, req.scene_number,
+                                   prompt=req.prompt[:200], seed=seed)
+        except Exception as e:
+            print(f"⚠️ Manifest güncellenemedi: {e}")
+
+    return filename, f"local://{filepath}", filepath
+
+
+def save_image(req: ImageRequest, image, generation_time: float, seed: int = None, batch_size: int = None) -> ImageResponse:
+    """
+    Üretilen resmi bellekte encode et, CDN'e yükle veya proje dizinine yaz.
+    Seed'li istekler sonuç cache'ine eklenir.
+    Son işlem havuzunda çalışır (inference thread'ini bekletmez).
+    """
+    # Encode (format/kalite istekten, yoksa env varsayılanı)
+    encode_start = time.time()
+    data, ext, content_type = postprocess.encode_image(image, req.image_format, req.quality)
+    encode_time = time.time() - encode_start
+
+    filename, cdn_url, local_path = deliver_image(req, data, ext, content_type, seed)
+    result_cache.store(result_key(req), data, ext, content_type, cdn_url=None if local_path else cdn_url)
+
+    print(f"✅ Resim üretildi: {filename} ({generation_time}s, encode {encode_time:.2f}s, {len(data) / 1024:.0f}KB)")
+    print(f"🔗 CDN: {cdn_url}\n")
+
+    return ImageResponse(
+        success=True,
+        cdn_url=cdn_url,
+        local_path=local_path,
+        filename=filename,
+        generation_time=generation_time,
+        seed=seed,
+        batch_size=batch_size
     )
 
-    # GPU VRAM kontrolü
-    if torch.cuda.is_available():
-        vram_gb = torch.cuda.get_device_properties(0).total_memory / (1024**3)
-        if vram_gb >= 40:
-            flux_pipe.to("cuda")
-            print(f"⚡ FLUX direkt GPU ({vram_gb:.0f}GB VRAM)")
-        else:
-            flux_pipe.enable_model_cpu_offload()
-            print(f"🔄 FLUX CPU offload ({vram_gb:.0f}GB VRAM)")
+
+def serve_cached(req: ImageRequest) -> ImageResponse:
+    """
+    Aynı istek (prompt + seed + boyut + steps + format) daha önce üretildiyse
+    sonucu üretim yapmadan döndür. CDN isteniyorsa önceki URL aynen kullanılır;
+    lokal isteniyorsa cache'teki baytlar proje dizinine yazılır. Yoksa None.
+    """
+    key = result_key(req)
+    _, ext, content_type = postprocess.image_format(req.image_format)
+    entry = result_cache.lookup(key, ext)
+    if not entry:
+        return None
+
+    if req.upload_to_cdn and R2_ENDPOINT and entry["cdn_url"]:
+        filename, cdn_url, local_path = os.path.basename(entry["cdn_url"]), entry["cdn_url"], None
     else:
-        print("⚠️ GPU yok, CPU modunda")
+        data = result_cache.read(key, entry)
+        filename, cdn_url, local_path = deliver_image(req, data, ext, content_type, req.seed)
+        if local_path is None and not entry["cdn_url"]:
+            # İlk üretim lokaldi, şimdi yüklendi - sonraki hit'ler URL'i kullansın
+            result_cache.store(key, data, ext, content_type, cdn_url=cdn_url)
+
+    print(f"♻️ Cache'ten döndü: {filename}")
+    return ImageResponse(
+        success=True,
+        cdn_url=cdn_url,
+        local_path=local_path,
+        filename=filename,
+        generation_time=0.0,
+        seed=req.seed,
+        cached=True
+    )
 
-    elapsed = time.time() - start
-    print(f"✅ FLUX hazır! ({elapsed:.1f}s)")
-    return flux_pipe
 
+# ============ Startup ============
+def _process_start_time() -> float:
+    """Process'in başladığı an (interpreter açılışı dahil), /proc yoksa modül import anı"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return _IMPORT_START
+
+
+_startup = {
+    "mode": STARTUP_MODE,
+    "process_start": _process_start_time(),
+    "phase": "starting",  # starting / loading / warmup / ready / retrying
+    "marks": {"api_imported": time.time()},
+    "error": None,
+    "attempts": 0
+}
+_ready = threading.Event()
+
+
+def _mark(name: str):
+    """Açılış zaman damgası (process başlangıcından itibaren saniye)"""
+    _startup["marks"][name] = time.time()
+    print(f"⏱️ {name}: {time.time() - _startup['process_start']:.2f}s")
+
+
+def get_startup_info() -> dict:
+    """Açılış fazı, zaman çizelgesi ve model yükleme fazları"""
+    t0 = _startup["process_start"]
+    return {
+        "mode": _startup["mode"],
+        "phase": _startup["phase"],
+        "ready": _ready.is_set(),
+        "error": _startup["error"],
+        "attempts": _startup["attempts"],
+        "timeline": {name: round(at - t0, 3) for name, at in _startup["marks"].items()},
+        "model_phases": flux_model.phases
+    }
 
-# ============ Startup Warmup ============
-@app.on_event("startup")
-async def warmup():
-    """API başlayınca modeli yükle ve test resmi üret"""
-    print("\n🔥 WARMUP başlıyor...")
+
+def _background_load() -> bool:
+    """Model yükle + warmup resmi (inference thread'i üzerinden), sonra hazır işaretle"""
+    _startup["attempts"] += 1
     try:
-        pipe = load_flux()
+        _startup["phase"] = "loading"
+        load_flux()
+        _mark("model_loaded")
+
+        # Warmup da zamanlayıcıdan geçer - aynı anda gelen isteklerle pipe'ı paylaşmaz
+        _startup["phase"] = "warmup"
         print("🎨 Warmup resmi üretiliyor...")
         start = time.time()
-        image = pipe("test warmup", num_inference_steps=1, width=256, height=256).images[0]
+        warm = ImageRequest(prompt="test warmup", num_inference_steps=1, width=256, height=256, seed=0)
+        scheduler.submit(warm).result()
         print(f"✅ Warmup tamamlandı! ({time.time() - start:.1f}s)")
-        del image
-        torch.cuda.empty_cache()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        _mark("warmup_done")
+
+        _startup["phase"] = "ready"
+        _startup["error"] = None
+        _ready.set()
+        _mark("ready")
+        return True
     except Exception as e:
-        print(f"⚠️ Warmup hatası (devam ediliyor): {e}")
+        _startup["phase"] = "retrying"
+        _startup["error"] = str(e)
+        print(f"⚠️ Açılış yüklemesi hatası (deneme {_startup['attempts']}): {e}")
+        return False
+
+
+def _load_until_ready(delay: float = 5):
+    """
+    Açılış yüklemesini başarana kadar artan beklemeyle tekrarla. Arada bir istek
+    modeli tembel yüklediyse sonraki deneme hemen warmup'a geçer ve hazır işaretler -
+    /health/ready tek bir geçici hata yüzünden sonsuza kadar 503 kalmaz.
+    """
+    while not _background_load():
+        time.sleep(delay)
+        delay = min(delay * 2, STARTUP_RETRY_MAX_SEC)
+
+
+@app.on_event("startup")
+async def warmup():
+    """Zamanlayıcıyı başlat, modeli arka planda (veya blocking modda hemen) yükle"""
+    _mark("server_starting")
+    # Tüm üretimler tek inference thread'inden geçer (açılış yüklemesi hata verse de model ilk batch'te yüklenir)
+    scheduler.start(load_flux, make_generator)
+    # Boşta kalınca / bellek azalınca unload (MODEL_IDLE_UNLOAD_SEC, MODEL_MIN_FREE_MB)
+    flux_model.start_watchdog(is_busy=lambda: scheduler.get_scheduler_stats()["busy"])
+
+    print(f"\n🔥 WARMUP başlıyor ({STARTUP_MODE})...")
+    if STARTUP_MODE == "blocking" and await asyncio.to_thread(_background_load):
+        return
+    # background modu (veya blocking modda ilk deneme hata verdiyse) - tekrar denemeler arka planda
+    threading.Thread(target=_load_until_ready, name="flux-loader", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    scheduler.stop()
 
 
 # ============ Endpoints ============
 @app.get("/")
 async def root():
-    gpu_name = torch.cuda.get_device_name(0) if torch.cuda.is_available() else "N/A"
-    vram = round(torch.cuda.get_device_properties(0).total_memory / (1024**3), 1) if torch.cuda.is_available() else 0
+    # torch henüz yüklenmediyse import edilmez (event loop bloklanmasın)
+    torch = sys.modules.get("torch")
+    cuda = torch is not None and torch.cuda.is_available()
+    gpu_name = torch.cuda.get_device_name(0) if cuda else "N/A"
+    vram = round(torch.cuda.get_device_properties(0).total_memory / (1024**3), 1) if cuda else 0
     return {
         "service": "FLUX API",
         "version": "1.0.0",
         "gpu": gpu_name,
         "vram_gb": vram,
-        "flux_loaded": flux_pipe is not None,
+        "flux_loaded": flux_model.is_loaded,
+        "ready": _ready.is_set(),
     }
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "gpu": torch.cuda.is_available(), "flux_loaded": flux_pipe is not None}
+    """Liveness: process ayakta (model yüklenirken de 200). Hazırlık için ready alanı veya /health/ready"""
+    torch = sys.modules.get("torch")
+    return {
+        "status": "ok",
+        "ready": _ready.is_set(),
+        "startup_phase": _startup["phase"],
+        "gpu": torch.cuda.is_available() if torch is not None else None,
+        "flux_loaded": flux_model.is_loaded,
+        "model": flux_model.state,
+        "scheduler": scheduler.get_scheduler_stats()
+    }
+
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness - sadece process'in cevap verdiğini gösterir"""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness - model yüklenip warmup bitene kadar 503"""
+    info = get_startup_info()
+    return JSONResponse(status_code=200 if info["ready"] else 503, content=info)
+
+
+@app.get("/startup")
+async def startup_info():
+    """Açılış zaman çizelgesi: import, bind, model fazları, warmup, ready"""
+    return get_startup_info()
+
+
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    """Batch zamanlayıcı metrikleri: kuyruk derinliği, batch boyutu, bekleme süresi"""
+    return scheduler.get_scheduler_stats()
+
+
+@app.get("/model/status")
+async def model_status():
+    """Model durumu, yükleme fazları ve süreleri"""
+    return flux_model.status()
+
+
+@app.post("/model/reload")
+async def model_reload():
+    """Modeli yeniden yükle (bu sırada gelen istekler kuyrukta bekler)"""
+    try:
+        await asyncio.to_thread(flux_model.reload)
+        return {"success": True, **flux_model.status()}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@app.post("/model/unload")
+async def model_unload():
+    """Modeli bellekten çıkar - sonraki istek tekrar yükler (yükleme sürüyorsa atlanır)"""
+    unloaded = await asyncio.to_thread(flux_model.unload, "manual")
+    return {"success": True, "unloaded": unloaded, **flux_model.status()}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Sonuç cache'i: hit/miss, disk kullanımı"""
+    return result_cache.get_cache_stats()
 
 
 @app.post("/generate-image", response_model=ImageResponse)
 async def generate_image(req: ImageRequest):
-    """FLUX ile resim üret ve CDN'e yükle"""
+    """
+    FLUX ile resim üret ve CDN'e yükle.
+    İstek zamanlayıcıya girer; aynı anda gelen aynı boyut/steps'li
+    isteklerle birlikte tek pipe() çağrısında üretilebilir.
+    """
     try:
         print(f"\n🎨 ========== RESIM ÜRETİMİ ==========")
         print(f"📝 Prompt: {req.prompt[:80]}...")
@@ -170,70 +531,87 @@ async def generate_image(req: ImageRequest):
         print(f"🔄 Steps: {req.num_inference_steps}")
         if req.project_id:
             print(f"📁 Proje: {req.project_id}, Sahne: {req.scene_number}")
+        postprocess.image_format(req.image_format)  # Geçersiz format GPU'ya girmeden reddedilsin
 
-        pipe = load_flux()
+        # Aynı istek (seed'li) daha önce üretildiyse üretim yapılmaz
+        cached = await asyncio.wrap_future(postprocess.submit(serve_cached, req))
+        if cached:
+            return cached
 
-        # Seed
-        generator = None
-        if req.seed is not None:
-            generator = torch.Generator("cuda").manual_seed(req.seed)
+        # Resim üret (inference thread'inde - event loop bloklanmaz)
+        result = await asyncio.wrap_future(scheduler.submit(req))
+        if result["batch_size"] > 1:
+            print(f"🧩 Batch #{result['batch_id']}: {result['batch_size']} resim, kuyrukta {result['wait_time']}s")
 
-        # Resim üret
-        start = time.time()
-        image = pipe(
-            req.prompt,
-            num_inference_steps=req.num_inference_steps,
-            width=req.width,
-            height=req.height,
-            generator=generator
-        ).images[0]
-        generation_time = round(time.time() - start, 2)
-
-        # Dosya adı
-        timestamp = int(time.time())
-        unique_id = f"{timestamp}_{os.urandom(3).hex()}"
-
-        if req.project_id and req.scene_number is not None:
-            filename = f"{req.project_id}_scene_{str(req.scene_number).zfill(3)}_{unique_id}.png"
-        else:
-            filename = f"img_{unique_id}.png"
+        # Encode + upload son işlem havuzunda
+        return await asyncio.wrap_future(postprocess.submit(
+            save_image, req, result["image"], result["generation_time"],
+            seed=result["seed"], batch_size=result["batch_size"]
+        ))
 
-        # Kaydet - proje dizinine veya outputs'a
-        if req.project_id and not req.upload_to_cdn:
-            # Proje dizinine kaydet (video API ile paylaşımlı)
-            save_dir = os.path.join(PROJECTS_DIR, str(req.project_id))
-            os.makedirs(save_dir, exist_ok=True)
-        else:
-            save_dir = OUTPUTS_DIR
-            os.makedirs(save_dir, exist_ok=True)
-
-        filepath = os.path.join(save_dir, filename)
-        image.save(filepath, "PNG")
-
-        # CDN'e yükle veya lokal path döndür
-        cdn_url = None
-        local_path = None
-        if req.upload_to_cdn and R2_ENDPOINT:
-            key = f"images/{filename}"
-            cdn_url = upload_to_r2(filepath, key, "image/png")
-            os.remove(filepath)  # CDN'e yüklendi, sil
-        else:
-            local_path = filepath
-            cdn_url = f"local://{filepath}"
-
-        print(f"✅ Resim üretildi: {filename} ({generation_time}s)")
-        print(f"🔗 CDN: {cdn_url}\n")
-
-        return ImageResponse(
-            success=True,
-            cdn_url=cdn_url,
-            local_path=local_path,
-            filename=filename,
-            generation_time=generation_time
+    except Exception as e:
+        print(f"❌ Hata: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return ImageResponse(success=False, error=str(e))
+
+
+@app.post("/generate-images", response_model=ImagesResponse)
+async def generate_images(req: ImagesRequest):
+    """
+    Birden fazla resmi toplu üret. Tüm istekler zamanlayıcıya aynı anda girer;
+    aynı boyut/steps'liler FLUX_MAX_BATCH'lik micro-batch'ler halinde tek
+    pipe() çağrısıyla üretilir. Sonuçlar istek sırasıyla döner.
+    """
+    if not req.items:
+        return ImagesResponse(success=False, error="items boş")
+
+    try:
+        print(f"\n🎨 ========== TOPLU RESIM ÜRETİMİ ==========")
+        print(f"📦 İstek sayısı: {len(req.items)} (batch üst sınırı: {MAX_BATCH_SIZE})")
+
+        for item in req.items:
+            postprocess.image_format(item.image_format)
+
+        start = time.time()
+        batch_ids = set()
+
+        async def produce(item):
+            cached = await asyncio.wrap_future(postprocess.submit(serve_cached, item))
+            if cached:
+                return cached
+            # Her resim biter bitmez son işleme girer; diğer batch'ler GPU'da devam eder
+            out = await asyncio.wrap_future(scheduler.submit(item))
+            batch_ids.add(out["batch_id"])
+            return await asyncio.wrap_future(postprocess.submit(
+                save_image, item, out["image"], out["generation_time"],
+                seed=out["seed"], batch_size=out["batch_size"]
+            ))
+
+        outputs = await asyncio.gather(*[produce(item) for item in req.items], return_exceptions=True)
+
+        results = []
+        for out in outputs:
+            if isinstance(out, Exception):
+                print(f"❌ Üretim hatası: {str(out)}")
+                results.append(ImageResponse(success=False, error=str(out)))
+            else:
+                results.append(out)
+
+        total_time = round(time.time() - start, 2)
+        generated = sum(1 for r in results if r.success)
+        print(f"✅ Toplu üretim: {generated}/{len(results)} resim, {len(batch_ids)} batch, {total_time}s\n")
+
+        return ImagesResponse(
+            success=generated > 0,
+            results=results,
+            batches=len(batch_ids),
+            total_time=total_time,
+            images_per_minute=round(generated / total_time * 60, 1) if total_time > 0 else None
         )
 
     except Exception as e:
         print(f"❌ Hata: {str(e)}")
         import traceback
         traceback.print_exc()
-        return ImageResponse(success=False, error=str(e))
+        return ImagesResponse(success=False, error=str(e))
@@ -0,0 +1,68 @@
+"""
+FLUX Batch Yardımcıları
+İstekleri boyut/steps'e göre gruplar ve her grubu tek pipe() çağrısıyla üretir.
+torch'a bağımlı değildir - generator üretimi çağırana bırakılır (CPU'da test edilebilir).
+"""
+import os
+import time
+import random
+
+MAX_BATCH_SIZE = int(os.getenv("FLUX_MAX_BATCH", "4"))
+
+
+def batch_key(req) -> tuple:
+    """Aynı pipe() çağrısına girebilecek istekler: aynı genişlik, yükseklik, steps"""
+    return (req.width, req.height, req.num_inference_steps)
+
+
+def plan_batches(requests: list, max_batch: int = MAX_BATCH_SIZE) -> list:
+    """
+    İstekleri micro-batch'lere böl.
+
+    Returns:
+        [[index, ...], ...] - her liste tek pipe() çağrısı; grup içinde giriş sırası korunur
+    """
+    groups = {}
+    for i, req in enumerate(requests):
+        groups.setdefault(batch_key(req), []).append(i)
+
+    batches = []
+    for indices in groups.values():
+        for start in range(0, len(indices), max_batch):
+            batches.append(indices[start:start + max_batch])
+    return batches
+
+
+def resolve_seeds(requests: list) -> list:
+    """
+    Batch'te generator listesi ya hep olmalı ya hiç: seed'siz isteklere
+    rastgele seed atanır (sonuçta döndürülür, tekrar üretilebilir).
+    """
+    return [req.seed if req.seed is not None else random.randrange(2 ** 32) for req in requests]
+
+
+def run_batch(pipe, requests: list, make_generator=None) -> tuple:
+    """
+    Aynı batch_key'e sahip istekleri tek pipe() çağrısıyla üret.
+
+    Args:
+        pipe: FluxPipeline (veya aynı imzalı stand-in)
+        requests: Aynı boyut/steps'li istekler
+        make_generator: seed -> generator (None ise generator verilmez)
+
+    Returns:
+        (images, seeds, elapsed_sec)
+    """
+    width, height, steps = batch_key(requests[0])
+    seeds = resolve_seeds(requests)
+    generators = [make_generator(seed) for seed in seeds] if make_generator else None
+
+    start = time.time()
+    images = pipe(
+        [req.prompt for req in requests],
+        num_inference_steps=steps,
+        width=width,
+        height=height,
+        generator=generators
+    ).images
+    return images, seeds, time.time() - start
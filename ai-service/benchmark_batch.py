@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Sıralı üretim vs micro-batch üretim (images/minute)
+Kullanım: python benchmark_batch.py [resim_sayısı] [batch_boyutu]
+
+GPU/FLUX gerekmez: FluxPipeline ile aynı imzalı küçük bir NumPy
+stand-in pipeline kullanılır (her step'te katman katman matmul).
+Az token'lı matmul'lar ağırlık okumasıyla sınırlıdır - batch bu okumayı
+resimler arasında paylaştırır (GPU'daki kazancın CPU karşılığı).
+Ayrıca batch yolunun aynı seed'le aynı resmi ürettiği doğrulanır.
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from PIL import Image
+
+from batching import plan_batches, run_batch
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+BATCH = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+
+class TinyPipeline:
+    """FluxPipeline stand-in: pipe(prompts, num_inference_steps, width, height, generator).images"""
+
+    def __init__(self, layers: int = 8, dim: int = 1024, patch: int = 32):
+        rng = np.random.default_rng(0)
+        self.patch = patch
+        self.weights = [rng.standard_normal((dim, dim), dtype=np.float32) / np.sqrt(dim) for _ in range(layers)]
+
+    def __call__(self, prompt, num_inference_steps=4, width=256, height=256, generator=None):
+        prompts = [prompt] if isinstance(prompt, str) else list(prompt)
+        seeds = generator if generator is not None else [None] * len(prompts)
+        tokens = (width // self.patch) * (height // self.patch)
+        dim = self.weights[0].shape[0]
+
+        # Latent: (batch * tokens, dim) - batch büyüdükçe matmul verimi artar
+        latents = np.concatenate([
+            np.random.default_rng(seed if seed is not None else hash(p) % 2 ** 32)
+            .standard_normal((tokens, dim), dtype=np.float32)
+            for p, seed in zip(prompts, seeds)
+        ])
+        for _ in range(num_inference_steps):
+            x = latents
+            for w in self.weights:
+                x = np.tanh(x @ w)
+            latents = latents - 0.1 * x
+
+        images = []
+        for i in range(len(prompts)):
+            block = latents[i * tokens:(i + 1) * tokens, :3]
+            grid = block.reshape(height // self.patch, width // self.patch, 3)
+            pixels = ((np.tanh(grid) + 1) * 127.5).astype(np.uint8)
+            images.append(Image.fromarray(pixels).resize((width, height), Image.NEAREST))
+        return SimpleNamespace(images=images)
+
+
+def make_requests(count: int) -> list:
+    """İki farklı boyutta karışık istek listesi (gruplama test edilsin)"""
+    sizes = [(256, 192), (192, 256)]
+    return [
+        SimpleNamespace(prompt=f"scene {i}", width=sizes[i % 2][0], height=sizes[i % 2][1],
+                        num_inference_steps=4, seed=i)
+        for i in range(count)
+    ]
+
+
+def main():
+    pipe = TinyPipeline()
+    requests = make_requests(COUNT)
+    identity = lambda seed: seed  # stand-in generator = seed
+
+    # Isınma
+    run_batch(pipe, requests[:1], identity)
+
+    print(f"🧪 {COUNT} resim, batch üst sınırı {BATCH}")
+
+    start = time.time()
+    sequential = [run_batch(pipe, [req], identity)[0][0] for req in requests]
+    seq_time = time.time() - start
+
+    start = time.time()
+    batched = [None] * COUNT
+    batches = plan_batches(requests, max_batch=BATCH)
+    for indices in batches:
+        images, _, _ = run_batch(pipe, [requests[i] for i in indices], identity)
+        for i, image in zip(indices, images):
+            batched[i] = image
+    batch_time = time.time() - start
+
+    # Aynı seed → aynı resim olmalı (batch yolu sonucu değiştirmemeli)
+    max_diff = max(
+        int(np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)).max())
+        for a, b in zip(sequential, batched)
+    )
+
+    print(f"\n📊 SONUÇLAR")
+    print(f"   Sıralı:  {seq_time:.2f}s  → {COUNT / seq_time * 60:.0f} resim/dk")
+    print(f"   Batch:   {batch_time:.2f}s  → {COUNT / batch_time * 60:.0f} resim/dk ({len(batches)} pipe çağrısı)")
+    print(f"   Hızlanma: {seq_time / batch_time:.2f}x")
+    print(f"   Maks. piksel farkı: {max_diff}")
+
+    if max_diff > 1:
+        print("❌ Batch sonuçları sıralı üretimle uyuşmuyor")
+        sys.exit(1)
+    print("✅ Batch sonuçları sıralı üretimle aynı")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ModelManager yaşam döngüsü (stand-in safetensors model)
+Kullanım: python benchmark_model_load.py [ağırlık_MB]
+
+GPU/FLUX gerekmez: geçici dizine stand-in safetensors dosyası yazılır
+(katman başına float32 matris) ve numpy ile okunur. Gerçek FLUX yolu
+(FluxPipeline.from_pretrained + .to("cuda") / CPU offload) burada ölçülmez;
+onun faz süreleri /model/status'ta. Ölçülenler:
+  1. Yükleme + ilk forward süresi (kopyalayarak okuma vs mmap)
+  2. ModelManager: faz süreleri, unload → reload (page cache sıcak)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+from model_manager import ModelManager
+
+WEIGHTS_MB = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+DIM = 1024
+
+# safetensors dtype -> numpy (BF16 numpy'da yok, ham uint16 olarak açılır)
+SAFETENSORS_DTYPES = {
+    "F64": np.float64, "F32": np.float32, "F16": np.float16, "BF16": np.uint16,
+    "I64": np.int64, "I32": np.int32, "I16": np.int16, "I8": np.int8,
+    "U8": np.uint8, "BOOL": np.bool_,
+}
+
+
+def save_safetensors(tensors: dict, path: str):
+    """Minimal safetensors yazıcı (float32)"""
+    header, offset = {}, 0
+    for name, array in tensors.items():
+        header[name] = {"dtype": "F32", "shape": list(array.shape), "data_offsets": [offset, offset + array.nbytes]}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b" " * (-len(header_bytes) % 8)
+    with open(path, 'wb') as f:
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for array in tensors.values():
+            f.write(array.tobytes())
+
+
+def mmap_safetensors(path: str) -> dict:
+    """
+    safetensors dosyasını kopyalamadan aç: {isim: np.memmap görünümü}.
+    Sayfalar ilk erişimde diskten (veya page cache'ten) gelir.
+    """
+    with open(path, 'rb') as f:
+        header_len = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_len))
+    data = np.memmap(path, dtype=np.uint8, mode='r', offset=8 + header_len)
+
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        start, end = info["data_offsets"]
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        tensors[name] = data[start:end].view(dtype).reshape(info["shape"])
+    return tensors
+
+
+def load_eager(path: str) -> dict:
+    """Karşılaştırma: dosyanın tamamını belleğe kopyalayarak yükle"""
+    return {name: np.array(tensor) for name, tensor in mmap_safetensors(path).items()}
+
+
+def forward(weights: dict) -> float:
+    """Stand-in forward: her katmandan bir matmul (tüm ağırlık sayfalarına dokunur)"""
+    x = np.ones((8, DIM), dtype=np.float32) / DIM
+    for name in sorted(weights):
+        x = np.tanh(x @ weights[name])
+    return float(x.sum())
+
+
+def main():
+    layers = max(1, WEIGHTS_MB * 1024 * 1024 // (DIM * DIM * 4))
+    tmp_dir = tempfile.mkdtemp(prefix="model_bench_")
+    path = os.path.join(tmp_dir, "model.safetensors")
+    rng = np.random.default_rng(0)
+    save_safetensors({f"layer_{i:03d}": (rng.standard_normal((DIM, DIM)) / np.sqrt(DIM)).astype(np.float32)
+                      for i in range(layers)}, path)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"🧪 Stand-in model: {layers} katman, {size_mb:.0f}MB")
+
+    try:
+        # 1. Yükleme + ilk forward
+        print(f"\n📊 Yükleme + ilk forward")
+        for mode in ("eager", "mmap"):
+            start = time.time()
+            weights = load_eager(path) if mode == "eager" else mmap_safetensors(path)
+            load_time = time.time() - start
+            forward(weights)
+            total = time.time() - start
+            print(f"   {mode:<6} yükleme {load_time * 1000:7.1f}ms, yükleme+forward {total * 1000:7.1f}ms")
+            del weights
+
+        # 2. ModelManager yaşam döngüsü
+        print(f"\n📊 ModelManager")
+
+        def loader(phase):
+            with phase("resolve"):
+                model_path = path
+            with phase("mmap"):
+                weights = mmap_safetensors(model_path)
+            with phase("warmup"):
+                forward(weights)
+            return weights
+
+        manager = ModelManager("stand-in", loader)
+        manager.get()
+        first = manager.last_load_time
+        manager.unload("benchmark")
+        start = time.time()
+        manager.reload()
+        print(f"   İlk yükleme: {first:.3f}s, unload → reload: {time.time() - start:.3f}s")
+        phases = ", ".join(f"{p['phase']}={p['seconds']}s" for p in manager.status()["phases"])
+        print(f"   Fazlar: {phases}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Resim encode formatları + inline vs havuzda son işlem
+Kullanım: python benchmark_postprocess.py [resim_sayısı] [inference_ms]
+
+GPU/FLUX gerekmez: inference süresi sleep ile taklit edilir, resim
+FLUX çıktısına benzer yumuşak geçişli 1024x768 bir görüntüdür.
+Inline: her resim inference'tan sonra aynı thread'de encode edilir (eski akış).
+Havuz: encode son işlem havuzuna bırakılır, sonraki inference hemen başlar.
+"""
+
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+import postprocess
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+INFERENCE_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+
+def make_image(seed: int, width: int = 1024, height: int = 768) -> Image.Image:
+    """Yumuşak gradyan + hafif gren (gerçek fotoğraf sıkıştırma oranına yakın)"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    channels = [np.sin(x / rng.uniform(40, 200) + rng.uniform(0, 6)) * np.cos(y / rng.uniform(40, 200)) for _ in range(3)]
+    pixels = (np.stack(channels, axis=-1) + 1) * 110 + rng.normal(0, 6, (height, width, 3))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def main():
+    images = [make_image(i) for i in range(COUNT)]
+
+    print(f"🧪 Encode formatları (1024x768, {COUNT} resim ortalaması)")
+    for fmt, kwargs in [("png", {"compress_level": 6}), ("png", {"compress_level": 1}),
+                        ("webp", {"quality": 90}), ("jpeg", {"quality": 90})]:
+        start = time.time()
+        sizes = [len(postprocess.encode_image(img, fmt, **kwargs)[0]) for img in images]
+        per_image = (time.time() - start) / COUNT
+        label = f"{fmt} {kwargs}"
+        print(f"   {label:<28} {per_image * 1000:6.0f}ms  {sum(sizes) / COUNT / 1024:6.0f}KB")
+
+    fmt = postprocess.IMAGE_FORMAT
+    print(f"\n🧪 Pipeline: {COUNT} resim, inference {INFERENCE_MS:.0f}ms, format {fmt}")
+
+    start = time.time()
+    for img in images:
+        time.sleep(INFERENCE_MS / 1000)
+        postprocess.encode_image(img, fmt)
+    inline_time = time.time() - start
+
+    start = time.time()
+    futures = []
+    for img in images:
+        time.sleep(INFERENCE_MS / 1000)
+        futures.append(postprocess.submit(postprocess.encode_image, img, fmt))
+    for future in futures:
+        future.result()
+    pooled_time = time.time() - start
+
+    print(f"\n📊 SONUÇLAR")
+    print(f"   Inline: {inline_time:.2f}s → {COUNT / inline_time * 60:.0f} resim/dk")
+    print(f"   Havuz:  {pooled_time:.2f}s → {COUNT / pooled_time * 60:.0f} resim/dk "
+          f"({postprocess.POSTPROCESS_WORKERS} worker)")
+    print(f"   Hızlanma: {inline_time / pooled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
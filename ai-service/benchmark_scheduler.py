@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Eşzamanlı /generate-image istekleri - doğrudan pipe() vs batch zamanlayıcı
+Kullanım: python benchmark_scheduler.py [istemci_sayısı] [istemci_başına_istek]
+
+GPU/FLUX gerekmez: benchmark_batch.py'deki NumPy stand-in pipeline kullanılır.
+Doğrudan mod: her istemci modeli kilitle sırayla kullanır (tek model, tek çağrı).
+Zamanlayıcı modu: istekler kuyruğa girer, pencere içinde gelenler birlikte üretilir.
+"""
+
+import sys
+import time
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+import scheduler
+from batching import run_batch
+from benchmark_batch import TinyPipeline
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+PER_CLIENT = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+
+def make_request(client: int, n: int):
+    return SimpleNamespace(prompt=f"client {client} scene {n}", width=256, height=192,
+                           num_inference_steps=4, seed=client * 1000 + n)
+
+
+def run_clients(generate) -> tuple:
+    """CLIENTS istemci, her biri PER_CLIENT isteği sırayla gönderir. (süre, gecikmeler)"""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(c):
+        for n in range(PER_CLIENT):
+            start = time.time()
+            generate(make_request(c, n))
+            with lock:
+                latencies.append(time.time() - start)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=CLIENTS) as executor:
+        list(executor.map(client, range(CLIENTS)))
+    return time.time() - start, sorted(latencies)
+
+
+def report(name: str, elapsed: float, latencies: list):
+    total = len(latencies)
+    p95 = latencies[min(total - 1, int(total * 0.95))]
+    print(f"   {name:<12} {elapsed:.2f}s → {total / elapsed * 60:.0f} resim/dk | "
+          f"gecikme ort. {sum(latencies) / total * 1000:.0f}ms, p95 {p95 * 1000:.0f}ms")
+
+
+def main():
+    pipe = TinyPipeline()
+    identity = lambda seed: seed  # stand-in generator = seed
+    model_lock = threading.Lock()
+
+    # Isınma
+    run_batch(pipe, [make_request(0, 0)], identity)
+
+    print(f"🧪 {CLIENTS} eşzamanlı istemci × {PER_CLIENT} istek")
+
+    def direct(req):
+        with model_lock:
+            return run_batch(pipe, [req], identity)
+
+    direct_time, direct_lat = run_clients(direct)
+
+    scheduler.start(lambda: pipe, identity)
+    sched_time, sched_lat = run_clients(lambda req: scheduler.submit(req).result())
+    stats = scheduler.get_scheduler_stats()
+    scheduler.stop()
+
+    print(f"\n📊 SONUÇLAR")
+    report("Doğrudan:", direct_time, direct_lat)
+    report("Zamanlayıcı:", sched_time, sched_lat)
+    print(f"   Hızlanma: {direct_time / sched_time:.2f}x")
+    print(f"   Batch: {stats['batches']} çağrı, ort. boyut {stats['avg_batch_size']}, "
+          f"kuyruk bekleme ort. {stats['avg_wait_ms']}ms (p95 {stats['p95_wait_ms']}ms)")
+
+    if stats["failed"]:
+        print(f"❌ {stats['failed']} istek başarısız")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Açılış süresi ölçümü: server'ı başlatır, /health/live ve /health/ready'yi yoklar
+Kullanım: python measure_startup.py [port] [ready_timeout_sn]
+
+Ölçülenler (process başlangıcından itibaren):
+  live  - server istek kabul ediyor (/health/live 200)
+  ready - model yüklendi + warmup bitti (/health/ready 200)
+Sonunda server'ın kendi zaman çizelgesi (/startup) ve model fazları yazdırılır.
+FLUX_STARTUP_MODE=blocking ile eski (bloklayan) açılış ölçülebilir.
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+import urllib.request
+import urllib.error
+
+PORT = int(sys.argv[1]) if len(sys.argv) > 1 else 8899
+READY_TIMEOUT = float(sys.argv[2]) if len(sys.argv) > 2 else 900
+POLL_INTERVAL = 0.05
+
+
+def get(path: str) -> tuple:
+    """(status_code, json) - bağlantı yoksa (None, None)"""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{PORT}{path}", timeout=2) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None, None
+
+
+def wait_for(path: str, start: float, timeout: float, server) -> float:
+    """path 200 dönene kadar bekle, süreyi döndür (timeout/çıkış/açılış hatasında None)"""
+    while time.time() - start < timeout:
+        if server.poll() is not None:
+            return None
+        status, body = get(path)
+        if status == 200:
+            return time.time() - start
+        if body and body.get("phase") == "retrying":  # ilk açılış denemesi hata verdi
+            return None
+        time.sleep(POLL_INTERVAL)
+    return None
+
+
+def main():
+    mode = os.getenv("FLUX_STARTUP_MODE", "background")
+    print(f"🧪 Açılış ölçümü (mod: {mode}, port: {PORT})")
+
+    start = time.time()
+    server = subprocess.Popen(
+        [sys.executable, "-c", f"import uvicorn; uvicorn.run('api:app', host='127.0.0.1', port={PORT}, log_level='warning')"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.STDOUT
+    )
+
+    try:
+        live = wait_for("/health/live", start, 120, server)
+        if live is None:
+            print("❌ Server ayağa kalkmadı")
+            sys.exit(1)
+        print(f"   live:  {live:.2f}s")
+
+        ready = wait_for("/health/ready", start, READY_TIMEOUT, server)
+        _, info = get("/startup")
+        print(f"   ready: {ready:.2f}s" if ready is not None else f"   ready: ❌ ({(info or {}).get('error')})")
+
+        if info:
+            print(f"\n📊 Server zaman çizelgesi (process başlangıcından):")
+            for name, at in info["timeline"].items():
+                print(f"   {name:<16} {at:7.2f}s")
+            for phase in info["model_phases"]:
+                print(f"   {'model/' + phase['phase']:<16} {phase['seconds']:7.2f}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Model Yaşam Döngüsü Yöneticisi
+- Tek seferlik yükleme (eşzamanlı get() çağrıları aynı yüklemeyi bekler)
+- Yükleme fazları ve süreleri (resolve / import / from_pretrained / device ...)
+- MODELS_DIR'deki HF snapshot'ı bulunursa ağa çıkmadan yüklenir
+- Hot reload / unload, boşta kalınca veya bellek azalınca otomatik unload
+torch'a bağımlı değildir - loader/unloader çağırana bırakılır (CPU'da test edilebilir).
+"""
+import os
+import gc
+import time
+import threading
+from contextlib import contextmanager
+
+MODEL_IDLE_UNLOAD_SEC = int(os.getenv("MODEL_IDLE_UNLOAD_SEC", "0"))  # 0 = kapalı
+MODEL_MIN_FREE_MB = int(os.getenv("MODEL_MIN_FREE_MB", "0"))  # 0 = kapalı
+WATCHDOG_INTERVAL = int(os.getenv("MODEL_WATCHDOG_INTERVAL", "30"))
+
+
+def memory_available_mb() -> float:
+    """Kullanılabilir sistem belleği (/proc/meminfo MemAvailable, yoksa None)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def find_local_snapshot(models_dir: str, model_id: str) -> str:
+    """
+    HF cache düzeninde (models--org--name/snapshots/<rev>) indirilmiş snapshot'ı bul.
+    Bulunursa from_pretrained'e path verilir - hub'a istek atılmaz.
+
+    Returns:
+        Snapshot dizini veya None
+    """
+    snapshots = os.path.join(models_dir, "models--" + model_id.replace("/", "--"), "snapshots")
+    if not os.path.isdir(snapshots):
+        return None
+    candidates = [
+        os.path.join(snapshots, rev) for rev in os.listdir(snapshots)
+        if os.path.exists(os.path.join(snapshots, rev, "model_index.json"))
+        or os.path.exists(os.path.join(snapshots, rev, "config.json"))
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+class ModelManager:
+    """
+    Tek bir modelin yaşam döngüsü.
+
+    loader(phase) -> model: phase("isim") ile süresi ölçülecek adımları sarar
+    unloader(model): opsiyonel temizlik (ör. torch.cuda.empty_cache)
+    """
+
+    def __init__(self, name: str, loader, unloader=None):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.model = None
+        self.state = "unloaded"  # unloaded / loading / ready / failed
+        self.error = None
+        self.phases = []
+        self.load_count = 0
+        self.last_load_time = None
+        self.last_used = None
+        self.unload_reason = None
+        self._lock = threading.RLock()
+        self._watchdog = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    @contextmanager
+    def _phase(self, name: str):
+        """Yükleme fazını zamanla ve kaydet"""
+        start = time.time()
+        print(f"⏳ [{self.name}] {name}...")
+        try:
+            yield
+        finally:
+            elapsed = round(time.time() - start, 3)
+            self.phases.append({"phase": name, "seconds": elapsed})
+            print(f"   [{self.name}] {name}: {elapsed:.2f}s")
+
+    def get(self):
+        """Modeli döndür, yüklü değilse yükle (eşzamanlı çağrılar tek yüklemeyi bekler)"""
+        model = self.model
+        if model is None:
+            with self._lock:
+                if self.model is None:
+                    self._load()
+                model = self.model
+        self.last_used = time.time()
+        return model
+
+    def _load(self):
+        print(f"🚀 [{self.name}] model yükleniyor...")
+        self.state = "loading"
+        self.error = None
+        self.phases = []
+        start = time.time()
+        try:
+            self.model = self.loader(self._phase)
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            raise
+        self.last_load_time = round(time.time() - start, 2)
+        self.load_count += 1
+        self.unload_reason = None
+        self.state = "ready"
+        print(f"✅ [{self.name}] hazır ({self.last_load_time:.1f}s)")
+
+    def unload(self, reason: str = "manual") -> bool:
+        """
+        Modeli bellekten çıkar. Sürmekte olan çağrılar kendi referanslarıyla
+        biter; bellek son referans bırakılınca boşalır. Sonraki get() yeniden yükler.
+        Yükleme sürüyorsa beklemez, atlar (False) - yüklemeyi başlatan get()/reload()
+        kilidi bırakana kadar çağıranı (API / watchdog) bloklamaz.
+        """
+        if not self._lock.acquire(blocking=False):
+            print(f"⏭️ [{self.name}] yükleme sürüyor, unload atlandı ({reason})")
+            return False
+        try:
+            if self.model is None:
+                return False
+            model, self.model = self.model, None
+            self.state = "unloaded"
+            self.unload_reason = reason
+            if self.unloader:
+                try:
+                    self.unloader(model)
+                except Exception as e:
+                    print(f"⚠️ [{self.name}] unload temizliği hatası: {e}")
+            del model
+            gc.collect()
+        finally:
+            self._lock.release()
+        print(f"🧹 [{self.name}] model bellekten çıkarıldı ({reason})")
+        return True
+
+    def reload(self):
+        """Modeli yeniden yükle (ağırlıklar değiştiyse veya bellek parçalandıysa)"""
+        with self._lock:
+            self.unload("reload")
+            self._load()
+            return self.model
+
+    def _should_unload(self, is_busy) -> str:
+        """Watchdog kararı: unload sebebi veya None"""
+        if self.model is None or (is_busy and is_busy()):
+            return None
+        idle = time.time() - (self.last_used or time.time())
+        if MODEL_IDLE_UNLOAD_SEC and idle > MODEL_IDLE_UNLOAD_SEC:
+            return f"idle {idle:.0f}s"
+        free_mb = memory_available_mb()
+        if MODEL_MIN_FREE_MB and free_mb is not None and free_mb < MODEL_MIN_FREE_MB:
+            return f"bellek az ({free_mb:.0f}MB)"
+        return None
+
+    def start_watchdog(self, is_busy=None):
+        """Boşta kalma / bellek baskısı kontrolü (ikisi de kapalıysa başlamaz)"""
+        if not (MODEL_IDLE_UNLOAD_SEC or MODEL_MIN_FREE_MB) or self._watchdog is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(WATCHDOG_INTERVAL)
+                reason = self._should_unload(is_busy)
+                if reason:
+                    self.unload(reason)
+
+        self._watchdog = threading.Thread(target=loop, name=f"{self.name}-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def status(self) -> dict:
+        """Durum, faz süreleri ve bellek bilgisi"""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "loaded": self.is_loaded,
+            "error": self.error,
+            "phases": list(self.phases),
+            "last_load_time": self.last_load_time,
+            "load_count": self.load_count,
+            "idle_seconds": round(time.time() - self.last_used, 1) if self.last_used else None,
+            "unload_reason": self.unload_reason,
+            "memory_available_mb": round(memory_available_mb() or 0),
+            "idle_unload_sec": MODEL_IDLE_UNLOAD_SEC,
+            "min_free_mb": MODEL_MIN_FREE_MB
+        }
@@ -0,0 +1,72 @@
+"""
+FLUX Son İşlem Havuzu - encode + R2 upload
+Inference thread'i resmi bu havuza bırakır ve hemen sonraki batch'e geçer.
+Resim bellekte encode edilir (PNG compress_level / WebP / JPEG quality) ve
+diske yazılmadan doğrudan buffer'dan R2'ye yüklenir.
+"""
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POSTPROCESS_WORKERS = int(os.getenv("POSTPROCESS_WORKERS", "4"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "png").lower()
+PNG_COMPRESS_LEVEL = int(os.getenv("PNG_COMPRESS_LEVEL", "6"))  # 0-9, PIL varsayılanı 6
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "90"))  # WebP/JPEG
+
+# format -> (PIL format adı, uzantı, content_type)
+FORMATS = {
+    "png": ("PNG", ".png", "image/png"),
+    "webp": ("WEBP", ".webp", "image/webp"),
+    "jpeg": ("JPEG", ".jpg", "image/jpeg"),
+    "jpg": ("JPEG", ".jpg", "image/jpeg"),
+}
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def image_format(fmt: str = None) -> tuple:
+    """
+    Returns:
+        (PIL format adı, uzantı, content_type) - bilinmeyen format ValueError
+    """
+    fmt = (fmt or IMAGE_FORMAT).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Desteklenmeyen resim formatı: {fmt} (png, webp, jpeg)")
+    return FORMATS[fmt]
+
+
+def encode_image(image, fmt: str = None, quality: int = None, compress_level: int = None) -> tuple:
+    """
+    PIL resmini bellekte encode et.
+
+    Returns:
+        (bytes, uzantı, content_type)
+    """
+    pil_format, ext, content_type = image_format(fmt)
+    buffer = io.BytesIO()
+    if pil_format == "PNG":
+        level = PNG_COMPRESS_LEVEL if compress_level is None else compress_level
+        image.save(buffer, "PNG", compress_level=level)
+    elif pil_format == "WEBP":
+        image.save(buffer, "WEBP", quality=quality or IMAGE_QUALITY, method=4)
+    else:
+        image.convert("RGB").save(buffer, "JPEG", quality=quality or IMAGE_QUALITY, optimize=False)
+    return buffer.getvalue(), ext, content_type
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process başına encode/upload havuzu"""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=POSTPROCESS_WORKERS, thread_name_prefix="postprocess")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def submit(fn, *args, **kwargs):
+    """İşi son işlem havuzuna gönder (concurrent.futures.Future döner)"""
+    return get_executor().submit(fn, *args, **kwargs)
@@ -0,0 +1,177 @@
+"""
+FLUX Sonuç Cache'i - prompt + seed + boyut + steps → encode edilmiş resim
+Pipeline adımı tekrar denendiğinde aynı resim yeniden üretilmez.
+Sadece seed verilmiş istekler cache'lenir (seed'siz üretim deterministik değil).
+Lokal disk: boyut sınırlı LRU. Opsiyonel ikinci katman: R2 (key ile head_object).
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import threading
+
+# LRU/sayaç kodu Video API ile ortak (monorepo'da yt-video/disk_cache.py)
+sys.path.insert(0, os.getenv("YT_VIDEO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "yt-video")))
+try:
+    from disk_cache import DiskLRU, write_atomic
+except ImportError:
+    DiskLRU = None
+    print("⚠️ disk_cache bulunamadı, sonuç cache'i kapalı (YT_VIDEO_DIR ayarlayın)")
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true" and DiskLRU is not None
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "/tmp/flux_result_cache")
+RESULT_CACHE_MAX_GB = float(os.getenv("RESULT_CACHE_MAX_GB", "5"))
+RESULT_CACHE_R2 = os.getenv("RESULT_CACHE_R2", "false").lower() == "true"
+
+REMOTE_PREFIX = "result-cache"
+
+_COUNTERS = ["hits", "remote_hits", "misses", "stores", "evictions", "remote_stores"]
+_cache = DiskLRU(RESULT_CACHE_DIR, int(RESULT_CACHE_MAX_GB * 1024 ** 3), "Sonuç cache",
+                 sidecar=".json") if DiskLRU else None
+_remote = None  # {"get_client", "bucket", "public_url"} - set_remote ile
+
+
+def set_remote(get_client, bucket: str, public_url: str):
+    """R2 katmanını bağla (api.py R2 ayarlıysa çağırır)"""
+    global _remote
+    _remote = {"get_client": get_client, "bucket": bucket, "public_url": public_url}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Baş/son boşluk ve ardışık boşluklar sonucu değiştirmez"""
+    return re.sub(r"\s+", " ", prompt.strip())
+
+
+def cache_key(req, model_id: str, fmt: str, quality) -> str:
+    """
+    İstek anahtarı (seed yoksa None).
+    model_id ve çıktı formatı da anahtarda - model veya encode değişince eski sonuç kullanılmaz.
+    """
+    if not RESULT_CACHE_ENABLED or req.seed is None:
+        return None
+    params = {
+        "model": model_id,
+        "prompt": normalize_prompt(req.prompt),
+        "seed": req.seed,
+        "width": req.width,
+        "height": req.height,
+        "steps": req.num_inference_steps,
+        "format": fmt,
+        "quality": quality
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def _entry_paths(key: str) -> tuple:
+    """(veri dosyası öneki, meta json)"""
+    base = _cache.path(key)
+    return base, f"{base}.json"
+
+
+def _remote_key(key: str, ext: str) -> str:
+    return f"{REMOTE_PREFIX}/{key}{ext}"
+
+
+def _lookup_remote(key: str, ext: str) -> dict:
+    """R2'de aynı key varsa public URL'i (indirmeden) döndür"""
+    try:
+        _remote["get_client"]().head_object(Bucket=_remote["bucket"], Key=_remote_key(key, ext))
+    except Exception:
+        return None
+    return {"cdn_url": f"{_remote['public_url']}/{_remote_key(key, ext)}", "ext": ext, "path": None}
+
+
+def _fetch_remote(key: str, ext: str) -> bytes:
+    """R2 katmanından baytları indir (lokal kayıt gerektiğinde)"""
+    response = _remote["get_client"]().get_object(Bucket=_remote["bucket"], Key=_remote_key(key, ext))
+    return response["Body"].read()
+
+
+def _push_remote(key: str, ext: str, data: bytes, content_type: str):
+    """R2 katmanına arka planda yükle"""
+    def run():
+        try:
+            _remote["get_client"]().put_object(Bucket=_remote["bucket"], Key=_remote_key(key, ext),
+                                               Body=data, ContentType=content_type)
+            _cache.bump("remote_stores")
+        except Exception as e:
+            print(f"⚠️ Sonuç cache R2'ye yüklenemedi: {e}")
+    threading.Thread(target=run, daemon=True).start()
+
+
+def lookup(key: str, ext: str) -> dict:
+    """
+    Cache'teki sonucu bul.
+
+    Returns:
+        {"path": lokal veri dosyası veya None, "cdn_url": önceki CDN URL'i veya None, "ext"}
+        Yoksa None.
+    """
+    if not key:
+        return None
+
+    base, meta_path = _entry_paths(key)
+    data_path = f"{base}{ext}"
+    if os.path.exists(data_path):
+        _cache.touch(data_path)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        _cache.bump("hits")
+        print(f"♻️ Sonuç cache HIT: {key[:12]}")
+        return {"path": data_path, "cdn_url": meta.get("cdn_url"), "ext": ext}
+
+    if RESULT_CACHE_R2 and _remote:
+        entry = _lookup_remote(key, ext)
+        if entry:
+            _cache.bump("remote_hits")
+            print(f"♻️ Sonuç cache HIT (R2): {key[:12]}")
+            return entry
+
+    _cache.bump("misses")
+    return None
+
+
+def read(key: str, entry: dict) -> bytes:
+    """Cache kaydının baytları (lokal yoksa R2'den)"""
+    if entry.get("path"):
+        with open(entry["path"], 'rb') as f:
+            return f.read()
+    return _fetch_remote(key, entry["ext"])
+
+
+def store(key: str, data: bytes, ext: str, content_type: str, cdn_url: str = None):
+    """Encode edilmiş resmi cache'e ekle, gerekirse eski kayıtları sil"""
+    if not key:
+        return
+
+    base, meta_path = _entry_paths(key)
+    replaced_size = _cache.size_of(f"{base}{ext}")
+    try:
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        write_atomic(f"{base}{ext}", data)
+        write_atomic(meta_path, json.dumps({"cdn_url": cdn_url, "ext": ext}).encode())
+    except Exception as e:
+        print(f"⚠️ Sonuç cache'e yazılamadı: {e}")
+        return
+
+    _cache.added(f"{base}{ext}", replaced_size)
+    if RESULT_CACHE_R2 and _remote:
+        _push_remote(key, ext, data, content_type)
+
+
+def evict(max_bytes: int = None) -> int:
+    """En eski kullanılanları sil, toplam boyut sınırın altına insin"""
+    return _cache.evict(max_bytes) if _cache else 0
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss sayaçları ve disk kullanımı (sayaçlardan, dizin gezilmez)"""
+    return {
+        "enabled": RESULT_CACHE_ENABLED,
+        "remote": RESULT_CACHE_R2 and _remote is not None,
+        **(_cache.stats(_COUNTERS) if _cache else {})
+    }
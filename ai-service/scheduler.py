@@ -0,0 +1,205 @@
+"""
+FLUX Dinamik Batch Zamanlayıcı
+Eşzamanlı istekler kuyruğa girer; tek inference thread'i kısa bir pencere
+boyunca (FLUX_BATCH_WINDOW_MS) gelenleri toplar, aynı boyut/steps'lileri
+batching.py ile micro-batch'lere böler ve her isteğin Future'ını çözer.
+Event loop pipe() çağrısıyla bloklanmaz, model tek thread'den kullanılır.
+"""
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from batching import plan_batches, run_batch, MAX_BATCH_SIZE
+
+BATCH_WINDOW_MS = float(os.getenv("FLUX_BATCH_WINDOW_MS", "25"))
+# Metrik penceresi - son N batch/istek
+METRICS_WINDOW = 500
+
+_queue = queue.Queue()
+_thread = None
+_stop_event = threading.Event()
+_lock = threading.Lock()
+_get_pipe = None
+_make_generator = None
+_busy = False
+_batch_counter = 0
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "batches": 0}
+_batch_sizes = deque(maxlen=METRICS_WINDOW)
+_wait_times = deque(maxlen=METRICS_WINDOW)
+
+
+def start(get_pipe, make_generator=None):
+    """
+    Inference thread'ini başlat (zaten çalışıyorsa bir şey yapmaz).
+
+    Args:
+        get_pipe: () -> pipe, ilk batch'te inference thread'inden çağrılır (lazy load)
+        make_generator: seed -> generator (None ise generator verilmez)
+    """
+    global _thread, _get_pipe, _make_generator
+    with _lock:
+        _get_pipe = get_pipe
+        _make_generator = make_generator
+        if _thread is not None and _thread.is_alive():
+            return
+        _stop_event.clear()
+        _thread = threading.Thread(target=_loop, name="flux-inference", daemon=True)
+        _thread.start()
+    print(f"🧵 Batch zamanlayıcı başladı (pencere: {BATCH_WINDOW_MS:.0f}ms, batch üst sınırı: {MAX_BATCH_SIZE})")
+
+
+def stop(timeout: float = 5):
+    """Inference thread'ini durdur, kuyrukta kalan istekleri hata ile bitir"""
+    global _thread
+    _stop_event.set()
+    _queue.put(None)  # get()'te bekleyen thread'i uyandır
+    if _thread is not None:
+        _thread.join(timeout=timeout)
+        _thread = None
+    while True:
+        try:
+            item = _queue.get_nowait()
+        except queue.Empty:
+            break
+        if item is not None and item["future"].set_running_or_notify_cancel():
+            item["future"].set_exception(RuntimeError("Zamanlayıcı durduruldu"))
+
+
+def submit(req) -> Future:
+    """
+    İsteği kuyruğa ekle.
+
+    Returns:
+        Future -> {"image", "seed", "generation_time", "batch_size", "batch_id", "wait_time"}
+    """
+    if _thread is None or not _thread.is_alive():
+        raise RuntimeError("Zamanlayıcı çalışmıyor (start() çağrılmadı)")
+    future = Future()
+    with _lock:
+        _stats["submitted"] += 1
+    _queue.put({"req": req, "future": future, "queued_at": time.time()})
+    return future
+
+
+def _collect() -> list:
+    """
+    İlk isteği bekle, ardından pencere dolana kadar (veya bir grup
+    MAX_BATCH_SIZE'a ulaşana kadar) gelenleri topla.
+    GPU meşgulken biriken istekler beklemeden alınır.
+    """
+    first = _queue.get()
+    if first is None:
+        return []
+    pending = [first]
+    group_sizes = {}
+    key = (first["req"].width, first["req"].height, first["req"].num_inference_steps)
+    group_sizes[key] = 1
+    deadline = time.time() + BATCH_WINDOW_MS / 1000
+
+    while max(group_sizes.values()) < MAX_BATCH_SIZE:
+        remaining = deadline - time.time()
+        try:
+            item = _queue.get_nowait() if remaining <= 0 else _queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is None:
+            break
+        pending.append(item)
+        key = (item["req"].width, item["req"].height, item["req"].num_inference_steps)
+        group_sizes[key] = group_sizes.get(key, 0) + 1
+    return pending
+
+
+def _run(live: list):
+    """Toplanan istekleri micro-batch'ler halinde üret, Future'ları çöz"""
+    global _batch_counter
+    pipe = _get_pipe()
+
+    for indices in plan_batches([item["req"] for item in live]):
+        batch = [live[i] for i in indices]
+        started = time.time()
+        with _lock:
+            _batch_counter += 1
+            batch_id = _batch_counter
+
+        try:
+            images, seeds, elapsed = run_batch(pipe, [item["req"] for item in batch], _make_generator)
+        except Exception as e:
+            print(f"❌ Batch #{batch_id} hatası ({len(batch)} istek): {e}")
+            with _lock:
+                _stats["failed"] += len(batch)
+            for item in batch:
+                item["future"].set_exception(e)
+            continue
+
+        per_image = round(elapsed / len(batch), 2)
+        with _lock:
+            _stats["batches"] += 1
+            _stats["completed"] += len(batch)
+            _batch_sizes.append(len(batch))
+            for item in batch:
+                _wait_times.append(started - item["queued_at"])
+
+        for item, image, seed in zip(batch, images, seeds):
+            item["future"].set_result({
+                "image": image,
+                "seed": seed,
+                "generation_time": per_image,
+                "batch_size": len(batch),
+                "batch_id": batch_id,
+                "wait_time": round(started - item["queued_at"], 3)
+            })
+
+
+def _loop():
+    """Inference thread'i: topla → üret → Future'ları çöz"""
+    global _busy
+    while not _stop_event.is_set():
+        # İptal edilen (istemcisi giden) istekler atlanır
+        live = [item for item in _collect() if item["future"].set_running_or_notify_cancel()]
+        if not live:
+            continue
+        _busy = True
+        try:
+            _run(live)
+        except Exception as e:
+            # Model yüklenemedi vb. - bekleyen hiçbir istek asılı kalmasın
+            print(f"❌ Zamanlayıcı hatası: {e}")
+            with _lock:
+                _stats["failed"] += sum(1 for item in live if not item["future"].done())
+            for item in live:
+                if not item["future"].done():
+                    item["future"].set_exception(e)
+        finally:
+            _busy = False
+
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def get_scheduler_stats() -> dict:
+    """Kuyruk derinliği, batch boyutu ve bekleme süresi metrikleri"""
+    with _lock:
+        sizes = list(_batch_sizes)
+        waits = list(_wait_times)
+        stats = dict(_stats)
+    return {
+        "running": _thread is not None and _thread.is_alive(),
+        "busy": _busy,
+        "queue_depth": _queue.qsize(),
+        "window_ms": BATCH_WINDOW_MS,
+        "max_batch": MAX_BATCH_SIZE,
+        **stats,
+        "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0,
+        "max_batch_size": max(sizes) if sizes else 0,
+        "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0,
+        "p95_wait_ms": round(_percentile(waits, 0.95) * 1000, 1),
+        "max_wait_ms": round(max(waits) * 1000, 1) if waits else 0
+    }
@@ -14,12 +14,66 @@ R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
 R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME")
 R2_PUBLIC_URL = os.getenv("R2_PUBLIC_URL")
 
+# R2 Upload Ayarları (bağlantı havuzu + multipart)
+R2_MAX_POOL_CONNECTIONS = int(os.getenv("R2_MAX_POOL_CONNECTIONS", "32"))
+R2_MULTIPART_THRESHOLD_MB = int(os.getenv("R2_MULTIPART_THRESHOLD_MB", "16"))  # Bu boyuttan büyükler parça parça yüklenir
+R2_MULTIPART_CHUNK_MB = int(os.getenv("R2_MULTIPART_CHUNK_MB", "8"))
+R2_UPLOAD_CONCURRENCY = int(os.getenv("R2_UPLOAD_CONCURRENCY", "8"))  # Dosya başına paralel parça sayısı
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "8"))  # Toplu upload'ta aynı anda yüklenen dosya
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", "3"))
+
+# İndirme Ayarları (paylaşımlı HTTP havuzu)
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "8"))  # Paralel indirme üst sınırı
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+DOWNLOAD_CHUNK_MB = int(os.getenv("DOWNLOAD_CHUNK_MB", "1"))
+DOWNLOAD_POOL_SIZE = int(os.getenv("DOWNLOAD_POOL_SIZE", "32"))
+
+# Upload-Behind: skip_cdn modunda biten sahneler arka planda yüklenir (varsayılan kapalı)
+UPLOAD_BEHIND = os.getenv("UPLOAD_BEHIND", "false").lower() == "true"
+UPLOAD_BEHIND_WORKERS = int(os.getenv("UPLOAD_BEHIND_WORKERS", "4"))
+UPLOAD_BEHIND_WAIT = int(os.getenv("UPLOAD_BEHIND_WAIT", "600"))  # Toplu upload'ta süren yüklemeyi bekleme (saniye)
+
 # API Ayarları
 NODE_CALLBACK_URL = os.getenv("NODE_CALLBACK_URL", "http://localhost:3000/webhook")
 API_PORT = int(os.getenv("PYTHON_API_PORT", "8000"))
 
+# Proje dosyaları için paylaşımlı dizin (FLUX API ile ortak)
+PROJECTS_DIR = os.getenv("PROJECTS_DIR", "/tmp/projects")
+
 # Video Ayarları
 DEFAULT_VIDEO_DURATION = 10
 DEFAULT_FPS = 30
 DEFAULT_VISIBILITY_RATIO = 0.90
-DEFAULT_PAN_DIRECTION = "vertical"  # "horizontal" veya "vertical"
\ No newline at end of file
+DEFAULT_PAN_DIRECTION = "vertical"  # "horizontal" veya "vertical"
+
+# Render Cache (içerik adresli, aynı sahne tekrar render edilmez)
+RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "/tmp/render_cache")
+RENDER_CACHE_MAX_GB = float(os.getenv("RENDER_CACHE_MAX_GB", "10"))
+RENDER_CACHE_R2 = os.getenv("RENDER_CACHE_R2", "false").lower() == "true"  # R2'yi ikinci katman olarak kullan
+
+# Render Havuzu Ayarları (process pool)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", "100"))  # Çalışan + bekleyen iş üst sınırı
+
+# Bloklayan endpoint'ler için thread havuzu (FFmpeg, indirme, boto3)
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "8"))
+
+# Kalıcı İş Kuyruğu (SQLite)
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))  # Heartbeat gelmezse iş yeniden kuyruğa alınır
+
+# Altyazı Kelime Hizalama (TTS sesinden enerji/hece tabanlı, model gerektirmez)
+# Varsayılan kapalı: seslendirilen hece sayısı metinden saparsa hata birikir (benchmark_alignment.py)
+SUBTITLE_ALIGNMENT = os.getenv("SUBTITLE_ALIGNMENT", "false").lower() == "true"  # false: kelimeler süreye eşit bölünür
+
+# Altyazı Render Modu: "ass" (libass her karede çizer) veya "overlay" (önceden çizilmiş sprite'lar)
+SUBTITLE_MODE = os.getenv("SUBTITLE_MODE", "ass")
+if SUBTITLE_MODE not in ("ass", "overlay"):
+    print(f"⚠️ Geçersiz SUBTITLE_MODE={SUBTITLE_MODE!r}, 'ass' kullanılıyor")
+    SUBTITLE_MODE = "ass"
+SUBTITLE_SPRITE_DIR = os.getenv("SUBTITLE_SPRITE_DIR", "/tmp/subtitle_sprites")
+SUBTITLE_SPRITE_MAX_MB = float(os.getenv("SUBTITLE_SPRITE_MAX_MB", "500"))  # Aşılınca en eski kullanılan sprite'lar silinir
+SUBTITLE_FONT = os.getenv("SUBTITLE_FONT", "")  # Boşsa sistemdeki kalın fontlardan biri
@@ -10,11 +10,13 @@ import sys
 
 # Config
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from config import API_PORT
+from config import API_PORT, JOB_WORKERS
 
 # Routes
 from routes.video import router as video_router
 from routes.performance import router as performance_router
+from services import job_queue
+from services.encoder_service import detect_encoders
 
 # FastAPI App
 app = FastAPI(
@@ -37,6 +39,24 @@ app.include_router(video_router)
 app.include_router(performance_router)
 
 
+# Encoder tespiti (arka planda, sonuç cache'lenir)
+@app.on_event("startup")
+async def warm_encoder_cache():
+    import threading
+    threading.Thread(target=detect_encoders, daemon=True).start()
+
+
+# Kalıcı iş kuyruğu worker'ları
+@app.on_event("startup")
+async def start_job_workers():
+    job_queue.start_workers(JOB_WORKERS)
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    job_queue.stop_workers()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -45,14 +65,23 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "generate_async": "POST /api/video/generate",
+            "job_status": "GET /api/video/jobs/{id}",
+            "jobs": "GET /api/video/jobs",
             "generate_sync": "POST /api/video/generate-sync",
+            "generate_batch": "POST /api/video/generate-batch",
+            "render_job": "GET /api/video/render-jobs/{id}",
+            "render_pool": "GET /api/video/render-pool",
             "merge_video_audio": "POST /api/video/merge-video-audio",
+            "render_scene": "POST /api/video/render-scene",
             "concatenate": "POST /api/video/concatenate",
             "gpu_test": "POST /api/video/gpu-test",
+            "encoders": "GET /api/video/encoders",
+            "project_manifest": "GET /api/video/projects/{id}/manifest",
             "health": "GET /api/video/health",
             "performance_summary": "GET /api/performance/summary",
             "performance_project": "GET /api/performance/project/{id}",
             "performance_all": "GET /api/performance/projects",
+            "performance_render_cache": "GET /api/performance/render-cache",
             "performance_clear": "POST /api/performance/clear"
         }
     }
@@ -4,6 +4,7 @@ Zamanlamalar ve istatistikler için endpoint'ler
 """
 from fastapi import APIRouter
 from utils.timing import get_summary, get_project_stats, clear_log
+from services.render_cache import get_cache_stats
 
 router = APIRouter(prefix="/api/performance", tags=["performance"])
 
@@ -19,7 +20,8 @@ async def performance_summary():
     summary = get_summary()
     return {
         "success": True,
-        "summary": summary
+        "summary": summary,
+        "render_cache": get_cache_stats()
     }
 
 
@@ -57,6 +59,20 @@ async def all_projects_performance():
     }
 
 
+@router.get("/render-cache")
+async def render_cache_stats():
+    """
+    Render cache istatistikleri
+
+    Returns:
+        Hit/miss sayaçları, hit oranı ve disk kullanımı
+    """
+    return {
+        "success": True,
+        "render_cache": get_cache_stats()
+    }
+
+
 @router.post("/clear")
 async def clear_performance_log():
     """
@@ -1,16 +1,17 @@
 """
 Video API Routes
 """
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional, List
-import requests
+from typing import Optional, List, Literal
 import os
 import sys
 
 # Services
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.video_service import process_video, merge_video_with_audio, concatenate_videos
+from services.video_service import process_video, merge_video_with_audio, render_scene, concatenate_videos, VIDEO_WRITERS
+from services import job_queue
+from utils.executor import run_blocking, get_executor_stats
 
 router = APIRouter(prefix="/api/video", tags=["video"])
 
@@ -32,6 +33,8 @@ class GenerateVideoRequest(BaseModel):
     project_id: Optional[str | int] = None
     scene_number: Optional[int] = None
     skip_cdn: Optional[bool] = False
+    writer: Optional[str] = "moviepy"  # moviepy, ffmpeg_pipe, filtergraph
+    priority: Optional[int] = 0  # Kuyrukta büyük olan önce çalışır
 
 
 class MergeVideoAudioRequest(BaseModel):
@@ -39,96 +42,120 @@ class MergeVideoAudioRequest(BaseModel):
     audio_url: str
     scene_id: str | int
     narration: Optional[str] = None
+    word_timings: Optional[List[SubtitleItem]] = None  # Gerçek kelime zamanları (yoksa TTS sesinden hizalanır)
+    subtitle_mode: Optional[Literal["ass", "overlay"]] = None  # Verilmezse SUBTITLE_MODE
     callback_url: Optional[str] = None
     project_id: Optional[str | int] = None
     scene_number: Optional[int] = None
     skip_cdn: Optional[bool] = False
 
 
+class RenderSceneRequest(BaseModel):
+    image_url: str
+    audio_url: str
+    scene_id: str | int
+    narration: Optional[str] = None
+    word_timings: Optional[List[SubtitleItem]] = None  # Gerçek kelime zamanları (yoksa TTS sesinden hizalanır)
+    subtitle_mode: Optional[Literal["ass", "overlay"]] = None  # Verilmezse SUBTITLE_MODE
+    pan_direction: Optional[str] = "vertical"
+    duration: Optional[float] = None  # Verilmezse ses süresi
+    project_id: Optional[str | int] = None
+    scene_number: Optional[int] = None
+    skip_cdn: Optional[bool] = False
+
+
+class BatchSceneItem(BaseModel):
+    image_url: str
+    scene_id: str | int
+    scene_number: Optional[int] = None
+    duration: Optional[int] = 10
+    pan_direction: Optional[str] = "vertical"
+
+
+class GenerateBatchRequest(BaseModel):
+    project_id: str | int
+    scenes: List[BatchSceneItem]
+    writer: Optional[str] = "moviepy"
+    skip_cdn: Optional[bool] = False
+    wait: Optional[bool] = True  # False ise job ID'leri hemen döner
+
+
 class GenerateVideoResponse(BaseModel):
     success: bool
     message: str
     scene_id: str | int
+    job_id: Optional[str] = None
 
 
-# Background task - Video işleme ve callback
-def process_video_task(
-    image_url: str,
-    scene_id: str,
-    duration: int,
-    pan_direction: str,
-    subtitles: list,
-    callback_url: str,
-    project_id: str = None,
-    scene_number: int = None
-):
-    """Arka planda video işle ve callback yap"""
-    print(f"\n🔄 Background task başlatıldı: {scene_id}")
-    
-    # Subtitles'ı dict listesine çevir
-    subtitle_dicts = None
-    if subtitles:
-        subtitle_dicts = [{"start": s.start, "end": s.end, "text": s.text} for s in subtitles]
-    
-    # Video işle
-    result = process_video(
-        image_url=image_url,
-        scene_id=scene_id,
-        duration=duration,
-        pan_direction=pan_direction,
-        subtitles=subtitle_dicts,
-        project_id=project_id,
-        scene_number=scene_number
-    )
-    
-    # Callback yap (Node.js'e haber ver)
-    if callback_url:
-        try:
-            print(f"\n📤 Callback gönderiliyor: {callback_url}")
-            payload = {
-                "scene_id": scene_id,
-                "status": "completed" if result["success"] else "failed",
-                "video_url": result.get("video_url"),
-                "error": result.get("error")
-            }
-            response = requests.post(callback_url, json=payload, timeout=10)
-            print(f"✅ Callback başarılı: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Callback hatası: {str(e)}")
-    
-    return result
+def word_timing_dicts(items: Optional[List[SubtitleItem]]) -> Optional[list]:
+    """SubtitleItem listesi → altyazı servisinin beklediği dict listesi"""
+    if not items:
+        return None
+    return [{"start": w.start, "end": w.end, "text": w.text} for w in items]
 
 
 # Endpoints
 @router.post("/generate", response_model=GenerateVideoResponse)
-async def generate_video(request: GenerateVideoRequest, background_tasks: BackgroundTasks):
-    """Video üretimini başlat (async)"""
+async def generate_video(request: GenerateVideoRequest):
+    """Video üretimini kalıcı kuyruğa ekle (async), durum GET /jobs/{job_id} ile izlenir"""
     if not request.image_url:
         raise HTTPException(status_code=400, detail="image_url gerekli")
     
     if not request.scene_id:
         raise HTTPException(status_code=400, detail="scene_id gerekli")
     
-    # İşlemi arka plana at
-    background_tasks.add_task(
-        process_video_task,
-        request.image_url,
-        request.scene_id,
-        request.duration,
-        request.pan_direction,
-        request.subtitles,
-        request.callback_url,
-        str(request.project_id) if request.project_id else None,
-        request.scene_number
+    if request.writer not in VIDEO_WRITERS:
+        raise HTTPException(status_code=400, detail=f"writer şunlardan biri olmalı: {', '.join(VIDEO_WRITERS)}")
+    
+    # Subtitles'ı dict listesine çevir
+    subtitle_dicts = None
+    if request.subtitles:
+        subtitle_dicts = [{"start": s.start, "end": s.end, "text": s.text} for s in request.subtitles]
+    
+    # İşi kuyruğa ekle (worker process'ler çeker)
+    job_id = await run_blocking(
+        job_queue.enqueue,
+        "generate",
+        {
+            "image_url": request.image_url,
+            "scene_id": request.scene_id,
+            "duration": request.duration,
+            "pan_direction": request.pan_direction,
+            "subtitles": subtitle_dicts,
+            "project_id": str(request.project_id) if request.project_id else None,
+            "scene_number": request.scene_number,
+            "skip_cdn": request.skip_cdn,
+            "writer": request.writer
+        },
+        priority=request.priority,
+        callback_url=request.callback_url
     )
     
     return GenerateVideoResponse(
         success=True,
-        message="Video üretimi başlatıldı",
-        scene_id=request.scene_id
+        message="Video üretimi kuyruğa alındı",
+        scene_id=request.scene_id,
+        job_id=job_id
     )
 
 
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Kuyruktaki işin durumu (status, progress %, result)"""
+    job = await run_blocking(job_queue.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+
+@router.get("/jobs")
+async def list_jobs(status: Optional[str] = None, project_id: Optional[str] = None, limit: int = 100):
+    """İşleri listele (status / project_id filtreli) + kuyruk özeti"""
+    jobs = await run_blocking(job_queue.list_jobs, status=status, project_id=project_id, limit=limit)
+    stats = await run_blocking(job_queue.get_queue_stats)
+    return {"stats": stats, "jobs": jobs}
+
+
 @router.post("/generate-sync")
 async def generate_video_sync(request: GenerateVideoRequest):
     """Video üretimini senkron çalıştır (test için)"""
@@ -138,13 +165,17 @@ async def generate_video_sync(request: GenerateVideoRequest):
     if not request.scene_id:
         raise HTTPException(status_code=400, detail="scene_id gerekli")
     
+    if request.writer not in VIDEO_WRITERS:
+        raise HTTPException(status_code=400, detail=f"writer şunlardan biri olmalı: {', '.join(VIDEO_WRITERS)}")
+    
     # Subtitles'ı dict listesine çevir
     subtitle_dicts = None
     if request.subtitles:
         subtitle_dicts = [{"start": s.start, "end": s.end, "text": s.text} for s in request.subtitles]
     
     # Video işle (senkron)
-    result = process_video(
+    result = await run_blocking(
+        process_video,
         image_url=request.image_url,
         scene_id=request.scene_id,
         duration=request.duration,
@@ -152,12 +183,92 @@ async def generate_video_sync(request: GenerateVideoRequest):
         subtitles=subtitle_dicts,
         project_id=str(request.project_id) if request.project_id else None,
         scene_number=request.scene_number,
-        skip_cdn=request.skip_cdn
+        skip_cdn=request.skip_cdn,
+        writer=request.writer
     )
     
     return result
 
 
+@router.post("/generate-batch")
+async def generate_batch(request: GenerateBatchRequest):
+    """
+    Projedeki sahneleri render havuzunda paralel üret.
+    
+    - Kuyruk kapasitesi yetmezse 429 döner (hiçbir sahne gönderilmez)
+    - wait=True: tüm sahneler bitince sahne bazlı sonuç + süreler döner
+    - wait=False: job ID'leri hemen döner, durum GET /render-jobs/{id} ile izlenir
+    """
+    import asyncio
+    from services.render_pool import submit_batch, get_job, RenderQueueFullError
+    from utils.timing import Timer
+    
+    if not request.scenes:
+        raise HTTPException(status_code=400, detail="scenes listesi boş olamaz")
+    
+    if request.writer not in VIDEO_WRITERS:
+        raise HTTPException(status_code=400, detail=f"writer şunlardan biri olmalı: {', '.join(VIDEO_WRITERS)}")
+    
+    project_id = str(request.project_id)
+    scenes = [
+        {
+            "image_url": scene.image_url,
+            "scene_id": scene.scene_id,
+            "duration": scene.duration,
+            "pan_direction": scene.pan_direction,
+            "project_id": project_id,
+            "scene_number": scene.scene_number,
+            "skip_cdn": request.skip_cdn,
+            "writer": request.writer
+        }
+        for scene in request.scenes
+    ]
+    
+    print(f"\n🏭 Toplu render: {len(scenes)} sahne (Proje: {project_id})")
+    
+    with Timer("PY_RENDER_POOL_BATCH", {"project_id": project_id, "count": len(scenes)}):
+        try:
+            submitted = submit_batch(scenes)
+        except RenderQueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        
+        if request.wait:
+            await asyncio.gather(
+                *[asyncio.wrap_future(future) for _, future in submitted],
+                return_exceptions=True
+            )
+    
+    jobs = [get_job(job_id) for job_id, _ in submitted]
+    
+    return {
+        "success": all(job["status"] == "completed" for job in jobs) if request.wait else True,
+        "project_id": project_id,
+        "batch_id": jobs[0]["batch_id"],
+        "total": len(jobs),
+        "completed": sum(1 for job in jobs if job["status"] == "completed"),
+        "failed": sum(1 for job in jobs if job["status"] == "failed"),
+        "jobs": jobs
+    }
+
+
+@router.get("/render-jobs/{job_id}")
+async def render_job_status(job_id: str):
+    """Render havuzundaki işin durumu"""
+    from services.render_pool import get_job
+    
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+
+@router.get("/render-pool")
+async def render_pool_stats():
+    """Render havuzu durumu (worker, kuyruk, iş sayıları)"""
+    from services.render_pool import get_pool_stats
+    return get_pool_stats()
+
+
 @router.post("/merge-video-audio")
 async def merge_video_audio_endpoint(request: MergeVideoAudioRequest):
     """Sessiz video ile sesi birleştir (senkron)"""
@@ -171,14 +282,47 @@ async def merge_video_audio_endpoint(request: MergeVideoAudioRequest):
         raise HTTPException(status_code=400, detail="scene_id gerekli")
     
     # Birleştir
-    result = merge_video_with_audio(
+    result = await run_blocking(
+        merge_video_with_audio,
         video_url=request.video_url,
         audio_url=request.audio_url,
         scene_id=request.scene_id,
         narration=request.narration,
         project_id=str(request.project_id) if request.project_id else None,
         scene_number=request.scene_number,
-        skip_cdn=request.skip_cdn
+        skip_cdn=request.skip_cdn,
+        word_timings=word_timing_dicts(request.word_timings),
+        subtitle_mode=request.subtitle_mode
+    )
+    
+    return result
+
+
+@router.post("/render-scene")
+async def render_scene_endpoint(request: RenderSceneRequest):
+    """Resim + ses + altyazı → tek encode ile birleşik sahne (senkron)"""
+    if not request.image_url:
+        raise HTTPException(status_code=400, detail="image_url gerekli")
+    
+    if not request.audio_url:
+        raise HTTPException(status_code=400, detail="audio_url gerekli")
+    
+    if not request.scene_id:
+        raise HTTPException(status_code=400, detail="scene_id gerekli")
+    
+    result = await run_blocking(
+        render_scene,
+        image_url=request.image_url,
+        audio_url=request.audio_url,
+        scene_id=request.scene_id,
+        narration=request.narration,
+        pan_direction=request.pan_direction,
+        duration=request.duration,
+        project_id=str(request.project_id) if request.project_id else None,
+        scene_number=request.scene_number,
+        skip_cdn=request.skip_cdn,
+        word_timings=word_timing_dicts(request.word_timings),
+        subtitle_mode=request.subtitle_mode
     )
     
     return result
@@ -204,7 +348,8 @@ async def concatenate_videos_endpoint(request: ConcatenateVideosRequest):
     if not request.project_id:
         raise HTTPException(status_code=400, detail="project_id gerekli")
     
-    result = concatenate_videos(
+    result = await run_blocking(
+        concatenate_videos,
         video_urls=request.video_urls,
         project_id=request.project_id
     )
@@ -240,7 +385,8 @@ async def gpu_test_endpoint(request: GpuTestRequest):
     if request.target_duration_seconds < 10:
         raise HTTPException(status_code=400, detail="target_duration_seconds en az 10 olmalı")
     
-    result = gpu_test_loop_videos(
+    result = await run_blocking(
+        gpu_test_loop_videos,
         video_urls=request.video_urls,
         target_duration_seconds=request.target_duration_seconds,
         test_name=request.test_name
@@ -259,7 +405,7 @@ class DownloadToLocalRequest(BaseModel):
 @router.post("/download-to-local")
 async def download_to_local(request: DownloadToLocalRequest):
     """Harici URL'i proje dizinine indir (CDN atlama)"""
-    from services.video_service import get_project_dir, download_file
+    from services.video_service import get_project_dir, download_file, register_artifact
     
     try:
         project_dir = get_project_dir(str(request.project_id))
@@ -268,7 +414,10 @@ async def download_to_local(request: DownloadToLocalRequest):
         print(f"📥 İndiriliyor: {request.url[:80]}...")
         print(f"📂 Hedef: {local_path}")
         
-        download_file(request.url, local_path)
+        await run_blocking(download_file, request.url, local_path)
+        # Manifest'e kaynak URL ile yaz: sonraki adımlar aynı URL'i lokalden çözer, tekrar yüklenmez
+        await run_blocking(register_artifact, str(request.project_id), artifact_kind(request.filename),
+                           local_path, cdn_url=request.url)
         
         print(f"✅ İndirildi: {local_path}")
         
@@ -285,10 +434,24 @@ async def download_to_local(request: DownloadToLocalRequest):
         }
 
 
+def artifact_kind(filename: str) -> str:
+    """Dosya uzantısından manifest artifact tipi"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".png", ".jpg", ".jpeg", ".webp"):
+        return "image"
+    if ext in (".mp3", ".wav", ".m4a", ".aac", ".ogg"):
+        return "audio"
+    if ext == ".mp4":
+        return "video"
+    return "file"
+
+
 # Toplu CDN Upload - Proje dosyalarını CDN'e yükle
 class UploadProjectAssetsRequest(BaseModel):
     project_id: str | int
-    files: List[dict]  # [{"local_path": "...", "type": "image|video|merged", "scene_number": 1}]
+    # [{"local_path": "...", "type": "image|video|merged", "scene_number": 1}]
+    # Boş bırakılırsa liste proje manifest'inden oluşturulur
+    files: List[dict] = []
 
 
 class FileUploadItem(BaseModel):
@@ -303,70 +466,120 @@ async def upload_project_assets(request: UploadProjectAssetsRequest):
     Proje dosyalarını toplu CDN'e yükle.
     Pipeline sonunda çağrılır - tüm lokal dosyaları CDN'e yükler.
     """
-    from services.cdn_service import upload_file
+    return await run_blocking(upload_project_assets_sync, request)
+
+
+# Manifest'ten toplu upload'a giren artifact tipleri (ses hariç)
+UPLOADABLE_KINDS = ["image", "video", "merged"]
+
+
+def _record_upload(project_id: str, upload: dict):
+    """Toplu upload sonucunu manifest'e yaz"""
+    import project_store
+    try:
+        if not project_store.set_cdn_url(project_id, upload["local_path"], upload["cdn_url"]):
+            project_store.register(project_id, upload["type"], upload["local_path"],
+                                   upload["scene_number"], cdn_url=upload["cdn_url"])
+    except Exception as e:
+        print(f"⚠️ Manifest güncellenemedi: {e}")
+
+
+def upload_project_assets_sync(request: UploadProjectAssetsRequest) -> dict:
+    """upload_project_assets gövdesi (thread havuzunda çalışır)"""
+    from services.batch_uploader import upload_batch
+    from services.upload_behind import asset_key, claim_upload
+    import project_store
     import time
     
     project_id = str(request.project_id)
-    results = []
-    failed = 0
+    timestamp = int(time.time())
+    
+    files = request.files
+    if not files:
+        files = [
+            {"local_path": a["path"], "type": a["kind"], "scene_number": a["scene_number"]}
+            for a in project_store.list_artifacts(project_id, kinds=UPLOADABLE_KINDS)
+        ]
+    items = []
+    ordered = []  # Giriş sırası: arka planda yüklenenler hazır, None = toplu upload'tan gelecek
+    missing = 0
     
     print(f"\n☁️ ========== TOPLU CDN UPLOAD ==========")
     print(f"📁 Proje: {project_id}")
-    print(f"📦 Dosya sayısı: {len(request.files)}")
+    print(f"📦 Dosya sayısı: {len(files)}{'' if request.files else ' (manifest)'}")
     print(f"==========================================\n")
     
-    for item in request.files:
+    for item in files:
         local_path = item.get("local_path", "")
         file_type = item.get("type", "unknown")
         scene_number = item.get("scene_number", 0)
         
         if not os.path.exists(local_path):
             print(f"⚠️ Dosya bulunamadı: {local_path}")
-            failed += 1
+            missing += 1
             continue
         
-        try:
-            timestamp = int(time.time())
-            scene_tag = str(scene_number).zfill(3)
-            
-            # Dosya tipine göre key ve content_type belirle
-            if file_type == "image":
-                ext = os.path.splitext(local_path)[1] or ".png"
-                key = f"images/{project_id}_scene_{scene_tag}_{timestamp}{ext}"
-                content_type = "image/png"
-            elif file_type == "video":
-                key = f"videos/{project_id}_scene_{scene_tag}_{timestamp}.mp4"
-                content_type = "video/mp4"
-            elif file_type == "merged":
-                key = f"videos/{project_id}_merged_{scene_tag}_{timestamp}.mp4"
-                content_type = "video/mp4"
-            else:
-                key = f"files/{project_id}_{scene_tag}_{timestamp}"
-                content_type = "application/octet-stream"
-            
-            cdn_url = upload_file(local_path, key, content_type)
-            
+        # Arka planda (upload-behind) yüklendiyse tekrar yükleme
+        cdn_url = claim_upload(local_path, project_id)
+        if cdn_url:
+            ordered.append({"success": True, "cdn_url": cdn_url, "prefetched": True,
+                            "type": file_type, "scene_number": scene_number, "local_path": local_path})
+            continue
+        
+        key, content_type = asset_key(project_id, file_type, scene_number, local_path, timestamp)
+        
+        items.append({
+            "local_path": local_path,
+            "key": key,
+            "content_type": content_type,
+            "type": file_type,
+            "scene_number": scene_number,
+            "project_id": project_id
+        })
+        ordered.append(None)
+    
+    # Paralel yükle - sonuçlar giriş sırasıyla döner
+    batch = upload_batch(items)
+    batch_results = iter(batch["results"])
+    results = []
+    errors = []
+    
+    for upload in ordered:
+        upload = upload or next(batch_results)
+        if upload["success"]:
+            if not upload.get("prefetched"):
+                _record_upload(project_id, upload)
             results.append({
-                "scene_number": scene_number,
-                "type": file_type,
-                "cdn_url": cdn_url,
-                "local_path": local_path
+                "scene_number": upload["scene_number"],
+                "type": upload["type"],
+                "cdn_url": upload["cdn_url"],
+                "local_path": upload["local_path"]
             })
-            
-            print(f"✅ [{file_type}] Sahne {scene_number} → {cdn_url}")
-            
-        except Exception as e:
-            print(f"❌ [{file_type}] Sahne {scene_number} yükleme hatası: {str(e)}")
-            failed += 1
+            source = "arka plan" if upload.get("prefetched") else "toplu"
+            print(f"✅ [{upload['type']}] Sahne {upload['scene_number']} → {upload['cdn_url']} ({source})")
+        else:
+            errors.append({
+                "scene_number": upload["scene_number"],
+                "type": upload["type"],
+                "local_path": upload["local_path"],
+                "error": upload["error"],
+                "attempts": upload["attempts"]
+            })
+            print(f"❌ [{upload['type']}] Sahne {upload['scene_number']} yükleme hatası: {upload['error']}")
     
-    print(f"\n🎉 Toplu upload tamamlandı: {len(results)} başarılı, {failed} başarısız\n")
+    failed = missing + len(errors)
+    metrics = {**batch["metrics"], "prefetched": sum(1 for u in ordered if u)}
+    print(f"\n🎉 Toplu upload tamamlandı: {len(results)} başarılı, {failed} başarısız "
+          f"({metrics['total_mb']} MB, {metrics['wall_sec']}s, {metrics['throughput_mbps']} MB/s)\n")
     
     return {
         "success": True,
         "uploads": results,
-        "total": len(request.files),
+        "errors": errors,
+        "total": len(files),
         "uploaded": len(results),
-        "failed": failed
+        "failed": failed,
+        "metrics": metrics
     }
 
 
@@ -377,13 +590,18 @@ class CleanupProjectRequest(BaseModel):
 @router.post("/cleanup-project")
 async def cleanup_project(request: CleanupProjectRequest):
     """Pipeline sonunda proje dizinini temizle"""
-    import shutil
-    from services.video_service import get_project_dir
+    return await run_blocking(cleanup_project_sync, request)
+
+
+def cleanup_project_sync(request: CleanupProjectRequest) -> dict:
+    """cleanup_project gövdesi (thread havuzunda çalışır)"""
+    import project_store
+    from services.upload_behind import forget_project
     
-    project_dir = get_project_dir(str(request.project_id))
+    project_dir = os.path.join(project_store.PROJECTS_DIR, str(request.project_id))
+    forget_project(request.project_id)
     
-    if os.path.exists(project_dir):
-        shutil.rmtree(project_dir)
+    if project_store.remove_project(request.project_id):
         print(f"🧹 Proje dosyaları temizlendi: {project_dir}")
         return {"success": True, "message": f"Proje dizini silindi: {project_dir}"}
     else:
@@ -400,9 +618,14 @@ class ConcatAudioRequest(BaseModel):
 @router.post("/concat-audio")
 async def concat_audio(request: ConcatAudioRequest):
     """Birden fazla ses dosyasını FFmpeg ile birleştir"""
+    return await run_blocking(concat_audio_sync, request)
+
+
+def concat_audio_sync(request: ConcatAudioRequest) -> dict:
+    """concat_audio gövdesi (thread havuzunda çalışır)"""
     import subprocess
-    import json
-    from services.video_service import get_project_dir
+    from services.video_service import get_project_dir, register_artifact
+    from services.media_info import get_duration
 
     project_dir = get_project_dir(str(request.project_id))
     output_path = os.path.join(project_dir, request.output_filename)
@@ -457,14 +680,12 @@ async def concat_audio(request: ConcatAudioRequest):
         # Süreyi al
         duration = None
         try:
-            probe_cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', output_path]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            probe_data = json.loads(probe_result.stdout)
-            duration = float(probe_data['format']['duration'])
+            duration = get_duration(output_path)
         except:
             pass
 
         print(f"✅ Ses birleştirme tamamlandı: {output_path}")
+        register_artifact(str(request.project_id), "audio", output_path)
         if duration:
             print(f"⏱️ Toplam süre: {duration:.2f}s")
 
@@ -489,8 +710,32 @@ async def concat_audio(request: ConcatAudioRequest):
         }
 
 
+@router.get("/projects/{project_id}/manifest")
+async def project_manifest(project_id: str, sha256: bool = False):
+    """Proje artifact manifest'i (path, boyut, CDN URL; sha256=true: eksik sha256'lar hesaplanır)"""
+    import project_store
+    artifacts = await run_blocking(project_store.list_artifacts, project_id, None, sha256)
+    return {"success": True, "project_id": project_id, "artifacts": artifacts}
+
+
+@router.get("/encoders")
+async def list_encoders():
+    """Tespit edilen encoder'lar ve işlerde kullanılacak seçim"""
+    from services.encoder_service import detect_encoders, pick_encoder
+    
+    available = await run_blocking(detect_encoders)
+    selected = await run_blocking(pick_encoder)
+    return {"available": available, "selected": selected["name"]}
+
+
 @router.get("/health")
 async def health_check():
     """API sağlık kontrolü"""
-    return {"status": "ok", "service": "video-generator"}
+    from services.upload_behind import get_upload_behind_stats
+    return {
+        "status": "ok",
+        "service": "video-generator",
+        "executor": get_executor_stats(),
+        "upload_behind": get_upload_behind_stats()
+    }
 
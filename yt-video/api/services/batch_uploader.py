@@ -0,0 +1,116 @@
+"""
+Toplu CDN Upload Motoru
+Dosyaları sınırlı bir thread havuzunda paralel yükler; her dosya
+üstel bekleme ile tekrar denenir, sonuçlar giriş sırasıyla döner.
+"""
+import os
+import sys
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from config import UPLOAD_WORKERS, UPLOAD_RETRIES
+from services.cdn_service import upload_file
+from utils.timing import Timer
+
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 15.0
+
+
+def upload_with_retry(local_path: str, key: str, content_type: str,
+                      retries: int = UPLOAD_RETRIES, meta: dict = None) -> dict:
+    """
+    Tek dosyayı yükle, hata olursa üstel bekleme (+ jitter) ile tekrar dene.
+
+    Returns:
+        {"success", "cdn_url", "error", "attempts", "bytes", "duration_ms"}
+    """
+    size = os.path.getsize(local_path) if os.path.exists(local_path) else 0
+    start = time.time()
+    last_error = None
+    attempt = 0
+
+    with Timer("PY_CDN_UPLOAD_FILE", {**(meta or {}), "key": key, "size_mb": round(size / (1024 * 1024), 2)}) as timer:
+        for attempt in range(1, retries + 1):
+            try:
+                cdn_url = upload_file(local_path, key, content_type)
+                timer.metadata["attempts"] = attempt
+                return {
+                    "success": True,
+                    "cdn_url": cdn_url,
+                    "error": None,
+                    "attempts": attempt,
+                    "bytes": size,
+                    "duration_ms": int((time.time() - start) * 1000)
+                }
+            except FileNotFoundError as e:
+                # Tekrar denemenin anlamı yok
+                last_error = str(e)
+                break
+            except Exception as e:
+                last_error = str(e)
+                if attempt < retries:
+                    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                    delay *= random.uniform(0.5, 1.0)
+                    print(f"🔁 Upload tekrar denenecek ({attempt}/{retries}) {delay:.1f}s sonra: {key}")
+                    time.sleep(delay)
+
+        timer.metadata["attempts"] = attempt
+        timer.fail(last_error)
+        print(f"❌ Upload başarısız ({attempt} deneme): {key} - {last_error}")
+
+    return {
+        "success": False,
+        "cdn_url": None,
+        "error": last_error,
+        "attempts": attempt,
+        "bytes": size,
+        "duration_ms": int((time.time() - start) * 1000)
+    }
+
+
+def upload_batch(items: list, max_workers: int = UPLOAD_WORKERS, retries: int = UPLOAD_RETRIES) -> dict:
+    """
+    Dosya listesini paralel yükle.
+
+    Args:
+        items: [{"local_path", "key", "content_type", ...}] - ek alanlar sonuca kopyalanır
+        max_workers: Aynı anda yüklenecek en fazla dosya
+        retries: Dosya başına deneme sayısı
+
+    Returns:
+        {"results": [...] (giriş sırasıyla), "metrics": {...}}
+    """
+    start = time.time()
+    workers = max(1, min(max_workers, len(items) or 1))
+
+    def run(item):
+        meta = {k: v for k, v in item.items() if k not in ("local_path", "key", "content_type")}
+        outcome = upload_with_retry(item["local_path"], item["key"], item["content_type"], retries, meta)
+        return {**item, **outcome}
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cdn-upload") as executor:
+        results = list(executor.map(run, items))
+
+    wall_sec = time.time() - start
+    uploaded = [r for r in results if r["success"]]
+    total_bytes = sum(r["bytes"] for r in uploaded)
+    serial_sec = sum(r["duration_ms"] for r in results) / 1000
+
+    metrics = {
+        "files": len(items),
+        "uploaded": len(uploaded),
+        "failed": len(items) - len(uploaded),
+        "retries": sum(r["attempts"] - 1 for r in results),
+        "workers": workers,
+        "total_mb": round(total_bytes / (1024 * 1024), 2),
+        "wall_sec": round(wall_sec, 2),
+        "throughput_mbps": round(total_bytes / (1024 * 1024) / wall_sec, 2) if wall_sec > 0 else 0,
+        "files_per_sec": round(len(uploaded) / wall_sec, 2) if wall_sec > 0 else 0,
+        "speedup": round(serial_sec / wall_sec, 2) if wall_sec > 0 else 0
+    }
+    return {"results": results, "metrics": metrics}
@@ -1,10 +1,13 @@
 """
 R2 CDN Servisi - Video/Resim yükleme
+Process başına tek (thread-safe) boto3 client; büyük dosyalar multipart yüklenir.
 """
 import os
 import sys
+import threading
 import boto3
 from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
 
 # API dizinine path ekle
 API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -15,22 +18,60 @@ from config import (
     R2_ACCESS_KEY_ID, 
     R2_SECRET_ACCESS_KEY,
     R2_BUCKET_NAME,
-    R2_PUBLIC_URL
+    R2_PUBLIC_URL,
+    R2_MAX_POOL_CONNECTIONS,
+    R2_MULTIPART_THRESHOLD_MB,
+    R2_MULTIPART_CHUNK_MB,
+    R2_UPLOAD_CONCURRENCY
 )
 
+MB = 1024 * 1024
 
-def get_s3_client():
-    """R2 S3 client oluştur"""
+# Multipart ayarları - eşik altındaki dosyalar tek put_object ile gider
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=R2_MULTIPART_THRESHOLD_MB * MB,
+    multipart_chunksize=R2_MULTIPART_CHUNK_MB * MB,
+    max_concurrency=R2_UPLOAD_CONCURRENCY,
+    use_threads=True
+)
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def create_s3_client(endpoint_url: str = None):
+    """Yeni R2 S3 client oluştur (bağlantı havuzu ayarlı)"""
     return boto3.client(
         's3',
-        endpoint_url=R2_ENDPOINT,
+        endpoint_url=endpoint_url or R2_ENDPOINT,
         aws_access_key_id=R2_ACCESS_KEY_ID,
         aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-        config=Config(signature_version='s3v4'),
+        config=Config(
+            signature_version='s3v4',
+            max_pool_connections=R2_MAX_POOL_CONNECTIONS,
+            retries={'max_attempts': 5, 'mode': 'standard'},
+            tcp_keepalive=True
+        ),
         region_name='auto'
     )
 
 
+def get_s3_client():
+    """
+    Process genelinde paylaşılan R2 S3 client.
+    boto3 client'ları thread-safe; fork sonrası (render/job worker) yeniden oluşturulur.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = create_s3_client()
+                _client_pid = pid
+    return _client
+
+
 def upload_file(filepath: str, key: str, content_type: str = "video/mp4") -> str:
     """
     Dosyayı R2'ye yükle
@@ -60,13 +101,16 @@ def upload_file(filepath: str, key: str, content_type: str = "video/mp4") -> str
     try:
         client = get_s3_client()
         
-        with open(filepath, 'rb') as f:
-            client.put_object(
-                Bucket=R2_BUCKET_NAME,
-                Key=key,
-                Body=f,
-                ContentType=content_type
-            )
+        if file_size >= TRANSFER_CONFIG.multipart_threshold:
+            print(f"🧩 Multipart upload: {R2_MULTIPART_CHUNK_MB} MB parça, {R2_UPLOAD_CONCURRENCY} paralel")
+        
+        client.upload_file(
+            filepath,
+            R2_BUCKET_NAME,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=TRANSFER_CONFIG
+        )
         
         # URL oluştur
         url = f"{R2_PUBLIC_URL}/{key}"
@@ -0,0 +1,185 @@
+"""
+İndirme Yöneticisi - paylaşımlı HTTP bağlantı havuzu
+Keep-alive Session, büyük chunk'lar, sınırlı paralel indirme,
+bağlantı koparsa HTTP Range ile kaldığı yerden devam ve checksum doğrulama.
+"""
+import os
+import sys
+import re
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from config import DOWNLOAD_CONCURRENCY, DOWNLOAD_RETRIES, DOWNLOAD_CHUNK_MB, DOWNLOAD_POOL_SIZE
+
+CHUNK_SIZE = DOWNLOAD_CHUNK_MB * 1024 * 1024
+CONNECT_TIMEOUT = 10
+# Tek parça S3/R2 upload'larında ETag = içeriğin MD5'i
+MD5_ETAG = re.compile(r'^"?([0-9a-f]{32})"?$')
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+class ChecksumMismatchError(Exception):
+    """İndirilen dosyanın boyutu/hash'i beklenenle uyuşmuyor"""
+    pass
+
+
+def get_session() -> requests.Session:
+    """Process genelinde paylaşılan Session (fork sonrası yeniden oluşturulur)"""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=DOWNLOAD_POOL_SIZE, pool_maxsize=DOWNLOAD_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+                _session_pid = pid
+    return _session
+
+
+def _hash_existing(path: str, hashers: list) -> int:
+    """Devam edilecek .part dosyasının mevcut baytlarını hash'e ekle"""
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            for h in hashers:
+                h.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def _retryable(error: Exception) -> bool:
+    """Bağlantı kopması, zaman aşımı ve 5xx tekrar denenir; 4xx denenmez"""
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.Timeout
+    ))
+
+
+def download(url: str, dest_path: str, sha256: str = None, timeout: int = 60) -> str:
+    """
+    URL'i dest_path'e indir.
+
+    - Bağlantı koparsa sunucu Range destekliyorsa kaldığı yerden devam eder
+    - Content-Length ile boyut, sha256 verilmişse SHA-256, ETag MD5 ise MD5 doğrulanır
+      (sıkıştırma istenmez; sunucu yine de Content-Encoding gönderirse boyut ve ETag
+      atlanır, kopan indirme baştan başlar)
+    - Dosya önce .part olarak yazılır, doğrulanınca yerine taşınır
+
+    Returns:
+        dest_path
+    """
+    part_path = f"{dest_path}.part"
+    if os.path.exists(part_path):
+        os.remove(part_path)
+
+    session = get_session()
+    sha = hashlib.sha256()
+    md5 = hashlib.md5()
+    received = 0
+    total = None
+    etag_md5 = None
+    encoded = False
+    last_error = None
+
+    for attempt in range(1, DOWNLOAD_RETRIES + 1):
+        if encoded and received:
+            # Sunucu identity isteğine rağmen sıkıştırdıysa Range sıkıştırılmış gövdeye
+            # uygulanır, çözülmüş bayt sayısıyla devam edilemez - baştan indir
+            received = 0
+            sha, md5 = hashlib.sha256(), hashlib.md5()
+        # Sıkıştırma istenmez: Range, boyut ve ETag ham baytlara göre kalır
+        headers = {"Accept-Encoding": "identity"}
+        if received:
+            headers["Range"] = f"bytes={received}-"
+        try:
+            with session.get(url, stream=True, timeout=(CONNECT_TIMEOUT, timeout), headers=headers) as response:
+                response.raise_for_status()
+
+                if received and response.status_code != 206:
+                    # Sunucu Range desteklemiyor - baştan indir
+                    print(f"⚠️ Range desteklenmiyor, baştan indiriliyor: {url[:60]}")
+                    received = 0
+                    sha, md5 = hashlib.sha256(), hashlib.md5()
+
+                if not received:
+                    # Content-Encoding varsa uzunluk ve ETag sıkıştırılmış gövdeye ait -
+                    # iter_content çözülmüş baytları verir, ikisi de doğrulanamaz
+                    encoded = "Content-Encoding" in response.headers
+                    length = response.headers.get("Content-Length")
+                    total = int(length) if length and not encoded else None
+                    match = MD5_ETAG.match(response.headers.get("ETag", ""))
+                    etag_md5 = match.group(1) if match and not encoded else None
+
+                with open(part_path, 'ab' if received else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                        sha.update(chunk)
+                        md5.update(chunk)
+                        received += len(chunk)
+
+            if total is not None and received < total:
+                raise requests.exceptions.ChunkedEncodingError(f"Eksik veri: {received}/{total} bayt")
+            break
+
+        except Exception as e:
+            last_error = e
+            if not _retryable(e) or attempt == DOWNLOAD_RETRIES:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+            # Yazılan baytlar kesin olsun (yarım chunk kalmış olabilir)
+            if os.path.exists(part_path):
+                sha, md5 = hashlib.sha256(), hashlib.md5()
+                received = _hash_existing(part_path, [sha, md5])
+            resume_at = 0 if encoded else received
+            print(f"🔁 İndirme kesildi ({attempt}/{DOWNLOAD_RETRIES}), {resume_at} bayttan devam: {last_error}")
+            time.sleep(min(2 ** (attempt - 1), 8))
+
+    try:
+        if total is not None and received != total:
+            raise ChecksumMismatchError(f"Boyut uyuşmuyor: {received} != {total}")
+        if sha256 and sha.hexdigest() != sha256.lower():
+            raise ChecksumMismatchError(f"SHA-256 uyuşmuyor: {url[:60]}")
+        if etag_md5 and md5.hexdigest() != etag_md5:
+            raise ChecksumMismatchError(f"MD5 (ETag) uyuşmuyor: {url[:60]}")
+    except ChecksumMismatchError:
+        os.remove(part_path)
+        raise
+
+    os.replace(part_path, dest_path)
+    return dest_path
+
+
+def download_many(items: list, max_workers: int = DOWNLOAD_CONCURRENCY) -> list:
+    """
+    URL listesini paralel indir (en fazla max_workers aynı anda).
+
+    Args:
+        items: [(url, dest_path), ...]
+
+    Returns:
+        [dest_path, ...] - giriş sırasıyla. Herhangi biri başarısızsa hata fırlatır.
+    """
+    if not items:
+        return []
+    workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as executor:
+        return list(executor.map(lambda item: download(*item), items))
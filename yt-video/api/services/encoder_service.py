@@ -0,0 +1,161 @@
+"""
+Encoder Registry - FFmpeg encoder tespiti ve seçimi
+NVENC / QSV / VAAPI / libx264 / libx265 / libsvtav1 arasından
+makinede gerçekten çalışan en hızlısını seçer (CPU node'larda libx264'e düşer).
+"""
+import os
+import json
+import subprocess
+import threading
+
+# Zorla encoder seçimi (örn. VIDEO_ENCODER=libx264)
+FORCED_ENCODER = os.getenv("VIDEO_ENCODER")
+VAAPI_DEVICE = os.getenv("VAAPI_DEVICE", "/dev/dri/renderD128")
+CACHE_PATH = os.getenv("ENCODER_CACHE_PATH", "/tmp/encoder_cache.json")
+CPU_THREADS = str(os.cpu_count() or 4)
+
+# Her encoder için ayarlar - en hızlıdan en yavaşa (aile içinde öncelik sırası)
+ENCODERS = {
+    "h264_nvenc": {
+        "family": "h264",
+        "hardware": True,
+        "input_args": [],
+        "args": ['-c:v', 'h264_nvenc', '-preset', 'fast', '-b:v', '5M', '-maxrate', '8M', '-bufsize', '10M'],
+    },
+    "h264_qsv": {
+        "family": "h264",
+        "hardware": True,
+        "input_args": [],
+        "args": ['-c:v', 'h264_qsv', '-preset', 'veryfast', '-b:v', '5M', '-maxrate', '8M', '-bufsize', '10M'],
+    },
+    "h264_vaapi": {
+        "family": "h264",
+        "hardware": True,
+        "input_args": ['-vaapi_device', VAAPI_DEVICE],
+        "args": ['-vf', 'format=nv12,hwupload', '-c:v', 'h264_vaapi', '-b:v', '5M', '-maxrate', '8M'],
+    },
+    "libx264": {
+        "family": "h264",
+        "hardware": False,
+        "input_args": [],
+        "args": ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p', '-threads', CPU_THREADS],
+    },
+    "libx265": {
+        "family": "hevc",
+        "hardware": False,
+        "input_args": [],
+        "args": ['-c:v', 'libx265', '-preset', 'fast', '-crf', '24', '-pix_fmt', 'yuv420p', '-tag:v', 'hvc1'],
+    },
+    "libsvtav1": {
+        "family": "av1",
+        "hardware": False,
+        "input_args": [],
+        "args": ['-c:v', 'libsvtav1', '-preset', '8', '-crf', '32', '-pix_fmt', 'yuv420p'],
+    },
+}
+
+_available = None
+_lock = threading.Lock()
+
+
+def _ffmpeg_fingerprint() -> str:
+    """Cache anahtarı: ffmpeg binary yolu + mtime (ffmpeg güncellenirse yeniden test)"""
+    import shutil
+    path = shutil.which('ffmpeg') or 'ffmpeg'
+    try:
+        return f"{path}:{os.path.getmtime(path)}"
+    except OSError:
+        return path
+
+
+def _compiled_encoders() -> set:
+    """ffmpeg -encoders çıktısındaki encoder isimleri"""
+    result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True)
+    names = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith('V'):
+            names.add(parts[1])
+    return names
+
+
+def _test_encoder(name: str) -> bool:
+    """Tek karelik deneme encode - derlenmiş olması yetmez (örn. GPU yoksa NVENC)"""
+    config = ENCODERS[name]
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        *config["input_args"],
+        '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+        '-frames:v', '1',
+        *config["args"],
+        '-f', 'null', '-'
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        return result.returncode == 0
+    except Exception:
+        return False
+
+
+def detect_encoders(force: bool = False) -> list:
+    """
+    Çalışan encoder'ları tespit et. Sonuç process içinde ve diskte
+    (worker process'ler için) cache'lenir.
+
+    Returns:
+        Kullanılabilir encoder isimleri (öncelik sırasıyla)
+    """
+    global _available
+
+    with _lock:
+        if _available is not None and not force:
+            return _available
+
+        fingerprint = _ffmpeg_fingerprint()
+        if not force and os.path.exists(CACHE_PATH):
+            try:
+                with open(CACHE_PATH) as f:
+                    cached = json.load(f)
+                if cached.get("fingerprint") == fingerprint:
+                    _available = cached["encoders"]
+                    return _available
+            except Exception:
+                pass
+
+        print("🔍 FFmpeg encoder tespiti yapılıyor...")
+        compiled = _compiled_encoders()
+        _available = [name for name in ENCODERS if name in compiled and _test_encoder(name)]
+        print(f"✅ Kullanılabilir encoder'lar: {', '.join(_available) or 'yok'}")
+
+        try:
+            with open(CACHE_PATH, 'w') as f:
+                json.dump({"fingerprint": fingerprint, "encoders": _available}, f)
+        except Exception as e:
+            print(f"⚠️ Encoder cache yazılamadı: {e}")
+
+        return _available
+
+
+def pick_encoder(family: str = "h264") -> dict:
+    """
+    İş için encoder seç: VIDEO_ENCODER ile zorlanmadıysa ailedeki
+    ilk çalışan (en hızlı) encoder. Hiçbiri tespit edilemezse libx264.
+
+    Returns:
+        {"name", "hardware", "input_args", "args"}
+    """
+    available = detect_encoders()
+
+    if FORCED_ENCODER and FORCED_ENCODER in ENCODERS:
+        name = FORCED_ENCODER
+    else:
+        candidates = [n for n in available if ENCODERS[n]["family"] == family]
+        name = candidates[0] if candidates else "libx264"
+
+    config = ENCODERS[name]
+    return {
+        "name": name,
+        "hardware": config["hardware"],
+        "input_args": list(config["input_args"]),
+        "args": list(config["args"]),
+    }
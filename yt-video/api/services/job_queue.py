@@ -0,0 +1,350 @@
+"""
+Kalıcı İş Kuyruğu - SQLite
+BackgroundTasks yerine: işler diske yazılır, worker process'ler kuyruktan çeker.
+Restart/crash sonrası yarım kalan işler heartbeat zaman aşımıyla yeniden kuyruğa alınır.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import multiprocessing
+import requests
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from config import JOBS_DB_PATH, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_STALE_SECONDS
+
+POLL_INTERVAL = 0.5
+HEARTBEAT_INTERVAL = 10
+CALLBACK_RETRIES = 3
+
+JOB_STATUSES = ["queued", "running", "completed", "failed"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    callback_url TEXT,
+    project_id TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority DESC, created_at);
+"""
+
+_workers = []
+_stop_event = None
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(JOBS_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(JOBS_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def init_db():
+    """Tabloyu oluştur"""
+    conn = _connect()
+    try:
+        conn.executescript(_SCHEMA)
+    finally:
+        conn.close()
+
+
+def _row_to_job(row) -> dict:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["progress"] = round(job["progress"] * 100, 1)
+    return job
+
+
+def enqueue(kind: str, payload: dict, priority: int = 0, callback_url: str = None) -> str:
+    """
+    İşi kuyruğa ekle
+
+    Args:
+        kind: İş tipi (JOB_HANDLERS anahtarı)
+        payload: Handler parametreleri (JSON serileştirilebilir)
+        priority: Büyük olan önce çalışır
+        callback_url: İş bitince sonucun POST edileceği URL
+
+    Returns:
+        job_id
+    """
+    job_id = uuid.uuid4().hex[:16]
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, payload, status, priority, callback_url, project_id, created_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), priority, callback_url,
+             str(payload.get("project_id")) if payload.get("project_id") else None, time.time())
+        )
+    finally:
+        conn.close()
+    print(f"📥 İş kuyruğa eklendi: {job_id} ({kind}, öncelik {priority})")
+    return job_id
+
+
+def get_job(job_id: str) -> dict:
+    """İş kaydını döndür (yoksa None)"""
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _row_to_job(row) if row else None
+
+
+def list_jobs(status: str = None, project_id: str = None, limit: int = 100) -> list:
+    """İşleri listele (en yeni önce)"""
+    query = "SELECT * FROM jobs WHERE 1=1"
+    params = []
+    if status:
+        query += " AND status = ?"
+        params.append(status)
+    if project_id:
+        query += " AND project_id = ?"
+        params.append(str(project_id))
+    query += " ORDER BY created_at DESC LIMIT ?"
+    params.append(limit)
+
+    conn = _connect()
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+    return [_row_to_job(row) for row in rows]
+
+
+def get_queue_stats() -> dict:
+    """Durum bazlı iş sayıları"""
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+    finally:
+        conn.close()
+    counts = {status: 0 for status in JOB_STATUSES}
+    counts.update({row["status"]: row["count"] for row in rows})
+    return {"workers": JOB_WORKERS, "jobs": counts}
+
+
+def recover_stale_jobs(conn: sqlite3.Connection = None) -> int:
+    """
+    Heartbeat'i JOB_STALE_SECONDS'dan eski 'running' işleri yeniden kuyruğa al.
+    Deneme hakkı biten işler 'failed' olur.
+    """
+    own_conn = conn is None
+    conn = conn or _connect()
+    try:
+        cutoff = time.time() - JOB_STALE_SECONDS
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker yanıt vermedi (deneme hakkı bitti)', "
+            "finished_at = ? WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+            (time.time(), cutoff, JOB_MAX_ATTEMPTS)
+        )
+        recovered = conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, progress = 0 "
+            "WHERE status = 'running' AND heartbeat_at < ?",
+            (cutoff,)
+        ).rowcount
+        conn.execute("COMMIT")
+        if recovered:
+            print(f"♻️ {recovered} yarım kalmış iş yeniden kuyruğa alındı")
+        return recovered
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def _claim(conn: sqlite3.Connection, worker_id: str) -> dict:
+    """Kuyruktaki en öncelikli işi atomik olarak al"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority DESC, created_at LIMIT 1"
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+            "started_at = ?, heartbeat_at = ? WHERE id = ?",
+            (worker_id, now, now, row["id"])
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return _row_to_job(row)
+
+
+def _set_progress(job_id: str, progress: float):
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ?",
+            (max(0.0, min(1.0, progress)), time.time(), job_id)
+        )
+    finally:
+        conn.close()
+
+
+def _finish(job_id: str, result: dict):
+    status = "completed" if result.get("success") else "failed"
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, progress = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, 1.0 if status == "completed" else 0.0, json.dumps(result),
+             result.get("error"), time.time(), job_id)
+        )
+    finally:
+        conn.close()
+    return status
+
+
+def _send_callback(job: dict, result: dict):
+    """Sonucu callback_url'e gönder (üstel bekleme ile tekrar dener)"""
+    payload = {
+        "job_id": job["id"],
+        "scene_id": job["payload"].get("scene_id"),
+        "status": "completed" if result.get("success") else "failed",
+        "video_url": result.get("video_url") or result.get("merged_video_url"),
+        "error": result.get("error")
+    }
+    for attempt in range(1, CALLBACK_RETRIES + 1):
+        try:
+            print(f"\n📤 Callback gönderiliyor: {job['callback_url']} (deneme {attempt})")
+            response = requests.post(job["callback_url"], json=payload, timeout=10)
+            response.raise_for_status()
+            print(f"✅ Callback başarılı: {response.status_code}")
+            return
+        except Exception as e:
+            print(f"❌ Callback hatası: {str(e)}")
+            if attempt < CALLBACK_RETRIES:
+                time.sleep(2 ** attempt)
+
+
+def _handle_generate(payload: dict, on_progress) -> dict:
+    from services.video_service import process_video
+    return process_video(**payload, on_progress=on_progress)
+
+
+def _handle_render_scene(payload: dict, on_progress) -> dict:
+    from services.video_service import render_scene
+    return render_scene(**payload)
+
+
+# İş tipi → handler(payload, on_progress) -> sonuç dict
+JOB_HANDLERS = {
+    "generate": _handle_generate,
+    "render_scene": _handle_render_scene,
+}
+
+
+def _heartbeat_loop(job_id: str, stop: threading.Event):
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        try:
+            conn = _connect()
+            try:
+                conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ Heartbeat hatası: {e}")
+
+
+def _run_job(job: dict):
+    handler = JOB_HANDLERS.get(job["kind"])
+    print(f"\n🔄 İş başlatıldı: {job['id']} ({job['kind']}, deneme {job['attempts'] + 1})")
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat_loop, args=(job["id"], stop), daemon=True)
+    heartbeat.start()
+    try:
+        if handler is None:
+            result = {"success": False, "error": f"Bilinmeyen iş tipi: {job['kind']}"}
+        else:
+            result = handler(job["payload"], lambda p: _set_progress(job["id"], p))
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+    finally:
+        stop.set()
+
+    status = _finish(job["id"], result)
+    print(f"🏁 İş bitti: {job['id']} → {status}")
+
+    if job.get("callback_url"):
+        _send_callback(job, result)
+
+
+def worker_loop(worker_id: str, stop_event):
+    """Worker process ana döngüsü: kuyruktan iş çek ve çalıştır"""
+    print(f"👷 Job worker başladı: {worker_id} (pid {os.getpid()})")
+    conn = _connect()
+    last_recovery = 0
+    try:
+        while not stop_event.is_set():
+            if time.time() - last_recovery > HEARTBEAT_INTERVAL:
+                recover_stale_jobs(conn)
+                last_recovery = time.time()
+
+            job = _claim(conn, worker_id)
+            if job is None:
+                stop_event.wait(POLL_INTERVAL)
+                continue
+            _run_job(job)
+    finally:
+        conn.close()
+
+
+def start_workers(count: int = JOB_WORKERS):
+    """Worker process'leri başlat (API startup'ta)"""
+    global _stop_event
+    init_db()
+    recover_stale_jobs()
+
+    _stop_event = multiprocessing.Event()
+    for i in range(count):
+        worker_id = f"{os.getpid()}-{i}"
+        process = multiprocessing.Process(
+            target=worker_loop, args=(worker_id, _stop_event), name=f"job-worker-{i}", daemon=True
+        )
+        process.start()
+        _workers.append(process)
+    print(f"🏭 {count} job worker başlatıldı (DB: {JOBS_DB_PATH})")
+
+
+def stop_workers(timeout: float = 5):
+    """Worker'ları durdur (API shutdown'da). Yarım kalan işler sonra kurtarılır."""
+    if _stop_event is not None:
+        _stop_event.set()
+    for process in _workers:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+    _workers.clear()
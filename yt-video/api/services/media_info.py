@@ -0,0 +1,130 @@
+"""
+Media Info Servisi - ffprobe sonuçlarını cache'ler
+Her dosya bir kere probe edilir; sonuç path + boyut + mtime anahtarıyla
+bellekte (LRU) ve proje dizinindeki sidecar JSON'da tutulur, böylece
+pipeline adımları ve worker process'ler aynı dosyayı tekrar probe etmez.
+"""
+import os
+import sys
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from config import PROJECTS_DIR
+
+MAX_MEMORY_ENTRIES = 512
+SIDECAR_NAME = ".media_info.json"
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "sidecar_hits": 0, "probes": 0}
+
+
+def _file_key(path: str) -> tuple:
+    """Cache anahtarı: (mutlak path, boyut, mtime_ns) - dosya değişirse anahtar da değişir"""
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+def _sidecar_path(abs_path: str) -> str:
+    """Dosya /tmp/projects/<id>/ altındaysa o projenin sidecar dosyası, değilse None"""
+    projects_root = os.path.abspath(PROJECTS_DIR) + os.sep
+    if not abs_path.startswith(projects_root):
+        return None
+    project_id = abs_path[len(projects_root):].split(os.sep, 1)[0]
+    return os.path.join(projects_root, project_id, SIDECAR_NAME)
+
+
+def _read_sidecar(sidecar: str) -> dict:
+    try:
+        with open(sidecar) as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _write_sidecar(sidecar: str, abs_path: str, size: int, mtime_ns: int, info: dict):
+    """Sidecar'a ekle (atomik yazma - diğer process'lerin kayıtları korunur)"""
+    entries = _read_sidecar(sidecar)
+    entries[abs_path] = {"size": size, "mtime_ns": mtime_ns, "info": info}
+    tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, sidecar)
+    except Exception as e:
+        print(f"⚠️ Media info sidecar yazılamadı: {e}")
+
+
+def _remember(key: tuple, info: dict):
+    _cache[key] = info
+    _cache.move_to_end(key)
+    while len(_cache) > MAX_MEMORY_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def probe(path: str) -> dict:
+    """
+    Dosyanın ffprobe bilgisi (format + streams, extradata hash dahil).
+    Probe başarısızsa Exception fırlatır.
+
+    Returns:
+        {"format": {...}, "streams": [...]}
+    """
+    key = _file_key(path)
+    abs_path, size, mtime_ns = key
+
+    with _lock:
+        info = _cache.get(key)
+        if info is not None:
+            _cache.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return info
+
+    sidecar = _sidecar_path(abs_path)
+    if sidecar:
+        entry = _read_sidecar(sidecar).get(abs_path)
+        if entry and entry["size"] == size and entry["mtime_ns"] == mtime_ns:
+            with _lock:
+                _remember(key, entry["info"])
+                _stats["sidecar_hits"] += 1
+            return entry["info"]
+
+    probe_cmd = [
+        'ffprobe', '-v', 'quiet', '-print_format', 'json',
+        '-show_format', '-show_streams', '-show_data_hash', 'sha256', path
+    ]
+    probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
+    if probe_result.returncode != 0 or not probe_result.stdout.strip():
+        raise Exception(f"ffprobe hatası: {path}")
+    info = json.loads(probe_result.stdout)
+
+    with _lock:
+        _remember(key, info)
+        _stats["probes"] += 1
+        if sidecar:
+            _write_sidecar(sidecar, abs_path, size, mtime_ns, info)
+
+    return info
+
+
+def get_duration(path: str) -> float:
+    """Dosya süresi (saniye)"""
+    return float(probe(path)['format']['duration'])
+
+
+def get_stream(path: str, codec_type: str) -> dict:
+    """İlk video/audio stream bilgisi (yoksa None)"""
+    streams = probe(path).get("streams", [])
+    return next((st for st in streams if st.get("codec_type") == codec_type), None)
+
+
+def get_cache_stats() -> dict:
+    """Cache istatistikleri"""
+    with _lock:
+        return {**_stats, "memory_entries": len(_cache)}
@@ -0,0 +1,142 @@
+"""
+Render Cache - içerik adresli sahne cache'i
+Aynı resim + parametrelerle üretilmiş klip tekrar render edilmez.
+Anahtar: sha256(girdi dosyalarının baytları + render parametreleri + renderer versiyonu).
+Lokal disk: boyut sınırlı LRU. Opsiyonel ikinci katman: R2.
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import threading
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+sys.path.insert(0, os.path.dirname(API_DIR))
+
+from config import RENDER_CACHE_ENABLED, RENDER_CACHE_DIR, RENDER_CACHE_MAX_GB, RENDER_CACHE_R2, R2_BUCKET_NAME
+from disk_cache import DiskLRU, copy_atomic
+
+REMOTE_PREFIX = "render-cache"
+HASH_CHUNK = 1024 * 1024
+
+_COUNTERS = ["hits", "remote_hits", "misses", "stores", "evictions", "remote_stores"]
+_cache = DiskLRU(RENDER_CACHE_DIR, int(RENDER_CACHE_MAX_GB * 1024 ** 3), "Render cache", suffix=".mp4")
+
+
+def cache_key(files: list, params: dict) -> str:
+    """
+    İçerik anahtarı: dosya baytları + parametreler (sıralı JSON).
+    params renderer versiyonunu da içermeli - render kodu değişince eski klipler kullanılmaz.
+    """
+    digest = hashlib.sha256()
+    for path in files:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return _cache.path(key, ".mp4")
+
+
+def _materialize(cached_path: str, dest_path: str):
+    """
+    Cache'teki dosyayı hedefe kopyala. Hard link kullanılmaz: hedef sonradan
+    FFmpeg -y ile yeniden yazılırsa aynı inode üzerinden cache bozulurdu.
+    """
+    tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+    shutil.copyfile(cached_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+
+def _fetch_remote(key: str, cached_path: str) -> bool:
+    """R2 katmanından indir (yoksa False)"""
+    from services.cdn_service import get_s3_client
+    tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+    try:
+        get_s3_client().download_file(R2_BUCKET_NAME, f"{REMOTE_PREFIX}/{key}.mp4", tmp_path)
+        os.replace(tmp_path, cached_path)
+        return True
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def _push_remote(key: str, cached_path: str):
+    """R2 katmanına arka planda yükle"""
+    def run():
+        from services.cdn_service import get_s3_client
+        try:
+            get_s3_client().upload_file(cached_path, R2_BUCKET_NAME, f"{REMOTE_PREFIX}/{key}.mp4")
+            _cache.bump("remote_stores")
+        except Exception as e:
+            print(f"⚠️ Render cache R2'ye yüklenemedi: {e}")
+    threading.Thread(target=run, daemon=True).start()
+
+
+def lookup(key: str, dest_path: str) -> bool:
+    """
+    Cache'te varsa dest_path'e koy ve True döndür.
+    Lokal yoksa (RENDER_CACHE_R2 açıksa) R2'ye bakar.
+    """
+    if not RENDER_CACHE_ENABLED:
+        return False
+
+    cached_path = _entry_path(key)
+    if os.path.exists(cached_path):
+        _cache.touch(cached_path)
+        _materialize(cached_path, dest_path)
+        _cache.bump("hits")
+        print(f"♻️ Render cache HIT: {key[:12]}")
+        return True
+
+    if RENDER_CACHE_R2:
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        if _fetch_remote(key, cached_path):
+            _materialize(cached_path, dest_path)
+            _cache.bump("remote_hits")
+            print(f"♻️ Render cache HIT (R2): {key[:12]}")
+            return True
+
+    _cache.bump("misses")
+    return False
+
+
+def store(key: str, src_path: str):
+    """Render edilen klibi cache'e ekle, gerekirse eski kayıtları sil"""
+    if not RENDER_CACHE_ENABLED:
+        return
+
+    cached_path = _entry_path(key)
+    replaced_size = _cache.size_of(cached_path)
+    try:
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        copy_atomic(src_path, cached_path)
+    except Exception as e:
+        print(f"⚠️ Render cache'e yazılamadı: {e}")
+        return
+
+    _cache.added(cached_path, replaced_size)
+    if RENDER_CACHE_R2:
+        _push_remote(key, cached_path)
+
+
+def evict(max_bytes: int = None) -> int:
+    """En eski kullanılanları sil, toplam boyut sınırın altına insin"""
+    return _cache.evict(max_bytes)
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss sayaçları ve disk kullanımı (sayaçlardan, dizin gezilmez)"""
+    return {
+        "enabled": RENDER_CACHE_ENABLED,
+        "remote": RENDER_CACHE_R2,
+        **_cache.stats(_COUNTERS)
+    }
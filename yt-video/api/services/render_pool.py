@@ -0,0 +1,224 @@
+"""
+Sahne Render Havuzu - ProcessPoolExecutor
+Sahneleri ayrı process'lerde paralel render eder (her çekirdek kullanılır)
+"""
+import os
+import sys
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+from config import RENDER_WORKERS, RENDER_QUEUE_SIZE
+from utils.timing import Timer
+
+# Bellekte tutulacak en fazla iş kaydı
+MAX_JOB_HISTORY = 1000
+
+
+class RenderQueueFullError(Exception):
+    """Havuz kapasitesi (çalışan + bekleyen) dolu"""
+    pass
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(RENDER_QUEUE_SIZE)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Process havuzunu oluştur/döndür (ilk kullanımda)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            print(f"🏭 Render havuzu başlatılıyor: {RENDER_WORKERS} worker, kuyruk {RENDER_QUEUE_SIZE}")
+            _executor = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+        return _executor
+
+
+def _run_scene(job_id: str, queued_at: float, kwargs: dict) -> dict:
+    """Worker process içinde çalışır - tek sahneyi render et"""
+    from services.video_service import process_video
+
+    started_at = time.time()
+    meta = {
+        "job_id": job_id,
+        "scene_id": kwargs.get("scene_id"),
+        "project_id": kwargs.get("project_id"),
+        "scene_number": kwargs.get("scene_number"),
+        "queue_wait_ms": int((started_at - queued_at) * 1000),
+        "worker_pid": os.getpid()
+    }
+
+    with Timer("PY_RENDER_POOL_SCENE", meta):
+        result = process_video(**kwargs)
+
+    finished_at = time.time()
+    return {
+        "result": result,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "queue_wait_ms": meta["queue_wait_ms"],
+        "render_ms": int((finished_at - started_at) * 1000),
+        "worker_pid": meta["worker_pid"]
+    }
+
+
+def _on_done(job_id: str, future):
+    """İş bitince slotu bırak ve durumu güncelle"""
+    _slots.release()
+
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+
+        if future.cancelled():
+            job["status"] = "failed"
+            job["error"] = job.get("error") or "İptal edildi"
+            job["finished_at"] = time.time()
+            return
+
+        try:
+            outcome = future.result()
+            result = outcome["result"]
+            job["status"] = "completed" if result.get("success") else "failed"
+            job["result"] = result
+            job["error"] = result.get("error")
+            job["started_at"] = outcome["started_at"]
+            job["finished_at"] = outcome["finished_at"]
+            job["queue_wait_ms"] = outcome["queue_wait_ms"]
+            job["render_ms"] = outcome["render_ms"]
+            job["worker_pid"] = outcome["worker_pid"]
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            job["finished_at"] = time.time()
+
+
+def _reserve_slots(count: int):
+    """count kadar slot ayır, yetmezse ayrılanları geri ver ve hata fırlat"""
+    acquired = 0
+    for _ in range(count):
+        if not _slots.acquire(blocking=False):
+            for _ in range(acquired):
+                _slots.release()
+            raise RenderQueueFullError(
+                f"Render kuyruğu dolu (kapasite: {RENDER_QUEUE_SIZE}, istenen: {count})"
+            )
+        acquired += 1
+
+
+def _submit_reserved(kwargs: dict, batch_id: str = None):
+    """Slotu önceden ayrılmış bir sahneyi havuza gönder"""
+    job_id = uuid.uuid4().hex[:12]
+    queued_at = time.time()
+
+    with _jobs_lock:
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "batch_id": batch_id,
+            "status": "queued",
+            "scene_id": kwargs.get("scene_id"),
+            "project_id": kwargs.get("project_id"),
+            "scene_number": kwargs.get("scene_number"),
+            "queued_at": queued_at,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        while len(_jobs) > MAX_JOB_HISTORY:
+            _jobs.popitem(last=False)
+
+    try:
+        future = get_executor().submit(_run_scene, job_id, queued_at, kwargs)
+    except Exception:
+        _slots.release()
+        with _jobs_lock:
+            _jobs.pop(job_id, None)
+        raise
+
+    with _jobs_lock:
+        _jobs[job_id]["_future"] = future
+    future.add_done_callback(lambda f: _on_done(job_id, f))
+    return job_id, future
+
+
+def submit_scene(**kwargs):
+    """
+    Tek sahneyi havuza gönder (process_video parametreleri).
+    Kuyruk doluysa RenderQueueFullError fırlatır (backpressure).
+
+    Returns:
+        (job_id, concurrent.futures.Future)
+    """
+    _reserve_slots(1)
+    return _submit_reserved(kwargs)
+
+
+def submit_batch(scenes: list, batch_id: str = None) -> list:
+    """
+    Sahne listesini havuza gönder. Kapasite tüm sahnelere yetmezse
+    hiçbiri gönderilmez (RenderQueueFullError). Gönderim yarıda hata verirse
+    (ör. BrokenProcessPool) kalan slotlar bırakılır, gönderilmiş işler iptal edilir.
+
+    Returns:
+        [(job_id, Future), ...] - sahne sırası korunur
+    """
+    _reserve_slots(len(scenes))
+    batch_id = batch_id or uuid.uuid4().hex[:12]
+    submitted = []
+    for index, kwargs in enumerate(scenes):
+        try:
+            submitted.append(_submit_reserved(kwargs, batch_id=batch_id))
+        except Exception as e:
+            # Hata veren sahnenin slotunu _submit_reserved bıraktı; sonrakilerinkini burada bırak
+            for _ in range(len(scenes) - index - 1):
+                _slots.release()
+            # Çağıran sonuçları alamayacak - başlamamış işleri iptal et (slotu _on_done bırakır)
+            for job_id, future in submitted:
+                with _jobs_lock:
+                    if job_id in _jobs:
+                        _jobs[job_id]["error"] = f"Toplu gönderim yarıda kaldı: {e}"
+                future.cancel()
+            raise
+    return submitted
+
+
+def get_job(job_id: str) -> dict:
+    """İş durumunu döndür (yoksa None)"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        future = job.get("_future")
+        if job["status"] == "queued" and future is not None and future.running():
+            job["status"] = "running"
+        return {k: v for k, v in job.items() if not k.startswith("_")}
+
+
+def get_pool_stats() -> dict:
+    """Havuz durumu: worker sayısı, kuyruk, iş sayıları"""
+    with _jobs_lock:
+        counts = {}
+        for job in _jobs.values():
+            future = job.get("_future")
+            status = job["status"]
+            if status == "queued" and future is not None and future.running():
+                status = "running"
+            counts[status] = counts.get(status, 0) + 1
+
+    return {
+        "workers": RENDER_WORKERS,
+        "queue_capacity": RENDER_QUEUE_SIZE,
+        "in_flight": counts.get("queued", 0) + counts.get("running", 0),
+        "jobs": counts
+    }
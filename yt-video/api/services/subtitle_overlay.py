@@ -0,0 +1,305 @@
+"""
+Subtitle Overlay Servisi - Önceden rasterize edilmiş karaoke sprite'ları
+ASS yolunda libass her karede bulanık kenarlı (\\blur5 + \\bord15) glifleri yeniden
+rasterize eder. Burada her vurgu durumu (satır + aktif kelime) bir kez RGBA PNG
+olarak çizilir, metin+stil hash'iyle diskte cache'lenir (boyut sınırlı LRU,
+SUBTITLE_SPRITE_MAX_MB) ve FFmpeg'e concat
+demuxer ile zamanlı bir görüntü akışı olarak verilip tek overlay ile bindirilir.
+Görünüm ASS stiline uyar: 1080x1920 script çözünürlüğü kare yüksekliğine ölçeklenir.
+"""
+import os
+import sys
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+sys.path.insert(0, os.path.dirname(API_DIR))
+
+from config import SUBTITLE_SPRITE_DIR, SUBTITLE_SPRITE_MAX_MB, SUBTITLE_FONT
+from disk_cache import DiskLRU
+from services.subtitle_service import layout_lines
+
+# Sprite çıktısı değişince artırılır (sprite ve render cache anahtarlarında kullanılır)
+SPRITE_VERSION = "sprite-1"
+
+# generate_ass_header ile aynı stil (script koordinatları)
+PLAY_RES = (1080, 1920)
+FONT_SIZE = 130
+MARGIN_V = 200
+MARGIN_H = 10
+BORDER = 15   # \bord15
+BLUR = 5      # \blur5
+PNG_COMPRESS_LEVEL = 1  # Sprite'lar çoğunlukla saydam, hızlı sıkıştırma yeterli
+
+# Arial Bold yoksa libass da fontconfig ile benzerine düşer
+FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/msttcorefonts/Arial_Bold.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+)
+
+_stats = {"rendered": 0, "disk_hits": 0}
+_stats_lock = threading.Lock()
+# Son SPRITE_IN_USE_SEC içinde kullanılan sprite'lar silinmez - süren render'ların ffconcat dosyaları onlara bakar
+SPRITE_IN_USE_SEC = 900
+_cache = DiskLRU(SUBTITLE_SPRITE_DIR, int(SUBTITLE_SPRITE_MAX_MB * 1024 ** 2), "Sprite cache", suffix=".png",
+                 keep_recent_sec=SPRITE_IN_USE_SEC)
+
+
+def resolve_font_path() -> str:
+    """SUBTITLE_FONT > bilinen kalın fontlar > None (Pillow varsayılan fontu)"""
+    for path in (SUBTITLE_FONT, *FONT_CANDIDATES):
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=8)
+def _font(size: int):
+    """libass font boyutu = ascent + descent (em değil); Pillow fontu buna göre küçültülür"""
+    path = resolve_font_path()
+    load = (lambda px: ImageFont.truetype(path, px)) if path else ImageFont.load_default
+    ascent, descent = load(size).getmetrics()
+    return load(max(1, round(size * size / (ascent + descent))))
+
+
+def frame_style(width: int, height: int) -> dict:
+    """Script ölçüleri → kare ölçüleri (libass gibi yükseklik oranıyla ölçekler)"""
+    scale = height / PLAY_RES[1]
+    font = _font(max(8, round(FONT_SIZE * scale)))
+    ascent, descent = font.getmetrics()
+    border = BORDER * scale
+    blur = BLUR * scale
+    return {
+        "font": font,
+        "ascent": ascent,
+        "line_height": ascent + descent,
+        "border": max(1, round(border)),
+        "blur": blur,
+        "pad": int(border + 3 * blur) + 2,  # Bulanık kenar sprite dışına taşmasın
+        "margin_v": round(MARGIN_V * scale),
+        "max_width": width - 2 * round(MARGIN_H * width / PLAY_RES[0]),
+    }
+
+
+def _row_width(words: list, row: list, style: dict) -> float:
+    font = style["font"]
+    return sum(font.getlength(words[i]) for i in row) + font.getlength(" ") * (len(row) - 1)
+
+
+def wrap_rows(words: list, style: dict) -> list:
+    """Satırı kare genişliğine sığacak alt satırlara böl (libass gibi otomatik kırma)"""
+    font = style["font"]
+    space = font.getlength(" ")
+    rows, row, row_width = [], [], 0.0
+    for i, word in enumerate(words):
+        width = font.getlength(word)
+        if row and row_width + space + width > style["max_width"]:
+            rows.append(row)
+            row, row_width = [], 0.0
+        row_width += (space if row else 0) + width
+        row.append(i)
+    if row:
+        rows.append(row)
+
+    # libass WrapStyle 0: üst satırın son kelimesi alta geçince genişlikler yaklaşıyorsa geçir
+    moved = True
+    while moved:
+        moved = False
+        for k in range(len(rows) - 1):
+            upper, lower = rows[k], rows[k + 1]
+            if len(upper) < 2:
+                continue
+            candidate_upper, candidate_lower = upper[:-1], [upper[-1]] + lower
+            lower_width = _row_width(words, candidate_lower, style)
+            before = abs(_row_width(words, upper, style) - _row_width(words, lower, style))
+            if (lower_width <= style["max_width"]
+                    and abs(_row_width(words, candidate_upper, style) - lower_width) < before):
+                rows[k], rows[k + 1] = candidate_upper, candidate_lower
+                moved = True
+    return rows
+
+
+def band_geometry(lines: list, width: int, height: int) -> dict:
+    """
+    Tüm sprite'lar aynı boyutta olmalı (concat akışı): en çok alt satırlı ve en geniş
+    satıra göre ortalanmış, alttan hizalı tek bir bant. Overlay her karede sadece
+    bu dikdörtgeni harmanlar. Döner: {"x", "y", "width", "height"}
+    """
+    style = frame_style(width, height)
+    rows, text_width = 1, 0.0
+    for words in lines:
+        wrapped = wrap_rows(words, style)
+        rows = max(rows, len(wrapped))
+        text_width = max([text_width] + [_row_width(words, row, style) for row in wrapped])
+    band_width = min(width, int(text_width) + 2 * style["pad"] + 2)
+    band_width += band_width % 2  # yuv420 overlay için çift
+    band_height = rows * style["line_height"] + 2 * style["pad"]
+    band_height += band_height % 2
+    bottom = height - style["margin_v"] + style["pad"]
+    return {"x": max(0, (width - band_width) // 2 // 2 * 2), "y": max(0, (bottom - band_height) // 2 * 2),
+            "width": band_width, "height": band_height}
+
+
+def render_state(words: list, active: int, width: int, height: int, band: dict) -> Image.Image:
+    """
+    Tek vurgu durumu: tüm kelimeler beyaz, aktif kelimenin arkasında
+    bulanık siyah kenar (ASS: ACTIVE_TAGS / PASSIVE_TAGS). active=None → boş bant.
+    Konumlar kare koordinatında hesaplanır, bant köşesine göre kaydırılır.
+    """
+    image = Image.new("RGBA", (band["width"], band["height"]), (0, 0, 0, 0))
+    if not words:
+        return image
+
+    style = frame_style(width, height)
+    font = style["font"]
+    space = font.getlength(" ")
+    rows = wrap_rows(words, style)
+    # Son satırın alt kenarı bant altından pad kadar yukarıda (alttan hizalı)
+    top = band["height"] - style["pad"] - len(rows) * style["line_height"]
+
+    positions = {}
+    for r, row in enumerate(rows):
+        x = (width - _row_width(words, row, style)) / 2 - band["x"]
+        baseline = top + r * style["line_height"] + style["ascent"]
+        for i in row:
+            positions[i] = (x, baseline)
+            x += font.getlength(words[i]) + space
+
+    if active is not None:
+        # Kenar sadece aktif kelimenin çevresinde bulanıklaştırılır (tüm bant değil)
+        x, baseline = positions[active]
+        left, upper, right, lower = font.getbbox(words[active], anchor="ls")
+        margin = style["pad"]
+        box = (int(x + left) - margin, int(baseline + upper) - margin,
+               int(x + right) + margin + 1, int(baseline + lower) + margin + 1)
+        mask = Image.new("L", (box[2] - box[0], box[3] - box[1]), 0)
+        ImageDraw.Draw(mask).text((x - box[0], baseline - box[1]), words[active], font=font, fill=255,
+                                  anchor="ls", stroke_width=style["border"], stroke_fill=255)
+        if style["blur"] > 0:
+            mask = mask.filter(ImageFilter.GaussianBlur(style["blur"]))
+        shadow = Image.new("RGBA", mask.size, (0, 0, 0, 255))
+        shadow.putalpha(mask)
+        image.alpha_composite(shadow, (box[0], box[1]))
+
+    draw = ImageDraw.Draw(image)
+    for i, word in enumerate(words):
+        draw.text(positions[i], word, font=font, fill=(255, 255, 255, 255), anchor="ls")
+    return image
+
+
+def sprite_key(words: list, active, width: int, height: int, band: dict) -> str:
+    """Metin + stil hash'i (font, boyut, bant, sürüm dahil)"""
+    payload = json.dumps([SPRITE_VERSION, resolve_font_path(), FONT_SIZE, BORDER, BLUR, MARGIN_V,
+                          width, height, band["x"], band["width"], band["height"], words, active],
+                         ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_sprite(words: list, active, width: int, height: int, band: dict) -> str:
+    """Sprite PNG yolunu döndür (cache'te yoksa çiz ve kaydet)"""
+    key = sprite_key(words, active, width, height, band)
+    path = _cache.path(key, ".png")
+    if os.path.exists(path):
+        _cache.touch(path)
+        with _stats_lock:
+            _stats["disk_hits"] += 1
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    render_state(words, active, width, height, band).save(tmp_path, format="PNG",
+                                                                 compress_level=PNG_COMPRESS_LEVEL)
+    os.replace(tmp_path, path)
+    _cache.added(path, evict=False)  # Eviction build_sprite_track sonunda bir kez
+    with _stats_lock:
+        _stats["rendered"] += 1
+    return path
+
+
+def build_sprite_track(word_timings: list, width: int, height: int, work_path: str,
+                       max_chars_per_line: int = 25) -> dict:
+    """
+    Kelime zamanlarından sprite akışı: her benzersiz vurgu durumu bir kez çizilir
+    (paralel), zaman çizelgesi ffconcat dosyasına yazılır.
+
+    Args:
+        word_timings: [{"text", "start", "end"}, ...]
+        width, height: Video kare boyutu
+        work_path: Yazılacak .ffconcat dosyası
+
+    Returns:
+        {"concat": yol, "x", "y": bant konumu, "events", "sprites", "rendered"}
+    """
+    lines = [[w["text"] for w in line] for line in layout_lines(word_timings, max_chars_per_line)]
+    band = band_geometry(lines, width, height)
+
+    events = []
+    for line_words, words in zip(layout_lines(word_timings, max_chars_per_line), lines):
+        for i, w in enumerate(line_words):
+            events.append((w["start"], w["end"], tuple(words), i))
+    events.sort(key=lambda e: e[0])
+
+    states = {(words, i) for _, _, words, i in events}
+    states.add(((), None))
+    rendered_before = _stats["rendered"]
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 2)) as pool:
+        paths = dict(zip(states, pool.map(lambda s: get_sprite(list(s[0]), s[1], width, height, band),
+                                          states)))
+    blank = paths[((), None)]
+    _cache.evict_if_needed()
+
+    # Zaman çizelgesi: boşluklarda saydam bant; süreler yuvarlanmış mutlak zamanlardan
+    # (kayma birikmesin). Son dosya tekrar edilir (concat demuxer son süreyi yok sayar).
+    timeline, cursor = [], 0.0
+    for index, (start, end, words, i) in enumerate(events):
+        if index + 1 < len(events):
+            end = min(end, events[index + 1][0])
+        start = max(start, cursor)
+        if end <= start:
+            continue
+        if start > cursor:
+            timeline.append((blank, cursor, start))
+        timeline.append((paths[(words, i)], start, end))
+        cursor = end
+    timeline.append((blank, cursor, cursor + 1.0))
+
+    with open(work_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for path, start, end in timeline:
+            f.write(f"file '{path}'\nduration {round(end, 3) - round(start, 3):.3f}\n")
+        f.write(f"file '{blank}'\n")
+
+    return {
+        "concat": work_path,
+        "x": band["x"],
+        "y": band["y"],
+        "events": len(events),
+        "sprites": len(states),
+        "rendered": _stats["rendered"] - rendered_before
+    }
+
+
+def overlay_input_args(track: dict) -> list:
+    """Sprite akışı için FFmpeg girdi argümanları"""
+    return ['-f', 'concat', '-safe', '0', '-i', os.path.abspath(track["concat"])]
+
+
+def overlay_filter(base: str, sprites: str, track: dict, output: str) -> str:
+    """filter_complex parçası: [base] üzerine [sprites] akışını bant konumunda bindir"""
+    return f"[{sprites}]format=rgba[subs];[{base}][subs]overlay=x={track['x']}:y={track['y']}:eof_action=repeat[{output}]"
+
+
+def get_sprite_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    disk = _cache.stats(["evictions"])
+    return {**stats, **{name: disk[name] for name in ("evictions", "entries", "size_mb", "max_mb")}}
@@ -33,81 +33,121 @@ Style: Default,Arial,{font_size},&H00FFFFFF,&H0000FFFF,&H00000000,&H80000000,-1,
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
 """
 
+# Aktif Kelime:
+# \1c&HFFFFFF& -> Beyaz Renk
+# \alpha&H00& -> Tam Görünür (Opak)
+# \bord15 -> Çok Kalın Siyah Kenar
+# \blur5 -> Yumuşatma (Kenarları eritir, boğumları yok eder, soft gölge yapar)
+# \3c&H000000& -> Siyah Kenar Rengi
+ACTIVE_TAGS = "{\\1c&HFFFFFF&}{\\alpha&H00&}{\\3c&H000000&}{\\bord15}{\\blur5}"
+# Pasif Kelime:
+# \alpha&H00& -> Tam Görünür (Opak Beyaz)
+# \bord0 -> Kenar Yok
+# \blur0 -> Blur Yok
+PASSIVE_TAGS = "{\\1c&HFFFFFF&}{\\alpha&H00&}{\\bord0}{\\blur0}"
+
+# ASS çıktısı değişince artırılır (render cache anahtarında kullanılır)
+SUBTITLE_VERSION = "ass-2"
+
+
 def format_time_ass(seconds):
-    """Saniye -> ASS zaman formatı (H:MM:SS.cs)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    centis = int((seconds % 1) * 100)
-    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
-
-def generate_ass_content(text: str, duration: float, font_size=90, max_chars_per_line=25):
-    """ASS içeriği oluşturur (Kelime vurgulu)"""
+    """Saniye -> ASS zaman formatı (H:MM:SS.cs) - en yakın santisaniyeye, tamsayı aritmetiği"""
+    c = int(seconds * 100 + 0.5)
+    return "%d:%02d:%02d.%02d" % (c // 360000, c // 6000 % 60, c // 100 % 60, c % 100)
+
+
+def build_word_timings(text: str, duration: float) -> list:
+    """Gerçek zamanlama yoksa: süreyi kelimelere eşit böl"""
     words = text.split()
     if not words:
-        return ""
-
+        return []
     word_duration = duration / len(words)
-    ass_lines = []
-    
-    # Kelime Zamanlamaları
-    word_timings = []
-    for i, word in enumerate(words):
-        start = i * word_duration
-        end = (i + 1) * word_duration
-        word_timings.append({"text": word, "start": start, "end": end})
-    
-    # Satırlara böl
-    lines = [] 
+    return [{"text": w, "start": i * word_duration, "end": (i + 1) * word_duration} for i, w in enumerate(words)]
+
+
+def layout_lines(word_timings: list, max_chars_per_line: int = 25) -> list:
+    """Kelimeleri satırlara böl (tek geçiş, O(n))"""
+    lines = []
     current_line = []
     current_length = 0
-    
+
     for w in word_timings:
-        word_len = len(w['text'])
+        word_len = len(w["text"])
+        # current_length + boşluklar (kelime sayısı) sınırı aşarsa yeni satır
         if current_length + word_len + len(current_line) > max_chars_per_line and current_line:
             lines.append(current_line)
             current_line = []
             current_length = 0
         current_line.append(w)
         current_length += word_len
-        
+
     if current_line:
         lines.append(current_line)
-        
-    # Karaoke satırlarını oluştur
-    for line_words in lines:
-        if not line_words: continue
-        
-        for i, active_word in enumerate(line_words):
-            current_start = active_word['start']
-            current_end = active_word['end']
-            
-            text_parts = []
-            for j, w in enumerate(line_words):
-                word_text = w['text']
-                if i == j:
-                    # Aktif Kelime: 
-                    # \1c&HFFFFFF& -> Beyaz Renk
-                    # \alpha&H00& -> Tam Görünür (Opak)
-                    # \bord15 -> Çok Kalın Siyah Kenar
-                    # \blur5 -> Yumuşatma (Kenarları eritir, boğumları yok eder, soft gölge yapar)
-                    # \3c&H000000& -> Siyah Kenar Rengi
-                    text_parts.append(f"{{\\1c&HFFFFFF&}}{{\\alpha&H00&}}{{\\3c&H000000&}}{{\\bord15}}{{\\blur5}}{word_text}")
-                else:
-                    # Pasif Kelime:
-                    # \alpha&H00& -> Tam Görünür (Opak Beyaz)
-                    # \bord0 -> Kenar Yok
-                    # \blur0 -> Blur Yok
-                    text_parts.append(f"{{\\1c&HFFFFFF&}}{{\\alpha&H00&}}{{\\bord0}}{{\\blur0}}{word_text}")
-            
-            full_line_text = " ".join(text_parts)
-            full_line_text = full_line_text.replace("  ", " ")
-            
-            ass_lines.append(
-                f"Dialogue: 0,{format_time_ass(current_start)},{format_time_ass(current_end)},Default,,0,0,0,,{full_line_text}"
-            )
-            
-    return "\n".join(ass_lines)
+    return lines
+
+
+def iter_dialogue_events(word_timings: list, max_chars_per_line: int = 25):
+    """
+    Karaoke Dialogue satırlarını üret (generator).
+    Her satır için kelime parçaları bir kez derlenir; aktif kelime başına
+    satır metni hazır önek + aktif parça + hazır sonekten oluşur.
+    Ardışık kelimelerde bitiş = sonraki başlangıç; her zaman damgası bir kez formatlanır.
+    """
+    stamps = {}
+
+    def stamp(seconds):
+        text = stamps.get(seconds)
+        if text is None:
+            text = stamps[seconds] = format_time_ass(seconds)
+        return text
+
+    for line_words in layout_lines(word_timings, max_chars_per_line):
+        passive = [PASSIVE_TAGS + w["text"] for w in line_words]
+        count = len(passive)
+
+        # Sonekler sağdan bir kez: suffixes[i] = " " + passive[i+1:] birleşimi
+        suffixes = [""] * count
+        for i in range(count - 2, -1, -1):
+            suffixes[i] = " " + passive[i + 1] + suffixes[i + 1]
+
+        prefix = ""
+        for i, w in enumerate(line_words):
+            yield (f"Dialogue: 0,{stamp(w['start'])},{stamp(w['end'])},Default,,0,0,0,,"
+                   f"{prefix}{ACTIVE_TAGS}{w['text']}{suffixes[i]}")
+            prefix += passive[i] + " "
+
+
+def write_ass_events(f, word_timings: list, max_chars_per_line: int = 25) -> int:
+    """Dialogue satırlarını dosyaya akıt (tüm içerik bellekte birleştirilmez). Satır sayısını döndürür."""
+    count = 0
+    for event in iter_dialogue_events(word_timings, max_chars_per_line):
+        if count:
+            f.write("\n")
+        f.write(event)
+        count += 1
+    return count
+
+
+def generate_ass_content(text: str, duration: float, font_size=90, max_chars_per_line=25, word_timings: list = None):
+    """
+    ASS içeriği oluşturur (Kelime vurgulu).
+    word_timings verilirse ([{"text", "start", "end"}, ...]) gerçek kelime
+    zamanları kullanılır, yoksa süre kelimelere eşit bölünür.
+    """
+    word_timings = word_timings or build_word_timings(text, duration)
+    return "\n".join(iter_dialogue_events(word_timings, max_chars_per_line))
+
+
+def write_ass_file(text: str, duration: float, ass_path: str, font_size: int = 130, word_timings: list = None) -> str:
+    """Karaoke ASS dosyasını oluştur ve kaydet (Dialogue satırları dosyaya akıtılır)"""
+    word_timings = word_timings or build_word_timings(text, duration)
+
+    with open(ass_path, 'w', encoding='utf-8') as f:
+        f.write(generate_ass_header(font_size=font_size))
+        events = write_ass_events(f, word_timings)
+
+    print(f"📝 ASS oluşturuldu: {ass_path} ({events} satır)")
+    return ass_path
 
 
 def add_karaoke_subtitles(
@@ -117,10 +157,16 @@ def add_karaoke_subtitles(
     output_path: str,
     style: str = 'yellow', 
     max_words_per_line: int = 8,
-    font_size: int = 24 
+    font_size: int = 24,
+    word_timings: list = None,
+    mode: str = "ass",
+    video_size: tuple = None
 ) -> str:
     """
-    FFmpeg ve ASS formatı kullanarak videoya kelime vurgulu altyazı ekle
+    FFmpeg ve ASS formatı kullanarak videoya kelime vurgulu altyazı ekle.
+    word_timings: [{"text", "start", "end"}, ...] gerçek kelime zamanları (yoksa eşit bölünür)
+    mode="overlay" + video_size=(genişlik, yükseklik): libass yerine önceden çizilmiş
+    sprite'lar overlay ile bindirilir (subtitle_overlay)
     """
     # Font boyutunu zorla sabitle (130px)
     fixed_font_size = 130
@@ -139,17 +185,21 @@ def add_karaoke_subtitles(
     print(f"🛠️ FFmpeg Yolu: {FFMPEG_BINARY}")
     print(f"===========================================\n")
 
-    # 1. ASS dosyasını oluştur
-    ass_header = generate_ass_header(font_size=fixed_font_size)
-    ass_body = generate_ass_content(text, duration, font_size=fixed_font_size)
-    ass_content = ass_header + ass_body
-    
-    # 2. ASS dosyasını kaydet
-    ass_path = output_path.replace('.mp4', '.ass')
-    with open(ass_path, 'w', encoding='utf-8') as f:
-        f.write(ass_content)
-        
-    print(f"📝 ASS oluşturuldu: {ass_path}")
+    # 1. ASS dosyasını (veya overlay modunda sprite akışını) oluştur ve kaydet
+    if mode == "overlay" and not video_size:
+        print(f"⚠️ Overlay modu video_size gerektirir, ass kullanılıyor")
+    if mode == "overlay" and video_size:
+        from services.subtitle_overlay import build_sprite_track, overlay_input_args, overlay_filter
+        track = build_sprite_track(word_timings or build_word_timings(text, duration), video_size[0], video_size[1],
+                                   output_path.replace('.mp4', '.ffconcat'))
+        print(f"🧩 Sprite akışı: {track['events']} olay, {track['sprites']} sprite ({track['rendered']} yeni çizildi)")
+        ass_path = track["concat"]
+        subtitle_args = [*overlay_input_args(track), '-filter_complex', overlay_filter('0:v', '1:v', track, 'v'),
+                         '-map', '[v]', '-map', '0:a?']
+    else:
+        ass_path = write_ass_file(text, duration, output_path.replace('.mp4', '.ass'), font_size=fixed_font_size,
+                                  word_timings=word_timings)
+        subtitle_args = ['-vf', f"ass={os.path.basename(ass_path)}"]
 
     # Dosya adlarını ve dizini hazırla
     input_dir = os.path.dirname(video_path)
@@ -163,7 +213,7 @@ def add_karaoke_subtitles(
             FFMPEG_BINARY,
             '-y', 
             '-i', input_filename,
-            '-vf', f"ass={ass_filename}", 
+            *subtitle_args,
             '-c:a', 'copy',
             '-c:v', 'libx264',
             output_filename
@@ -0,0 +1,194 @@
+"""
+Upload-Behind - biten dosyaları arka planda CDN'e yükler
+skip_cdn=True pipeline'da sahne dosyası kapanır kapanmaz yükleme başlar;
+sondaki /upload-project-assets adımı hazır URL'leri alır, sadece eksikleri yükler.
+Süren ve tamamlanan yüklemeler proje manifest'ine yazılır: render pool / job
+worker process'lerinde başlayan yüklemeler de claim edilir, tekrar yüklenmez.
+"""
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# API dizinine path ekle
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+sys.path.insert(0, os.path.dirname(API_DIR))
+
+import project_store
+from config import PROJECTS_DIR, UPLOAD_BEHIND, UPLOAD_BEHIND_WORKERS, UPLOAD_BEHIND_WAIT
+from services.batch_uploader import upload_with_retry
+
+MANIFEST_POLL_SEC = 0.5
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+_pending = {}  # abs_path -> {"size", "mtime_ns", "key", "future"}
+_stats = {"started": 0, "completed": 0, "failed": 0, "claimed": 0}
+
+
+def asset_key(project_id: str, file_type: str, scene_number, local_path: str, timestamp: int = None) -> tuple:
+    """
+    Dosya tipine göre R2 key ve content_type belirle
+
+    Returns:
+        (key, content_type)
+    """
+    timestamp = timestamp or int(time.time())
+    scene_tag = str(scene_number or 0).zfill(3)
+
+    if file_type == "image":
+        ext = os.path.splitext(local_path)[1].lower() or ".png"
+        content_type = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}.get(ext, "image/png")
+        return f"images/{project_id}_scene_{scene_tag}_{timestamp}{ext}", content_type
+    if file_type == "video":
+        return f"videos/{project_id}_scene_{scene_tag}_{timestamp}.mp4", "video/mp4"
+    if file_type == "merged":
+        return f"videos/{project_id}_merged_{scene_tag}_{timestamp}.mp4", "video/mp4"
+    return f"files/{project_id}_{scene_tag}_{timestamp}", "application/octet-stream"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Process başına upload havuzu (fork sonrası yeniden oluşturulur)"""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=UPLOAD_BEHIND_WORKERS, thread_name_prefix="upload-behind")
+            _executor_pid = os.getpid()
+            _pending.clear()
+        return _executor
+
+
+def _record(project_id: str, abs_path: str, st, file_type: str, scene_number, cdn_url: str):
+    """CDN URL'ini manifest'e yaz (dosya yükleme sırasında değişmediyse)"""
+    try:
+        if project_store.set_cdn_url(project_id, abs_path, cdn_url, st.st_size, st.st_mtime_ns):
+            return
+        current = os.stat(abs_path)
+        if (current.st_size, current.st_mtime_ns) == (st.st_size, st.st_mtime_ns):
+            project_store.register(project_id, file_type, abs_path, scene_number, cdn_url=cdn_url)
+    except Exception as e:
+        print(f"⚠️ Manifest güncellenemedi: {e}")
+
+
+def _mark(project_id: str, abs_path: str, st, upload: dict):
+    """Süren yükleme işaretini manifest'e yaz/temizle"""
+    try:
+        project_store.set_upload(project_id, abs_path, upload, st.st_size, st.st_mtime_ns)
+    except Exception as e:
+        print(f"⚠️ Manifest güncellenemedi: {e}")
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _wait_manifest(project_id: str, abs_path: str, timeout: float) -> str:
+    """
+    Başka bir process'in (render pool / job worker) yüklemesini manifest'ten izle:
+    URL yazılınca döndür; işaret yoksa, process öldüyse veya süre dolduysa None.
+    """
+    deadline = time.time() + timeout
+    while True:
+        entry = project_store.find_by_path(project_id, abs_path)
+        if not entry:
+            return None
+        if entry.get("cdn_url"):
+            return entry["cdn_url"]
+        upload = entry.get("upload")
+        if not upload or not _process_alive(upload["pid"]) or time.time() >= deadline:
+            return None
+        time.sleep(MANIFEST_POLL_SEC)
+
+
+def start_upload(local_path: str, project_id: str, file_type: str, scene_number=None):
+    """
+    Dosyayı arka planda yüklemeye başla (dosya kapandıktan sonra çağrılmalı).
+    UPLOAD_BEHIND kapalıysa veya proje yoksa hiçbir şey yapmaz.
+
+    Returns:
+        Future veya None
+    """
+    if not UPLOAD_BEHIND or not project_id or not os.path.exists(local_path):
+        return None
+
+    executor = _get_executor()
+    abs_path = os.path.abspath(local_path)
+    st = os.stat(abs_path)
+    key, content_type = asset_key(project_id, file_type, scene_number, abs_path)
+    meta = {"project_id": project_id, "scene_number": scene_number, "type": file_type, "mode": "upload_behind"}
+
+    def run():
+        result = upload_with_retry(abs_path, key, content_type, meta=meta)
+        with _lock:
+            _stats["completed" if result["success"] else "failed"] += 1
+        if result["success"]:
+            _record(project_id, abs_path, st, file_type, scene_number, result["cdn_url"])
+        else:
+            _mark(project_id, abs_path, st, None)
+        return result
+
+    # Diğer process'ler manifest'ten görsün (kayıt yoksa işaretlenmez, claim eden kendisi yükler)
+    _mark(project_id, abs_path, st, {"pid": os.getpid(), "key": key, "started_at": time.time()})
+
+    future = executor.submit(run)
+    with _lock:
+        _pending[abs_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "key": key, "future": future}
+        _stats["started"] += 1
+    print(f"📤 Arka plan upload başladı: {os.path.basename(abs_path)} → {key}")
+    return future
+
+
+def claim_upload(local_path: str, project_id: str, timeout: float = UPLOAD_BEHIND_WAIT) -> str:
+    """
+    Dosya için arka plan yüklemesinin URL'ini döndür.
+    Yükleme sürüyorsa bitmesini bekler. Dosya yüklemeden sonra
+    değiştiyse, yükleme başarısızsa veya hiç başlamadıysa None.
+    """
+    abs_path = os.path.abspath(local_path)
+    try:
+        st = os.stat(abs_path)
+    except OSError:
+        return None
+
+    with _lock:
+        pending = _pending.get(abs_path) if _executor_pid == os.getpid() else None
+
+    url = None
+    if pending and pending["size"] == st.st_size and pending["mtime_ns"] == st.st_mtime_ns:
+        try:
+            result = pending["future"].result(timeout=timeout)
+            url = result["cdn_url"] if result["success"] else None
+        except Exception:
+            url = None
+    elif project_id:
+        # Başka bir process (render/job worker) yüklüyor/yüklemiş veya dosya zaten CDN'den gelmiş olabilir
+        url = _wait_manifest(project_id, abs_path, timeout)
+
+    if url:
+        with _lock:
+            _stats["claimed"] += 1
+    return url
+
+
+def forget_project(project_id: str):
+    """Proje temizlenince bekleyen kayıtları bırak"""
+    prefix = os.path.abspath(os.path.join(PROJECTS_DIR, str(project_id))) + os.sep
+    with _lock:
+        for path in [p for p in _pending if p.startswith(prefix)]:
+            _pending.pop(path)
+
+
+def get_upload_behind_stats() -> dict:
+    """Arka plan upload istatistikleri"""
+    with _lock:
+        in_flight = sum(1 for p in _pending.values() if not p["future"].done())
+        return {"enabled": UPLOAD_BEHIND, "workers": UPLOAD_BEHIND_WORKERS, "in_flight": in_flight, **_stats}
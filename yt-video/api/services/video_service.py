@@ -6,23 +6,26 @@ import os
 import sys
 import tempfile
 import shutil
-import requests
 from urllib.parse import urlparse
 
-# Proje dosyaları için paylaşımlı dizin (FLUX API ile ortak)
-PROJECTS_DIR = "/tmp/projects"
-
 def get_project_dir(project_id: str) -> str:
     """Proje için paylaşımlı dizin oluştur/döndür"""
     if not project_id:
         return tempfile.mkdtemp(prefix="video_")
-    d = os.path.join(PROJECTS_DIR, str(project_id))
-    os.makedirs(d, exist_ok=True)
-    return d
+    return project_store.project_dir(project_id)
 
 def is_local_path(path: str) -> bool:
     """URL mi yoksa lokal dosya yolu mu kontrol et"""
-    return path and (path.startswith("/") or path.startswith("./"))
+    return path and (path.startswith("/") or path.startswith("./") or path.startswith(project_store.LOCAL_SCHEME))
+
+def register_artifact(project_id: str, kind: str, path: str, scene_number: int = None, cdn_url: str = None):
+    """Çıktıyı proje manifest'ine yaz (geçici dizinde çalışılıyorsa atla)"""
+    if not project_id:
+        return
+    try:
+        project_store.register(project_id, kind, path, scene_number=scene_number, cdn_url=cdn_url)
+    except Exception as e:
+        print(f"⚠️ Manifest güncellenemedi: {e}")
 
 # API dizini
 API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -31,10 +34,17 @@ ROOT_DIR = os.path.dirname(API_DIR)
 sys.path.insert(0, ROOT_DIR)
 sys.path.insert(0, API_DIR)
 
-from image_to_video import create_ken_burns_video
+import project_store
+from image_to_video import create_ken_burns_video, build_ken_burns_filtergraph, VIDEO_WRITERS, RENDERER_VERSION
 from add_subtitles import add_timed_subtitles
 from services.cdn_service import upload_video
+from services.download_manager import download, download_many
+from services.upload_behind import start_upload
+from services import render_cache
+from services.encoder_service import pick_encoder
+from services.media_info import probe, get_duration, get_stream
 from utils.timing import start_timer, end_timer, Timer
+from config import SUBTITLE_ALIGNMENT, SUBTITLE_MODE
 
 
 def download_image(image_url: str, dest_path: str) -> str:
@@ -49,18 +59,38 @@ def download_image(image_url: str, dest_path: str) -> str:
         İndirilen dosya yolu
     """
     print(f"⬇️ Resim indiriliyor: {image_url}")
-    
-    response = requests.get(image_url, stream=True, timeout=30)
-    response.raise_for_status()
-    
-    with open(dest_path, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-    
+    download(image_url, dest_path, timeout=30)
     print(f"✅ Resim indirildi: {dest_path}")
     return dest_path
 
 
+def narration_word_timings(narration: str, audio_path: str, word_timings: list = None, meta: dict = None) -> list:
+    """
+    Karaoke için kelime zamanları: verilen word_timings > TTS sesinden hizalama > None (eşit bölme).
+    Hizalama başarısız olursa altyazı eski yöntemle (süreye eşit bölme) üretilir.
+    """
+    if word_timings or not SUBTITLE_ALIGNMENT or not narration or not narration.strip():
+        return word_timings
+    from services.word_alignment import align_words
+    try:
+        with Timer("PY_WORD_ALIGNMENT", meta):
+            return align_words(audio_path, narration)
+    except Exception as e:
+        print(f"⚠️ Kelime hizalama başarısız, eşit bölme kullanılacak: {e}")
+        return None
+
+
+def resolve_pan_direction(pan_direction: str) -> str:
+    """API yönünü (horizontal/vertical) create_ken_burns_video yönüne çevir"""
+    if pan_direction == "horizontal":
+        return "left_to_right"
+    elif pan_direction == "vertical":
+        return "bottom_to_top"
+    elif pan_direction == "vertical_reverse":
+        return "top_to_bottom"
+    return pan_direction
+
+
 def process_video(
     image_url: str,
     scene_id: str,
@@ -69,16 +99,23 @@ def process_video(
     subtitles: list = None,
     project_id: str = None,
     scene_number: int = None,
-    skip_cdn: bool = False
+    skip_cdn: bool = False,
+    writer: str = "moviepy",
+    on_progress=None
 ) -> dict:
     """
     Resimden video oluştur. skip_cdn=True ise lokal path döndür.
+    writer: "moviepy", "ffmpeg_pipe" (kareleri doğrudan FFmpeg'e yazar)
+            veya "filtergraph" (hareket tamamen FFmpeg filtreleriyle, Python'da kare yok)
+    on_progress: Adım bazlı ilerleme bildirimi, on_progress(0.0-1.0)
     """
+    report = on_progress or (lambda progress: None)
     print(f"\n🎬 ========== VIDEO İŞLEME BAŞLADI ==========")
     print(f"📷 Resim: {image_url}")
     print(f"🎯 Scene ID: {scene_id}")
     print(f"⏱️ Süre: {duration}s")
     print(f"➡️ Yön: {pan_direction}")
+    print(f"🎞️ Yazıcı: {writer}")
     print(f"💾 CDN: {'Hayır (lokal)' if skip_cdn else 'Evet'}")
     if project_id: print(f"📁 Proje ID: {project_id}")
     if scene_number: print(f"🎬 Sahne No: {scene_number}")
@@ -92,36 +129,48 @@ def process_video(
         meta = {"scene_id": scene_id, "project_id": project_id, "scene_number": scene_number}
 
         # 1. Resim - lokal path mi URL mi?
-        if is_local_path(image_url):
-            image_path = image_url
+        local_input = project_store.resolve(image_url, project_id)
+        if local_input:
+            image_path = local_input
             print(f"📂 Lokal resim kullanılıyor: {image_path}")
         else:
             image_ext = os.path.splitext(urlparse(image_url).path)[1] or ".jpg"
             image_path = os.path.join(project_dir, f"input_scene_{scene_number or 0}{image_ext}")
             with Timer("PY_IMAGE_DOWNLOAD", meta):
                 download_image(image_url, image_path)
+            register_artifact(project_id, "image", image_path, scene_number, cdn_url=image_url)
+        report(0.1)
         
         # 2. Video oluştur
         scene_tag = f"scene_{str(scene_number).zfill(3)}" if scene_number else scene_id
         video_path = os.path.join(project_dir, f"video_{scene_tag}.mp4")
         
-        if pan_direction == "horizontal":
-            pan_dir = "left_to_right"
-        elif pan_direction == "vertical":
-            pan_dir = "bottom_to_top"
-        elif pan_direction == "vertical_reverse":
-            pan_dir = "top_to_bottom"
-        else:
-            pan_dir = pan_direction
+        pan_dir = resolve_pan_direction(pan_direction)
+        
+        # Aynı resim + parametreler daha önce render edildiyse cache'ten al
+        cache_key = render_cache.cache_key([image_path], {
+            "renderer": RENDERER_VERSION,
+            "writer": writer,
+            "duration": duration,
+            "fps": 30,
+            "pan_direction": pan_dir,
+            "visibility_ratio": 0.90
+        })
+        cache_hit = render_cache.lookup(cache_key, video_path)
         
-        with Timer("PY_KEN_BURNS_VIDEO", {**meta, "duration": duration}):
-            create_ken_burns_video(
-                image_path=image_path,
-                output_path=video_path,
-                duration=duration,
-                visibility_ratio=0.90,
-                pan_direction=pan_dir
-            )
+        if not cache_hit:
+            with Timer("PY_KEN_BURNS_VIDEO", {**meta, "duration": duration, "writer": writer}):
+                create_ken_burns_video(
+                    image_path=image_path,
+                    output_path=video_path,
+                    duration=duration,
+                    fps=30,
+                    visibility_ratio=0.90,
+                    pan_direction=pan_dir,
+                    writer=writer
+                )
+            render_cache.store(cache_key, video_path)
+        report(0.8)
         
         # 3. Altyazı ekle (opsiyonel)
         if subtitles and len(subtitles) > 0:
@@ -130,10 +179,14 @@ def process_video(
             with Timer("PY_ADD_SUBTITLES", meta):
                 add_timed_subtitles(video_path, subtitles, subtitled_path)
             video_path = subtitled_path
+        report(0.9)
         
         # 4. CDN'e yükle veya lokal path döndür
         if skip_cdn:
             print(f"\n✅ Video lokal: {video_path}")
+            register_artifact(project_id, "video", video_path, scene_number)
+            # Toplu upload adımını beklemeden arka planda yüklemeye başla
+            start_upload(video_path, project_id, "video", scene_number)
             return {
                 "success": True,
                 "video_url": video_path,
@@ -146,6 +199,7 @@ def process_video(
             with Timer("PY_CDN_VIDEO_UPLOAD", meta):
                 cdn_url = upload_video(video_path, scene_id)
             print(f"🔗 CDN URL: {cdn_url}")
+            register_artifact(project_id, "video", video_path, scene_number, cdn_url)
             return {
                 "success": True,
                 "video_url": cdn_url,
@@ -170,11 +224,7 @@ def process_video(
 def download_file(url: str, dest_path: str) -> str:
     """URL'den dosya indir"""
     print(f"⬇️ İndiriliyor: {url[:60]}...")
-    response = requests.get(url, stream=True, timeout=60)
-    response.raise_for_status()
-    with open(dest_path, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
+    download(url, dest_path, timeout=60)
     print(f"✅ İndirildi: {dest_path}")
     return dest_path
 
@@ -186,16 +236,21 @@ def merge_video_with_audio(
     narration: str = None,
     project_id: str = None,
     scene_number: int = None,
-    skip_cdn: bool = False
+    skip_cdn: bool = False,
+    word_timings: list = None,
+    subtitle_mode: str = None
 ) -> dict:
     """
     Sessiz video ile sesi birleştir, altyazı ekle.
+    word_timings verilirse ([{"text", "start", "end"}]) karaoke vurgusu bu zamanlara göre yapılır.
+    Verilmezse SUBTITLE_ALIGNMENT açıksa zamanlar TTS sesinden hizalanır, değilse süreye eşit bölünür.
+    subtitle_mode: "ass" veya "overlay" (verilmezse SUBTITLE_MODE).
     skip_cdn=True ise lokal path döndür.
     Lokal path gönderilirse indirme atlanır.
     """
     import subprocess
-    import json
     from services.subtitle_service import add_karaoke_subtitles
+    subtitle_mode = subtitle_mode or SUBTITLE_MODE
     
     print(f"\n🔗 ========== VIDEO + SES BİRLEŞTİRME (FFmpeg) ==========")
     print(f"🎬 Video: {video_url}")
@@ -214,8 +269,9 @@ def merge_video_with_audio(
         meta = {"scene_id": scene_id, "project_id": project_id, "scene_number": scene_number}
 
         # 1. Video - lokal path mi URL mi?
-        if is_local_path(video_url):
-            video_path = video_url
+        local_input = project_store.resolve(video_url, project_id)
+        if local_input:
+            video_path = local_input
             print(f"📂 Lokal video: {video_path}")
         else:
             video_path = os.path.join(project_dir, f"video_dl_{scene_number or 0}.mp4")
@@ -223,41 +279,36 @@ def merge_video_with_audio(
                 download_file(video_url, video_path)
         
         # 2. Audio - lokal path mi URL mi?
-        if is_local_path(audio_url):
-            audio_path = audio_url
+        local_input = project_store.resolve(audio_url, project_id)
+        if local_input:
+            audio_path = local_input
             print(f"📂 Lokal audio: {audio_path}")
         else:
             audio_path = os.path.join(project_dir, f"audio_dl_{scene_number or 0}.mp3")
             with Timer("PY_MERGE_AUDIO_DOWNLOAD", meta):
                 download_file(audio_url, audio_path)
+            register_artifact(project_id, "audio", audio_path, scene_number, cdn_url=audio_url)
         
-        # 3. FFprobe ile süreleri al
-        probe_cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', audio_path]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        probe_data = json.loads(probe_result.stdout)
-        audio_duration = float(probe_data['format']['duration'])
-        
-        probe_cmd_video = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', video_path]
-        probe_result_video = subprocess.run(probe_cmd_video, capture_output=True, text=True)
-        probe_data_video = json.loads(probe_result_video.stdout)
-        video_duration = float(probe_data_video['format']['duration'])
+        # 3. Süreleri al (media info cache)
+        audio_duration = get_duration(audio_path)
+        video_duration = get_duration(video_path)
         
         print(f"   Video süresi: {video_duration:.2f}s")
         print(f"   Ses süresi: {audio_duration:.2f}s")
         
-        # 4. FFmpeg ile birleştir (GPU NVENC)
+        # 4. FFmpeg ile birleştir (makinedeki en hızlı encoder)
         scene_tag = f"scene_{str(scene_number).zfill(3)}" if scene_number else scene_id
         merged_path = os.path.join(project_dir, f"merged_{scene_tag}.mp4")
-        print(f"🔗 FFmpeg ile birleştiriliyor (GPU NVENC)...")
+        encoder = pick_encoder()
+        print(f"🔗 FFmpeg ile birleştiriliyor ({encoder['name']})...")
         
-        with Timer("PY_FFMPEG_MERGE", meta):
+        with Timer("PY_FFMPEG_MERGE", {**meta, "encoder": encoder["name"]}):
             ffmpeg_cmd = [
                 'ffmpeg', '-y',
+                *encoder["input_args"],
                 '-i', video_path,
                 '-i', audio_path,
-                '-c:v', 'h264_nvenc',
-                '-preset', 'fast',
-                '-b:v', '5M',
+                *encoder["args"],
                 '-c:a', 'aac',
                 '-b:a', '128k',
                 '-map', '0:v:0',
@@ -277,25 +328,39 @@ def merge_video_with_audio(
         if narration and len(narration.strip()) > 0:
             print(f"\n📝 Altyazı ekleniyor...")
             subtitled_path = os.path.join(project_dir, f"merged_{scene_tag}_sub.mp4")
-            with Timer("PY_KARAOKE_SUBTITLES", meta):
+            video_size = None
+            if subtitle_mode == "overlay":
+                stream = get_stream(merged_path, "video")
+                video_size = (int(stream["width"]), int(stream["height"])) if stream else None
+                if video_size is None:
+                    print(f"⚠️ Video boyutu okunamadı, altyazı overlay yerine ass ile eklenecek")
+                    subtitle_mode = "ass"
+            with Timer("PY_KARAOKE_SUBTITLES", {**meta, "mode": subtitle_mode}):
                 output_path = add_karaoke_subtitles(
                     video_path=merged_path,
                     text=narration,
                     duration=audio_duration,
                     output_path=subtitled_path,
                     font_size=45,
-                    max_words_per_line=5
+                    max_words_per_line=5,
+                    word_timings=narration_word_timings(narration, audio_path, word_timings, meta),
+                    mode=subtitle_mode,
+                    video_size=video_size
                 )
         
         # 6. CDN'e yükle veya lokal path döndür
         if skip_cdn:
             print(f"\n✅ Birleştirme lokal: {output_path}")
+            register_artifact(project_id, "merged", output_path, scene_number)
+            # Toplu upload adımını beklemeden arka planda yüklemeye başla
+            start_upload(output_path, project_id, "merged", scene_number)
             return {
                 "success": True,
                 "merged_video_url": output_path,
                 "local_path": output_path,
                 "scene_id": scene_id,
-                "duration": audio_duration
+                "duration": audio_duration,
+                "encoder": encoder["name"]
             }
         else:
             print(f"\n☁️ CDN'e yükleniyor...")
@@ -303,11 +368,13 @@ def merge_video_with_audio(
             with Timer("PY_CDN_MERGED_UPLOAD", meta):
                 cdn_url = upload_video(output_path, f"merged_{scene_id}")
             print(f"🔗 CDN URL: {cdn_url}")
+            register_artifact(project_id, "merged", output_path, scene_number, cdn_url)
             return {
                 "success": True,
                 "merged_video_url": cdn_url,
                 "scene_id": scene_id,
-                "duration": audio_duration
+                "duration": audio_duration,
+                "encoder": encoder["name"]
             }
         
     except Exception as e:
@@ -326,6 +393,357 @@ def merge_video_with_audio(
             print(f"🧹 Geçici dosyalar temizlendi")
 
 
+def render_scene(
+    image_url: str,
+    audio_url: str,
+    scene_id: str,
+    narration: str = None,
+    pan_direction: str = "vertical",
+    duration: float = None,
+    project_id: str = None,
+    scene_number: int = None,
+    skip_cdn: bool = False,
+    fps: int = 30,
+    word_timings: list = None,
+    subtitle_mode: str = None
+) -> dict:
+    """
+    Tek encode ile sahne üret: Ken Burns + ses + karaoke altyazı.
+    process_video + merge_video_with_audio + add_karaoke_subtitles zincirinin
+    yerine geçer (üç encode yerine bir encode, kalite kaybı yok).
+    duration verilmezse ses süresi kullanılır.
+    word_timings verilirse ([{"text", "start", "end"}]) karaoke vurgusu bu zamanlara göre yapılır.
+    Verilmezse SUBTITLE_ALIGNMENT açıksa zamanlar TTS sesinden hizalanır, değilse süreye eşit bölünür.
+    subtitle_mode: "ass" (libass) veya "overlay" (önceden çizilmiş sprite'lar); verilmezse SUBTITLE_MODE.
+    Dönüş formatı merge_video_with_audio ile aynıdır.
+    """
+    import subprocess
+    from services.subtitle_service import write_ass_file, build_word_timings, SUBTITLE_VERSION
+    from services.subtitle_overlay import build_sprite_track, overlay_input_args, overlay_filter, SPRITE_VERSION
+    from services.word_alignment import ALIGNER_VERSION
+    subtitle_mode = subtitle_mode or SUBTITLE_MODE
+    
+    print(f"\n🎬 ========== TEK GEÇİŞ SAHNE RENDER (FFmpeg) ==========")
+    print(f"📷 Resim: {image_url}")
+    print(f"🔊 Audio: {audio_url}")
+    print(f"🎯 Scene ID: {scene_id}")
+    print(f"➡️ Yön: {pan_direction}")
+    print(f"📝 Altyazı: {'Var' if narration else 'Yok'}")
+    print(f"💾 CDN: {'Hayır (lokal)' if skip_cdn else 'Evet'}")
+    if project_id: print(f"📁 Proje ID: {project_id}")
+    if scene_number: print(f"🎬 Sahne No: {scene_number}")
+    print(f"========================================================\n")
+    
+    project_dir = get_project_dir(project_id)
+    use_temp = not project_id
+    
+    try:
+        meta = {"scene_id": scene_id, "project_id": project_id, "scene_number": scene_number}
+        
+        # 1. Resim - lokal path mi URL mi?
+        local_input = project_store.resolve(image_url, project_id)
+        if local_input:
+            image_path = local_input
+            print(f"📂 Lokal resim: {image_path}")
+        else:
+            image_ext = os.path.splitext(urlparse(image_url).path)[1] or ".jpg"
+            image_path = os.path.join(project_dir, f"input_scene_{scene_number or 0}{image_ext}")
+            with Timer("PY_IMAGE_DOWNLOAD", meta):
+                download_image(image_url, image_path)
+            register_artifact(project_id, "image", image_path, scene_number, cdn_url=image_url)
+        
+        # 2. Audio - lokal path mi URL mi?
+        local_input = project_store.resolve(audio_url, project_id)
+        if local_input:
+            audio_path = local_input
+            print(f"📂 Lokal audio: {audio_path}")
+        else:
+            audio_path = os.path.join(project_dir, f"audio_dl_{scene_number or 0}.mp3")
+            with Timer("PY_MERGE_AUDIO_DOWNLOAD", meta):
+                download_file(audio_url, audio_path)
+            register_artifact(project_id, "audio", audio_path, scene_number, cdn_url=audio_url)
+        
+        # 3. Ses süresi (media info cache)
+        audio_duration = get_duration(audio_path)
+        scene_duration = duration or audio_duration
+        
+        print(f"   Ses süresi: {audio_duration:.2f}s")
+        print(f"   Sahne süresi: {scene_duration:.2f}s")
+        
+        # 4. Filtre zinciri: Ken Burns (+ ASS altyazı veya sprite overlay)
+        scene_tag = f"scene_{str(scene_number).zfill(3)}" if scene_number else scene_id
+        output_path = os.path.join(project_dir, f"merged_{scene_tag}_sub.mp4")
+        output_size = (1920, 1080)
+        
+        filtergraph = build_ken_burns_filtergraph(
+            image_path,
+            duration=scene_duration,
+            visibility_ratio=0.90,
+            pan_direction=resolve_pan_direction(pan_direction),
+            output_size=output_size,
+            fps=fps
+        )
+        
+        subtitle_filename = None
+        if narration and len(narration.strip()) > 0:
+            subtitle_ext = "ffconcat" if subtitle_mode == "overlay" else "ass"
+            subtitle_filename = f"merged_{scene_tag}_sub.{subtitle_ext}"
+        
+        def build_cmd(vf, track=None):
+            if track:
+                # Sprite akışı üçüncü girdi: [Ken Burns] üzerine zamanlı overlay
+                video_args = [*overlay_input_args(track),
+                              '-filter_complex', f"[0:v]{vf}[bg];{overlay_filter('bg', '2:v', track, 'v')}",
+                              '-map', '[v]']
+            else:
+                video_args = ['-vf', vf, '-map', '0:v:0']
+            return [
+                'ffmpeg', '-y',
+                '-framerate', str(fps),
+                '-i', os.path.abspath(image_path),
+                '-i', os.path.abspath(audio_path),
+                *video_args,
+                '-map', '1:a:0',
+                '-t', str(min(scene_duration, audio_duration)),
+                '-r', str(fps),
+                '-c:v', 'libx264',
+                '-preset', 'medium',
+                '-threads', '4',
+                '-pix_fmt', 'yuv420p',
+                '-c:a', 'aac',
+                '-b:a', '128k',
+                os.path.abspath(output_path)
+            ]
+        
+        # Aynı resim + ses + metin daha önce render edildiyse cache'ten al
+        subtitle_version = SPRITE_VERSION if subtitle_mode == "overlay" else SUBTITLE_VERSION
+        # Zamanlar sesten çıkarılıyorsa hizalayıcı sürümü de anahtara girer
+        alignment = ALIGNER_VERSION if SUBTITLE_ALIGNMENT and not word_timings else None
+        cache_key = render_cache.cache_key([image_path, audio_path], {
+            "renderer": f"{RENDERER_VERSION}:fused:{subtitle_version}",
+            "narration": narration or "",
+            "word_timings": word_timings,
+            "alignment": alignment,
+            "duration": scene_duration,
+            "fps": fps,
+            "pan_direction": resolve_pan_direction(pan_direction),
+            "visibility_ratio": 0.90
+        })
+        cache_hit = render_cache.lookup(cache_key, output_path)
+        
+        # 5. Tek encode (altyazı dosyası cwd'ye göre verilir, path kaçış sorunu olmasın)
+        if not cache_hit:
+            track = None
+            alignment_failed = False
+            if subtitle_filename:
+                # Hizalama sadece cache miss'te (ses zaten anahtarda)
+                timings = narration_word_timings(narration, audio_path, word_timings, meta)
+                alignment_failed = alignment is not None and timings is None
+                subtitle_path = os.path.join(project_dir, subtitle_filename)
+                if subtitle_mode == "overlay":
+                    with Timer("PY_SUBTITLE_SPRITES", meta):
+                        track = build_sprite_track(timings or build_word_timings(narration, audio_duration),
+                                                   output_size[0], output_size[1], subtitle_path)
+                    print(f"🧩 Sprite akışı: {track['events']} olay, {track['sprites']} sprite "
+                          f"({track['rendered']} yeni çizildi)")
+                else:
+                    write_ass_file(narration, audio_duration, subtitle_path, word_timings=timings)
+            
+            print(f"🔗 FFmpeg ile tek geçişte render ediliyor ({subtitle_mode})...")
+            with Timer("PY_FUSED_SCENE_RENDER", {**meta, "duration": scene_duration, "subtitles": subtitle_mode}):
+                if track:
+                    cmd = build_cmd(filtergraph, track)
+                else:
+                    cmd = build_cmd(f"{filtergraph},ass={subtitle_filename}" if subtitle_filename else filtergraph)
+                result = subprocess.run(cmd, cwd=project_dir, capture_output=True, text=True)
+                fallback = False
+                
+                if result.returncode != 0 and subtitle_filename:
+                    print(f"⚠️ Altyazılı render başarısız, altyazısız deneniyor: {result.stderr[-300:]}")
+                    result = subprocess.run(build_cmd(filtergraph), cwd=project_dir, capture_output=True, text=True)
+                    fallback = True
+                
+                if result.returncode != 0:
+                    print(f"⚠️ FFmpeg stderr: {result.stderr[-500:]}")
+                    raise Exception(f"FFmpeg hatası: {result.stderr[-200:]}")
+            
+            # Altyazısız yedek çıktı ve hizalama yerine eşit bölmeyle üretilen çıktı
+            # cache'lenmez (anahtar hizalanmış altyazılı sahneyi temsil ediyor)
+            if not fallback and not alignment_failed:
+                render_cache.store(cache_key, output_path)
+        
+        if subtitle_filename:
+            subtitle_path = os.path.join(project_dir, subtitle_filename)
+            if os.path.exists(subtitle_path):
+                os.remove(subtitle_path)
+        
+        # 6. CDN'e yükle veya lokal path döndür
+        if skip_cdn:
+            print(f"\n✅ Sahne lokal: {output_path}")
+            register_artifact(project_id, "merged", output_path, scene_number)
+            # Toplu upload adımını beklemeden arka planda yüklemeye başla
+            start_upload(output_path, project_id, "merged", scene_number)
+            return {
+                "success": True,
+                "merged_video_url": output_path,
+                "local_path": output_path,
+                "scene_id": scene_id,
+                "duration": audio_duration
+            }
+        else:
+            print(f"\n☁️ CDN'e yükleniyor...")
+            with Timer("PY_CDN_MERGED_UPLOAD", meta):
+                cdn_url = upload_video(output_path, f"merged_{scene_id}")
+            print(f"🔗 CDN URL: {cdn_url}")
+            register_artifact(project_id, "merged", output_path, scene_number, cdn_url)
+            return {
+                "success": True,
+                "merged_video_url": cdn_url,
+                "scene_id": scene_id,
+                "duration": audio_duration
+            }
+        
+    except Exception as e:
+        print(f"\n❌ SAHNE RENDER HATASI: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {
+            "success": False,
+            "error": str(e),
+            "scene_id": scene_id
+        }
+        
+    finally:
+        if use_temp and os.path.exists(project_dir):
+            shutil.rmtree(project_dir)
+            print(f"🧹 Geçici dosyalar temizlendi")
+
+
+def get_stream_signature(path: str) -> dict:
+    """
+    Stream-copy concat uyumluluğu için video/ses parametreleri.
+    Video extradata (SPS/PPS) hash'i de dahil: farklı encoder çıktıları
+    aynı codec/çözünürlükte olsa bile copy ile birleştirilemez.
+    Probe başarısızsa None döner.
+    """
+    try:
+        streams = probe(path).get("streams", [])
+    except Exception:
+        return None
+    
+    video = next((st for st in streams if st.get("codec_type") == "video"), None)
+    audio = next((st for st in streams if st.get("codec_type") == "audio"), None)
+    if video is None:
+        return None
+    
+    return {
+        "video_codec": video.get("codec_name"),
+        "profile": video.get("profile"),
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "pix_fmt": video.get("pix_fmt"),
+        "r_frame_rate": video.get("r_frame_rate"),
+        "time_base": video.get("time_base"),
+        "extradata_hash": video.get("extradata_hash"),
+        "audio_codec": audio.get("codec_name") if audio else None,
+        "sample_rate": audio.get("sample_rate") if audio else None,
+        "channels": audio.get("channels") if audio else None
+    }
+
+
+def normalize_segment(input_path: str, reference: dict, output_path: str) -> str:
+    """
+    Uyumsuz bir segmenti referans parametrelerine göre yeniden encode et
+    (sahne pipeline'ının libx264 ayarlarıyla). Referansta ses varsa ve
+    segmentte yoksa sessiz ses eklenir.
+    """
+    import subprocess
+    
+    timescale = reference["time_base"].split("/")[1]
+    cmd = ['ffmpeg', '-y', '-i', input_path]
+    
+    input_signature = get_stream_signature(input_path)
+    needs_silence = reference["audio_codec"] and not (input_signature and input_signature["audio_codec"])
+    if needs_silence:
+        cmd += ['-f', 'lavfi', '-i', f"anullsrc=r={reference['sample_rate']}:cl={'mono' if reference['channels'] == 1 else 'stereo'}"]
+    
+    cmd += [
+        '-map', '0:v:0',
+        '-vf', f"scale={reference['width']}:{reference['height']},setsar=1",
+        '-r', reference["r_frame_rate"],
+        '-c:v', 'libx264',
+        '-preset', 'medium',
+        '-threads', '4',
+        '-pix_fmt', reference["pix_fmt"],
+        '-video_track_timescale', timescale,
+    ]
+    if reference["audio_codec"]:
+        cmd += [
+            '-map', '1:a:0' if needs_silence else '0:a:0',
+            '-c:a', 'aac',
+            '-b:a', '128k',
+            '-ar', str(reference["sample_rate"]),
+            '-ac', str(reference["channels"]),
+        ]
+        if needs_silence:
+            cmd += ['-shortest']
+    else:
+        cmd += ['-an']
+    cmd.append(output_path)
+    
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"⚠️ FFmpeg stderr: {result.stderr[-500:]}")
+        raise Exception(f"FFmpeg hatası: {result.stderr[-200:]}")
+    return output_path
+
+
+def prepare_stream_copy(local_files: list, project_dir: str, meta: dict) -> list:
+    """
+    Segmentleri probe et; çoğunluğun imzasını referans al, uyumsuz olanları
+    normalize et. Tüm segmentler uyumlu hale gelirse copy ile birleştirilecek
+    dosya listesini, aksi halde None döndürür (tam re-encode gerekir).
+    """
+    import json
+    from collections import Counter
+    
+    with Timer("PY_CONCAT_PROBE", meta):
+        signatures = [get_stream_signature(path) for path in local_files]
+    
+    valid = [json.dumps(sig, sort_keys=True) for sig in signatures if sig]
+    if not valid:
+        return None
+    reference_key, _ = Counter(valid).most_common(1)[0]
+    reference = json.loads(reference_key)
+    
+    mismatched = [i for i, sig in enumerate(signatures) if sig != reference]
+    print(f"🔍 Probe: {len(local_files) - len(mismatched)}/{len(local_files)} segment uyumlu")
+    if not mismatched:
+        return local_files
+    
+    # Çoğunluk uyumsuzsa normalize etmek tam re-encode'dan kazandırmaz
+    if len(mismatched) > len(local_files) // 2:
+        return None
+    
+    files = list(local_files)
+    with Timer("PY_CONCAT_NORMALIZE", {**meta, "segments": len(mismatched)}) as timer:
+        for i in mismatched:
+            normalized_path = os.path.join(project_dir, f"concat_norm_{i:03d}.mp4")
+            print(f"🔧 Segment normalize ediliyor ({i+1}): {local_files[i]}")
+            # FFmpeg hatası veya referansta eksik alan (time_base/sample_rate None) - tam re-encode'a düş
+            try:
+                normalize_segment(local_files[i], reference, normalized_path)
+            except Exception as e:
+                print(f"⚠️ Segment normalize edilemedi, tam re-encode yapılacak: {e}")
+                timer.fail(str(e))
+                return None
+            if get_stream_signature(normalized_path) != reference:
+                print(f"⚠️ Normalize edilen segment hâlâ uyumsuz, tam re-encode yapılacak")
+                return None
+            files[i] = normalized_path
+    return files
+
+
 def concatenate_videos(video_urls: list, project_id: str) -> dict:
     """
     Birden fazla videoyu birleştirip tek video yapar ve CDN'e yükler.
@@ -334,7 +752,7 @@ def concatenate_videos(video_urls: list, project_id: str) -> dict:
     """
     import subprocess
     
-    print(f"\n🎬 ========== VİDEO BİRLEŞTİRME (FFmpeg NVENC) ==========")
+    print(f"\n🎬 ========== VİDEO BİRLEŞTİRME (FFmpeg) ==========")
     print(f"📦 Video Sayısı: {len(video_urls)}")
     print(f"🎯 Proje ID: {project_id}")
     print(f"========================================================\n")
@@ -349,8 +767,9 @@ def concatenate_videos(video_urls: list, project_id: str) -> dict:
     # Tek video varsa direkt CDN'e yükle
     if len(video_urls) == 1:
         single = video_urls[0]
-        if is_local_path(single):
-            cdn_url = upload_video(single, f"final_{project_id}")
+        local_single = project_store.resolve(single, project_id)
+        if local_single:
+            cdn_url = upload_video(local_single, f"final_{project_id}")
             return {"success": True, "video_url": cdn_url, "project_id": project_id}
         return {"success": True, "video_url": single, "project_id": project_id}
     
@@ -360,56 +779,91 @@ def concatenate_videos(video_urls: list, project_id: str) -> dict:
         # 1. Videoları hazırla (lokal path varsa indirme yok)
         local_files = []
         with Timer("PY_CONCAT_PREPARE", {"project_id": project_id, "count": len(video_urls)}):
+            to_download = []
             for i, url in enumerate(video_urls):
-                if is_local_path(url):
-                    local_files.append(url)
-                    print(f"📂 Lokal ({i+1}/{len(video_urls)}): {url}")
+                local_input = project_store.resolve(url, project_id)
+                if local_input:
+                    local_files.append(local_input)
+                    print(f"📂 Lokal ({i+1}/{len(video_urls)}): {local_input}")
                 else:
                     local_path = os.path.join(project_dir, f"concat_{i:03d}.mp4")
-                    print(f"⬇️ İndiriliyor ({i+1}/{len(video_urls)}): {url[:60]}...")
-                    download_file(url, local_path)
+                    print(f"⬇️ İndirilecek ({i+1}/{len(video_urls)}): {url[:60]}...")
+                    to_download.append((url, local_path))
                     local_files.append(local_path)
+            
+            # Uzak videoları paralel indir
+            if to_download:
+                download_many(to_download)
+                print(f"✅ {len(to_download)} video indirildi")
+        
+        # 2. Stream copy mümkün mü? (codec/çözünürlük/fps/timebase/ses aynıysa)
+        meta = {"project_id": project_id, "count": len(video_urls)}
+        copy_files = prepare_stream_copy(local_files, project_dir, meta)
         
-        # 2. FFmpeg concat listesi
+        # 3. FFmpeg concat listesi
         concat_list_path = os.path.join(project_dir, "concat_list.txt")
         with open(concat_list_path, 'w') as f:
-            for vp in local_files:
+            for vp in (copy_files or local_files):
                 f.write(f"file '{vp}'\n")
         
         print(f"📝 Concat listesi: {len(local_files)} video")
         
-        # 3. FFmpeg ile birleştir (GPU NVENC)
         output_path = os.path.join(project_dir, "final_video.mp4")
-        print(f"🔗 FFmpeg ile birleştiriliyor (GPU NVENC)...")
+        result = None
         
-        with Timer("PY_FFMPEG_CONCAT", {"project_id": project_id, "count": len(video_urls)}):
-            ffmpeg_cmd = [
-                'ffmpeg', '-y',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', concat_list_path,
-                '-c:v', 'h264_nvenc',
-                '-preset', 'fast',
-                '-b:v', '5M',
-                '-maxrate', '8M',
-                '-bufsize', '10M',
-                '-c:a', 'aac',
-                '-b:a', '128k',
-                output_path
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        # 4a. Hızlı yol: concat demuxer + -c copy (encode yok)
+        if copy_files:
+            print(f"⚡ FFmpeg ile birleştiriliyor (stream copy)...")
+            with Timer("PY_FFMPEG_CONCAT", {**meta, "mode": "copy"}):
+                ffmpeg_cmd = [
+                    'ffmpeg', '-y',
+                    '-f', 'concat',
+                    '-safe', '0',
+                    '-i', concat_list_path,
+                    '-c', 'copy',
+                    '-movflags', '+faststart',
+                    output_path
+                ]
+                result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
             
             if result.returncode != 0:
-                print(f"⚠️ FFmpeg stderr: {result.stderr[-500:]}")
-                raise Exception(f"FFmpeg hatası: {result.stderr[-200:]}")
+                print(f"⚠️ Stream copy başarısız, re-encode yapılacak: {result.stderr[-300:]}")
+                with open(concat_list_path, 'w') as f:
+                    for vp in local_files:
+                        f.write(f"file '{vp}'\n")
+        
+        # 4b. Tam re-encode (makinedeki en hızlı encoder)
+        encoder_name = "copy"
+        if result is None or result.returncode != 0:
+            encoder = pick_encoder()
+            encoder_name = encoder["name"]
+            print(f"🔗 FFmpeg ile birleştiriliyor ({encoder_name})...")
+            with Timer("PY_FFMPEG_CONCAT", {**meta, "mode": "reencode", "encoder": encoder_name}):
+                ffmpeg_cmd = [
+                    'ffmpeg', '-y',
+                    *encoder["input_args"],
+                    '-f', 'concat',
+                    '-safe', '0',
+                    '-i', concat_list_path,
+                    *encoder["args"],
+                    '-c:a', 'aac',
+                    '-b:a', '128k',
+                    output_path
+                ]
+                
+                result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+                
+                if result.returncode != 0:
+                    print(f"⚠️ FFmpeg stderr: {result.stderr[-500:]}")
+                    raise Exception(f"FFmpeg hatası: {result.stderr[-200:]}")
         
         print(f"✅ Birleştirme tamamlandı: {output_path}")
         
-        # 4. Final video CDN'e yükle (her zaman)
+        # 5. Final video CDN'e yükle (her zaman)
         print("\n☁️ Final video CDN'e yükleniyor...")
         with Timer("PY_CDN_FINAL_UPLOAD", {"project_id": project_id}):
             cdn_url = upload_video(output_path, f"final_{project_id}")
+        register_artifact(project_id, "final", output_path, cdn_url=cdn_url)
         
         print(f"\n🎉 ========== CONCAT TAMAMLANDI ==========")
         print(f"🔗 CDN URL: {cdn_url}")
@@ -418,7 +872,8 @@ def concatenate_videos(video_urls: list, project_id: str) -> dict:
         return {
             "success": True,
             "video_url": cdn_url,
-            "project_id": project_id
+            "project_id": project_id,
+            "encoder": encoder_name
         }
         
     except Exception as e:
@@ -449,7 +904,6 @@ def gpu_test_loop_videos(
     import subprocess
     import shutil
     import time
-    import json
     
     print(f"\n🧪 ========== GPU TEST BAŞLADI (FFmpeg Direct) ==========")
     print(f"📦 Video URL Sayısı: {len(video_urls)}")
@@ -466,6 +920,7 @@ def gpu_test_loop_videos(
     
     temp_dir = tempfile.mkdtemp(prefix="gpu_test_")
     metrics = {
+        "encoder": None,
         "download_time_ms": 0,
         "encode_time_ms": 0,
         "upload_time_ms": 0,
@@ -479,23 +934,16 @@ def gpu_test_loop_videos(
         print("📥 Videolar indiriliyor...")
         download_start = time.time()
         
-        downloaded_files = []
         video_durations = []
+        downloaded_files = download_many([
+            (url, os.path.join(temp_dir, f"source_{i:03d}.mp4")) for i, url in enumerate(video_urls)
+        ])
         
-        for i, url in enumerate(video_urls):
-            local_path = os.path.join(temp_dir, f"source_{i:03d}.mp4")
-            print(f"   ⬇️ ({i+1}/{len(video_urls)}) {url[:60]}...")
-            download_file(url, local_path)
-            downloaded_files.append(local_path)
+        for i, local_path in enumerate(downloaded_files):
+            print(f"   ⬇️ ({i+1}/{len(video_urls)}) {video_urls[i][:60]}...")
             
-            # FFprobe ile süre al
-            probe_cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', local_path
-            ]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            probe_data = json.loads(probe_result.stdout)
-            duration = float(probe_data['format']['duration'])
+            # Süre al (media info cache)
+            duration = get_duration(local_path)
             video_durations.append(duration)
             print(f"      ✅ Süre: {duration:.2f}s")
         
@@ -548,22 +996,21 @@ def gpu_test_loop_videos(
         print(f"\n📦 Toplam video sayısı: {video_count}")
         print(f"⏱️ Toplam süre: {current_duration:.2f}s ({current_duration/60:.1f} dakika)")
         
-        # 3. FFmpeg ile birleştir + NVENC encode
-        print("\n🔗 FFmpeg ile birleştiriliyor (GPU NVENC)...")
+        # 3. FFmpeg ile birleştir + encode (NVENC yoksa en hızlı alternatif)
+        encoder = pick_encoder()
+        metrics["encoder"] = encoder["name"]
+        print(f"\n🔗 FFmpeg ile birleştiriliyor ({encoder['name']})...")
         output_path = os.path.join(temp_dir, f"{test_name}_output.mp4")
         
         encode_start = time.time()
         
         ffmpeg_cmd = [
             'ffmpeg', '-y',
+            *encoder["input_args"],
             '-f', 'concat',
             '-safe', '0',
             '-i', concat_list_path,
-            '-c:v', 'h264_nvenc',      # GPU encoding
-            '-preset', 'fast',
-            '-b:v', '5M',
-            '-maxrate', '8M',
-            '-bufsize', '10M',
+            *encoder["args"],
             '-c:a', 'aac',
             '-b:a', '128k',
             output_path
@@ -599,6 +1046,7 @@ def gpu_test_loop_videos(
         print(f"\n🎉 ========== GPU TEST TAMAMLANDI ==========")
         print(f"🔗 CDN URL: {cdn_url}")
         print(f"\n📊 PERFORMANS METRİKLERİ:")
+        print(f"   🎛️ Encoder: {metrics['encoder']}")
         print(f"   ⬇️ İndirme: {metrics['download_time_ms']/1000:.2f}s")
         print(f"   🎬 Encoding: {metrics['encode_time_ms']/1000:.2f}s")
         print(f"   ⬆️ Yükleme: {metrics['upload_time_ms']/1000:.2f}s")
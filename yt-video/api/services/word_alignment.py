@@ -0,0 +1,330 @@
+"""
+Kelime Zamanlama Hizalama - TTS sesinden gerçek kelime zamanları
+Ağ veya model gerektirmez: PCM enerji zarfı (NumPy) → konuşma/sessizlik (VAD)
+→ hece çekirdekleri (enerji tepeleri). Metindeki hece sayıları bu "hece saati"ne
+oturtulur; saat her uzun duraklamada metindeki noktalamaya yeniden bağlanır
+(hata anlatım boyunca birikmez), sessizliğe düşen sınırlar konuşma kenarına çekilir.
+Tüm adımlar vektörel - 15 dakikalık anlatım saniyeler içinde hizalanır.
+"""
+import re
+import subprocess
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# imageio-ffmpeg kullanarak FFmpeg yolunu bul
+try:
+    import imageio_ffmpeg
+    FFMPEG_BINARY = imageio_ffmpeg.get_ffmpeg_exe()
+except ImportError:
+    FFMPEG_BINARY = 'ffmpeg'
+
+# Hizalama çıktısı değişince artırılır (render cache anahtarında kullanılır)
+ALIGNER_VERSION = "align-2"
+
+SAMPLE_RATE = 16000
+HOP_SEC = 0.01        # 10ms kare adımı
+WINDOW_SEC = 0.025    # 25ms enerji penceresi
+SMOOTH_SEC = 0.05     # Zarf yumuşatma (hece tepeleri tek kalsın)
+MIN_PAUSE_SEC = 0.12  # Bundan kısa sessizlik konuşma sayılır
+MIN_PEAK_DB = 3.0     # Hece tepesi ile arasındaki vadi arasındaki en az fark
+MIN_WORD_SEC = 0.08
+MAX_ANCHOR_SKIP = 8     # Ardışık iki bağlantı arasında atlanabilecek en fazla duraklama/noktalama
+ANCHOR_SKIP_COST = 4.0  # Eşleşmeyen noktalama / ANCHOR_PAUSE_SEC'lik duraklama başına ceza (hece)
+ANCHOR_PAUSE_SEC = 0.3  # Tipik noktalama duraklaması - kısa duraklamayı atlamak daha ucuz
+ANCHOR_SHIFT_COST = 2.0  # Bağlantıyı noktalamanın komşu kelime sınırına kaydırma cezası (hece)
+
+# Türkçe + İngilizce ünlüler (hece sayısı ≈ ünlü grubu sayısı)
+VOWEL_GROUPS = re.compile(r"[aeıioöuüâîûy]+", re.IGNORECASE)
+# Cümle/yan cümle sonu: kelime noktalamayla biter (ardından tırnak/parantez olabilir)
+BREAK_PUNCTUATION = re.compile(r"[.,;:!?…]['\"”’»)\]]*$")
+
+
+def decode_pcm(audio_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Sesi FFmpeg ile mono float32 PCM'e çöz"""
+    cmd = [FFMPEG_BINARY, '-v', 'error', '-i', audio_path, '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-']
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"Ses çözülemedi: {result.stderr.decode()[-200:]}")
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def frame_energy_db(pcm: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Kare başına RMS enerji (dB) - kümülatif kare toplamıyla O(n)"""
+    hop = int(sample_rate * HOP_SEC)
+    window = int(sample_rate * WINDOW_SEC)
+    if len(pcm) < window:
+        return np.full(1, -100.0)
+    squares = np.concatenate(([0.0], np.cumsum(pcm.astype(np.float64) ** 2)))
+    starts = np.arange(0, len(pcm) - window + 1, hop)
+    power = (squares[starts + window] - squares[starts]) / window
+    return 10 * np.log10(power + 1e-10)
+
+
+def _smooth(values: np.ndarray, frames: int) -> np.ndarray:
+    if frames < 2 or len(values) < frames:
+        return values
+    kernel = np.hanning(frames + 2)[1:-1]
+    return np.convolve(values, kernel / kernel.sum(), mode="same")
+
+
+def _runs(mask: np.ndarray) -> tuple:
+    """True dizilerinin (başlangıç, bitiş) kare indeksleri (bitiş hariç)"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def voice_activity(energy_db: np.ndarray) -> np.ndarray:
+    """
+    Konuşma maskesi: gürültü tabanı ile konuşma seviyesi arasındaki eşik.
+    MIN_PAUSE_SEC'ten kısa sessizlikler (kapantı sessizleri vb.) konuşmaya katılır.
+    """
+    floor = np.percentile(energy_db, 10)
+    peak = np.percentile(energy_db, 95)
+    threshold = max(floor + 0.35 * (peak - floor), peak - 45)
+    mask = energy_db > threshold
+
+    starts, ends = _runs(~mask)
+    min_pause = int(MIN_PAUSE_SEC / HOP_SEC)
+    short = (ends - starts) < min_pause
+    # Baştaki/sondaki sessizlik kısa olsa da sessizlik kalır
+    inner = (starts > 0) & (ends < len(mask))
+    fill = np.zeros(len(mask) + 1, dtype=np.int32)
+    np.add.at(fill, starts[short & inner], 1)
+    np.add.at(fill, ends[short & inner], -1)
+    return mask | (np.cumsum(fill)[:-1] > 0)
+
+
+def syllable_nuclei(energy_db: np.ndarray, speech: np.ndarray) -> np.ndarray:
+    """
+    Hece çekirdekleri: yumuşatılmış zarftaki yerel tepeler (konuşma içinde).
+    Aralarındaki vadi MIN_PEAK_DB'den sığ olan komşu tepelerden küçüğü atılır.
+
+    Returns:
+        Tepe kare indeksleri (artan)
+    """
+    env = _smooth(energy_db, int(SMOOTH_SEC / HOP_SEC))
+    if len(env) < 3:
+        return np.array([], dtype=np.int64)
+    is_peak = (env[1:-1] > env[:-2]) & (env[1:-1] >= env[2:]) & speech[1:-1]
+    peaks = np.flatnonzero(is_peak) + 1
+
+    for _ in range(4):
+        if len(peaks) < 2:
+            break
+        valleys = np.minimum.reduceat(env, peaks)[:-1]  # ardışık tepeler arasındaki en düşük nokta
+        left, right = env[peaks[:-1]], env[peaks[1:]]
+        shallow = np.minimum(left, right) - valleys < MIN_PEAK_DB
+        # Bir vadi iki konuşma parçası arasındaysa (sessizlik) tepeler ayrı kalır
+        shallow &= np.minimum.reduceat(speech.astype(np.int8), peaks)[:-1] > 0
+        if not shallow.any():
+            break
+        drop = np.zeros(len(peaks), dtype=bool)
+        drop[:-1] |= shallow & (left < right)
+        drop[1:] |= shallow & (left >= right)
+        peaks = peaks[~drop]
+    return peaks
+
+
+def count_syllables(words: list) -> np.ndarray:
+    """Kelime başına tahmini hece sayısı (en az 1; rakam/kısaltma için harf uzunluğu)"""
+    counts = []
+    for word in words:
+        groups = len(VOWEL_GROUPS.findall(word))
+        if not groups:
+            letters = sum(ch.isalnum() for ch in word)
+            groups = max(1, round(letters / 2.5))
+        counts.append(groups)
+    return np.asarray(counts, dtype=np.float64)
+
+
+def text_breaks(words: list) -> np.ndarray:
+    """Noktalamayla biten kelimelerin indeksleri (son kelime hariç - sonrası zaten metin sonu)"""
+    return np.asarray([i for i, word in enumerate(words[:-1]) if BREAK_PUNCTUATION.search(word)], dtype=np.int64)
+
+
+def match_pauses(pause_x: np.ndarray, pause_sec: np.ndarray, break_x: np.ndarray, scale: float) -> tuple:
+    """
+    Duraklamaları noktalamalarla sırayla eşleştir (dinamik programlama).
+
+    pause_x ses saatindeki, break_x metindeki ilerlemedir (0..1). Ardışık iki eşleşme
+    arasında ses ve metin ilerlemesi farkı (scale ile hece cinsinden) maliyettir -
+    küresel saatin biriken kayması değil, sadece yerel fark sayılır. Noktalamasız
+    duraklama (nefes, kelime arası boşluk) ve duraksız noktalama cezayla atlanır;
+    duraklamanın cezası süresiyle orantılı (kısa boşluk noktalamaya zor bağlanır).
+
+    Returns:
+        (duraklama indeksleri, noktalama indeksleri) - eşleşmeyen yoksa boş diziler
+    """
+    a = np.concatenate(([0.0], pause_x, [1.0]))
+    b = np.concatenate(([0.0], break_x, [1.0]))
+    steps = np.arange(1, MAX_ANCHOR_SKIP + 2)
+    pad = len(steps)
+    # b_gap[dk - 1, k] = b[k] - b[k - dk] (k < dk: geçersiz, sonsuz)
+    b_gap = b - np.concatenate((np.full(pad, np.inf), b))[pad - steps[:, None] + np.arange(len(b))]
+    break_skipped = ANCHOR_SKIP_COST * (steps[:, None] - 1)
+    # pause_skipped[j] - pause_skipped[j - dj + 1]: j - dj ile j arasında atlanan duraklamaların cezası
+    pause_skipped = np.concatenate(([0.0, 0.0], np.cumsum(pause_sec / ANCHOR_PAUSE_SEC * ANCHOR_SKIP_COST)))
+
+    # cost[pad + j, pad + k]: j. duraklama k. noktalamayla eşleşene kadar en düşük maliyet
+    # (baştaki sonsuz dolgu j - dj < 0 / k - dk < 0 geçişlerini eler)
+    cost = np.full((pad + len(a), pad + len(b)), np.inf)
+    cost[pad, pad] = 0.0
+    back = np.zeros((len(a), len(b)), dtype=np.int64)
+    columns = np.arange(len(b))
+    for j in range(1, len(a)):
+        # previous[dj - 1, dk - 1, k] = cost[j - dj, k - dk]
+        previous = sliding_window_view(cost[pad + j - steps], len(b), axis=1)[:, pad - steps]
+        prev_j = np.maximum(j - steps, 0)
+        candidate = (previous
+                     + np.abs((a[j] - a[prev_j])[:, None, None] - b_gap) * scale
+                     + break_skipped
+                     + (pause_skipped[j] - pause_skipped[prev_j + 1])[:, None, None]).reshape(-1, len(b))
+        choice = candidate.argmin(axis=0)
+        cost[pad + j, pad:] = candidate[choice, columns]
+        back[j] = choice
+
+    empty = np.array([], dtype=np.int64)
+    j, k = len(a) - 1, len(b) - 1
+    if not np.isfinite(cost[pad + j, pad + k]):
+        return empty, empty
+    pairs = []
+    while j > 0:
+        dj, dk = divmod(back[j, k], pad)
+        j, k = j - dj - 1, k - dk - 1
+        if j > 0:
+            pairs.append((j - 1, k - 1))
+    if not pairs:
+        return empty, empty
+    pauses, breaks = np.asarray(pairs[::-1], dtype=np.int64).T
+    return pauses, breaks
+
+
+def shift_anchors(anchor_x: np.ndarray, anchor_idx: np.ndarray, boundaries: np.ndarray, scale: float) -> np.ndarray:
+    """
+    Eşleşen duraklama noktalamanın bir kelime önüne/arkasına daha iyi oturuyorsa
+    bağlantıyı o kelime sınırına kaydır (duraksız virgülün yanındaki nefes duraklaması).
+
+    Returns:
+        Bağlantıların kelime sınırı indeksleri
+    """
+    x = np.concatenate(([0.0], anchor_x, [1.0]))
+    idx = np.concatenate(([0], anchor_idx, [len(boundaries) - 1]))
+    for m in range(1, len(idx) - 1):
+        best, best_cost = idx[m], np.inf
+        for shift in (-1, 0, 1):
+            i = idx[m] + shift
+            if not idx[m - 1] < i < idx[m + 1]:
+                continue
+            cost = (abs((x[m] - x[m - 1]) - (boundaries[i] - boundaries[idx[m - 1]]))
+                    + abs((x[m + 1] - x[m]) - (boundaries[idx[m + 1]] - boundaries[i]))) * scale
+            cost += ANCHOR_SHIFT_COST if shift else 0.0
+            if cost < best_cost:
+                best, best_cost = i, cost
+        idx[m] = best
+    return idx[1:-1]
+
+
+def align_pcm(pcm: np.ndarray, text: str, sample_rate: int = SAMPLE_RATE) -> dict:
+    """
+    PCM + metin → kelime zamanları.
+
+    Returns:
+        {"words": [{"text", "start", "end"}, ...], "method", "syllables", "nuclei", "anchors", "speech_sec"}
+    """
+    words = text.split()
+    if not words:
+        return {"words": [], "method": "empty", "syllables": 0, "nuclei": 0, "anchors": 0, "speech_sec": 0.0}
+
+    energy = frame_energy_db(pcm, sample_rate)
+    speech = voice_activity(energy)
+    if not speech.any():
+        speech[:] = True
+    voiced = np.flatnonzero(speech)
+    first, last = voiced[0], voiced[-1] + 1
+
+    syllables = count_syllables(words)
+    total = syllables.sum()
+    boundaries = np.concatenate(([0.0], np.cumsum(syllables))) / total  # 0..1 metin ilerlemesi
+
+    nuclei = syllable_nuclei(energy, speech)
+    n = len(nuclei)
+    if 0.5 * total <= n <= 2.0 * total:
+        # Hece saati: k. vadi (k-1. ve k. tepe arası) ilerleme k/n'ye karşılık gelir
+        method = "syllable"
+        valleys = (nuclei[:-1] + nuclei[1:]) / 2
+        knots_x = np.concatenate(([0.0], np.arange(1, n) / n, [1.0]))
+        knots_t = np.concatenate(([first], valleys, [last])).astype(np.float64)
+    else:
+        # Tepe sayısı metinle uyuşmuyor - konuşma süresi saati (sessizlikler atlanır)
+        method = "speech"
+        clock = np.concatenate(([0.0], np.cumsum(speech)))
+        knots_x = clock / clock[-1]
+        knots_t = np.arange(len(clock), dtype=np.float64)
+
+    # Uzun duraklamalar (iç sessizlikler, hepsi ≥ MIN_PAUSE_SEC) noktalamalara bağlanır:
+    # metin ilerlemesi bağlantılar arasında parça parça ses saatine taşınır
+    pause_starts, pause_ends = _runs(~speech)
+    inner = (pause_starts > first) & (pause_ends < last)
+    pause_x = np.interp((pause_starts[inner] + pause_ends[inner]) / 2, knots_t, knots_x)
+    pause_sec = (pause_ends[inner] - pause_starts[inner]) * HOP_SEC
+    breaks = text_breaks(words)
+    matched_pauses, matched_breaks = match_pauses(pause_x, pause_sec, boundaries[breaks + 1], total)
+    anchors = shift_anchors(pause_x[matched_pauses], breaks[matched_breaks] + 1, boundaries, total)
+    progress = np.interp(
+        boundaries,
+        np.concatenate(([0.0], boundaries[anchors], [1.0])),
+        np.concatenate(([0.0], pause_x[matched_pauses], [1.0]))
+    )
+    frames = np.interp(progress, knots_x, knots_t)
+
+    starts, ends = frames[:-1].copy(), frames[1:].copy()
+
+    # Sessizliğe düşen sınırlar: bitiş önceki konuşma sonuna, başlangıç sonraki konuşma başına
+    run_starts, run_ends = _runs(speech)
+    start_idx = np.clip(starts.astype(np.int64), 0, len(speech) - 1)
+    end_idx = np.clip(np.ceil(ends).astype(np.int64) - 1, 0, len(speech) - 1)
+    silent_start = ~speech[start_idx]
+    silent_end = ~speech[end_idx]
+    next_run = np.searchsorted(run_starts, starts, side="left")
+    prev_run = np.searchsorted(run_ends, ends, side="right") - 1
+    ok = silent_start & (next_run < len(run_starts))
+    starts[ok] = run_starts[next_run[ok]]
+    ok = silent_end & (prev_run >= 0)
+    ends[ok] = run_ends[prev_run[ok]]
+
+    # Başlangıçlar artan ve aralarında en az MIN_WORD_SEC: s[i] - i*m dizisinin
+    # kümülatif maksimumu (tek geçiş; kaydırma sonraki kelimelere de taşınır)
+    min_frames = MIN_WORD_SEC / HOP_SEC
+    spacing = np.arange(len(starts)) * min_frames
+    starts = np.maximum.accumulate(starts - spacing) + spacing
+    # Bitiş en az MIN_WORD_SEC sonra, en geç sonraki kelimenin başında (örtüşme yok)
+    ends = np.maximum(ends, starts + min_frames)
+    ends[:-1] = np.minimum(ends[:-1], starts[1:])
+
+    # Kare → saniye (kare merkezi: pencerenin ortası)
+    offset = WINDOW_SEC / 2
+    start_sec = np.round(starts * HOP_SEC + offset, 3)
+    end_sec = np.round(ends * HOP_SEC + offset, 3)
+    return {
+        "words": [{"text": w, "start": float(s), "end": float(e)} for w, s, e in zip(words, start_sec, end_sec)],
+        "method": method,
+        "syllables": int(total),
+        "nuclei": int(n),
+        "anchors": len(matched_pauses),
+        "speech_sec": round(float(speech.sum()) * HOP_SEC, 2)
+    }
+
+
+def align_words(audio_path: str, text: str) -> list:
+    """
+    TTS sesinden kelime zamanları.
+
+    Returns:
+        [{"text", "start", "end"}, ...] - subtitle_service word_timings formatı
+    """
+    result = align_pcm(decode_pcm(audio_path), text)
+    print(f"🎯 Kelime hizalama: {len(result['words'])} kelime, {result['syllables']} hece / "
+          f"{result['nuclei']} tepe ({result['method']}), {result['anchors']} duraklama bağlantısı, "
+          f"konuşma {result['speech_sec']}s")
+    return result["words"]
@@ -0,0 +1,34 @@
+"""
+Bloklayan İşler için Executor
+subprocess / requests / boto3 çağrılarını event loop dışında çalıştırır,
+böylece uzun bir FFmpeg işlemi /health ve diğer istekleri dondurmaz.
+"""
+import os
+import sys
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# API dizinine path ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import BLOCKING_WORKERS
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Senkron fonksiyonu thread havuzunda çalıştır ve sonucu bekle.
+    Havuz doluysa iş sırada bekler (BLOCKING_WORKERS üst sınırı).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def get_executor_stats() -> dict:
+    """Havuz durumu (worker sayısı ve bekleyen iş)"""
+    return {
+        "workers": BLOCKING_WORKERS,
+        "threads": len(_executor._threads),
+        "queued": _executor._work_queue.qsize()
+    }
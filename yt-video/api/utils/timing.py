@@ -25,6 +25,11 @@ class Timer:
         self.start_time = None
         self.end_time = None
         self.duration_ms = None
+        self.error = None
+    
+    def fail(self, error: str):
+        """İstisna fırlatmadan başarısız biten işlem (log status=error yazılır)"""
+        self.error = error
     
     def __enter__(self):
         self.start_time = time.time()
@@ -33,8 +38,8 @@ class Timer:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.end_time = time.time()
         self.duration_ms = int((self.end_time - self.start_time) * 1000)
-        self._log(status='error' if exc_type else 'success', 
-                  error=str(exc_val) if exc_val else None)
+        self._log(status='error' if exc_type or self.error else 'success', 
+                  error=str(exc_val) if exc_val else self.error)
         return False
     
     def _log(self, status='success', error=None):
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Kelime hizalama benchmark (eşit bölme vs enerji/hece hizalama)
+Kullanım: python benchmark_alignment.py [dakika] [tekrar] [bozma_oranı]
+
+Bilinen kelime sınırlarıyla sentetik anlatım üretilir: her hece harmonik bir
+ses patlaması (süre hece başına değişir), kelimeler arası kısa boşluk, noktalamalı
+kelimelerden sonra uzun duraklama (bazı virgüller duraksız okunur, bazı duraklamalar
+noktalamasız nefestir). Seslendirilen hece sayısı metindeki ünlü sayısıyla aynı
+olursa ölçüm kendini doğrular; bu yüzden kelimelerin bir kısmı bozulur
+(bozma_oranı, varsayılan 0.3): hece düşer (ünlü yutma), iki hece arada çukur
+olmadan kaynaşır veya fazladan hece eklenir. Oran 0 ve 0.3 için ayrı ölçülür.
+Ölçülenler:
+  1. Hizalama süresi (PCM → kelime zamanları)
+  2. Kelime başlangıç hatası: eski eşit bölme (build_word_timings) vs hizalama
+  3. FFmpeg ile WAV çözme dahil uçtan uca süre
+"""
+
+import os
+import sys
+import time
+import wave
+import random
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from services.subtitle_service import build_word_timings
+from services.word_alignment import SAMPLE_RATE, align_pcm, align_words, count_syllables
+
+MINUTES = float(sys.argv[1]) if len(sys.argv) > 1 else 15
+REPEAT = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+PERTURB = float(sys.argv[3]) if len(sys.argv) > 3 else 0.3
+
+VOCABULARY = ("antik", "bir", "şehir", "gizemli", "tarih", "boyunca", "insanlar", "ve", "efsane",
+              "imparatorluk", "keşif", "savaş", "deniz", "dağların", "ardında", "kayboldu", "o",
+              "gün", "sessizlik", "hazine", "yolculuk", "başladı", "karanlık", "ışık")
+
+
+def synthesize(minutes: float, seed: int = 0, perturb: float = 0.0) -> tuple:
+    """Sentetik anlatım: (pcm, metin, gerçek kelime zamanları)"""
+    rng = random.Random(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    chunks, truth, words = [], [], []
+    cursor = 0
+
+    def silence(seconds):
+        nonlocal cursor
+        n = int(seconds * SAMPLE_RATE)
+        chunks.append(np.zeros(n, dtype=np.float32))
+        cursor += n
+
+    def burst(seconds, dip=True):
+        nonlocal cursor
+        n = int(seconds * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        f0 = rng.uniform(110, 180)
+        tone = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+        chunks.append((0.3 * rng.uniform(0.5, 1.0) * np.hanning(n) * tone).astype(np.float32))
+        cursor += n
+        if dip:
+            silence(rng.uniform(0.0, 0.03))  # heceler arası (ünsüz) kısa çukur
+
+    silence(0.4)
+    while cursor < total:
+        word = rng.choice(VOCABULARY)
+        start = cursor
+        spoken = int(count_syllables([word])[0])
+        merge = False
+        if rng.random() < perturb:
+            kind = rng.choice(("elide", "merge", "extra"))
+            if kind == "elide" and spoken > 1:
+                spoken -= 1
+            elif kind == "merge" and spoken > 1:
+                spoken -= 1
+                merge = True
+            else:
+                spoken += 1
+        for i in range(spoken):
+            if merge and i == 0:
+                # İki hece tek uzun patlama (aradaki çukur yok)
+                burst(rng.uniform(0.3, 0.45))
+            else:
+                burst(rng.uniform(0.14, 0.26))
+        truth.append((start / SAMPLE_RATE, cursor / SAMPLE_RATE))
+        roll = rng.random()
+        if roll < 0.12:
+            # Cümle/yan cümle sonu - virgüllerin bir kısmı duraksız okunur
+            mark = rng.choice((".", ".", ",", ",", "?", ";"))
+            words.append(word + mark)
+            pause = mark != "," or rng.random() < 0.7
+        else:
+            # Nadiren noktalamasız nefes duraklaması
+            words.append(word)
+            pause = roll < 0.14
+        silence(rng.uniform(0.3, 0.6) if pause else rng.uniform(0.02, 0.08))
+    silence(0.5)
+
+    pcm = np.concatenate(chunks)
+    pcm += np.random.default_rng(seed).normal(0, 0.002, len(pcm)).astype(np.float32)
+    return pcm, " ".join(words), np.asarray(truth)
+
+
+def errors(timings: list, truth: np.ndarray) -> dict:
+    starts = np.asarray([w["start"] for w in timings])
+    diff = np.abs(starts - truth[:, 0])
+    return {"mean": diff.mean() * 1000, "p90": np.percentile(diff, 90) * 1000, "within_100ms": (diff <= 0.1).mean() * 100}
+
+
+def best_of(fn) -> tuple:
+    times, result = [], None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    pcm, text, truth = synthesize(MINUTES, perturb=PERTURB)
+    duration = len(pcm) / SAMPLE_RATE
+    print(f"🧪 {duration / 60:.1f} dakikalık sentetik anlatım: {len(truth)} kelime, en iyi {REPEAT} tekrar")
+
+    align_time, result = best_of(lambda: align_pcm(pcm, text))
+
+    print(f"\n📊 HİZALAMA (bozma oranı {PERTURB})")
+    print(f"   Süre: {align_time * 1000:.0f}ms ({duration / align_time:.0f}x gerçek zaman), "
+          f"yöntem: {result['method']} ({result['syllables']} hece / {result['nuclei']} tepe, "
+          f"{result['anchors']} duraklama bağlantısı)")
+
+    print(f"\n📊 KELİME BAŞLANGIÇ HATASI")
+    for perturb in sorted({0.0, PERTURB}):
+        p_pcm, p_text, p_truth = synthesize(MINUTES, perturb=perturb)
+        aligned = align_pcm(p_pcm, p_text)
+        uniform = build_word_timings(p_text, len(p_pcm) / SAMPLE_RATE)
+        for name, timings in (("Eşit bölme", uniform), (f"Hizalama ({aligned['method']})", aligned["words"])):
+            e = errors(timings, p_truth)
+            print(f"   bozma {perturb:.2f} {name:<20} ort. {e['mean']:8.0f}ms | p90 {e['p90']:8.0f}ms | "
+                  f"≤100ms: {e['within_100ms']:5.1f}%")
+
+    tmp_dir = tempfile.mkdtemp(prefix="align_bench_")
+    wav_path = os.path.join(tmp_dir, "narration.wav")
+    try:
+        with wave.open(wav_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes((np.clip(pcm, -1, 1) * 32767).astype(np.int16).tobytes())
+        end_to_end, _ = best_of(lambda: align_words(wav_path, text))
+        print(f"\n📊 Uçtan uca (FFmpeg çözme + hizalama): {end_to_end * 1000:.0f}ms")
+    finally:
+        os.remove(wav_path)
+        os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: R2 upload - eski yol vs havuzlu client + multipart
+Kullanım: python benchmark_cdn_upload.py [endpoint] [büyük_dosya_mb] [küçük_dosya_sayısı]
+
+S3 uyumlu lokal bir sunucuya karşı çalışır, örn.:
+    docker run -p 9000:9000 minio/minio server /data
+    python -m moto.server -p 9000
+
+- legacy:    her dosyada yeni client + tek parça put_object (eski cdn_service)
+- pooled:    paylaşılan client + tek parça put_object
+- multipart: paylaşılan client + TransferConfig (cdn_service.upload_file)
+"""
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+
+ENDPOINT = sys.argv[1] if len(sys.argv) > 1 else os.getenv("BENCH_S3_ENDPOINT", "http://localhost:9000")
+LARGE_MB = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+SMALL_COUNT = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+SMALL_MB = 2
+
+# cdn_service config'i import sırasında okur - lokal sunucuya yönlendir
+os.environ["R2_ENDPOINT"] = ENDPOINT
+os.environ["R2_ACCESS_KEY_ID"] = os.getenv("BENCH_S3_ACCESS_KEY", "minioadmin")
+os.environ["R2_SECRET_ACCESS_KEY"] = os.getenv("BENCH_S3_SECRET_KEY", "minioadmin")
+os.environ["R2_BUCKET_NAME"] = os.getenv("BENCH_S3_BUCKET", "benchmark")
+os.environ["R2_PUBLIC_URL"] = f"{ENDPOINT}/{os.environ['R2_BUCKET_NAME']}"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+import boto3
+from botocore.exceptions import ClientError
+
+from services import cdn_service
+from config import R2_BUCKET_NAME
+
+
+def make_file(path: str, size_mb: int):
+    """Rastgele içerikli test dosyası"""
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+
+def upload_legacy(path: str, key: str):
+    client = cdn_service.create_s3_client()
+    with open(path, 'rb') as f:
+        client.put_object(Bucket=R2_BUCKET_NAME, Key=key, Body=f, ContentType="video/mp4")
+
+
+def upload_pooled(path: str, key: str):
+    with open(path, 'rb') as f:
+        cdn_service.get_s3_client().put_object(Bucket=R2_BUCKET_NAME, Key=key, Body=f, ContentType="video/mp4")
+
+
+def upload_multipart(path: str, key: str):
+    cdn_service.upload_file(path, key, "video/mp4")
+
+
+def run(name: str, upload, files: list) -> float:
+    start = time.time()
+    for i, (path, size_mb) in enumerate(files):
+        upload(path, f"benchmark/{name}_{i}_{os.path.basename(path)}")
+    return time.time() - start
+
+
+def main():
+    # Bucket oluşturma us-east-1 client ile: R2 client'ının region_name='auto' değeri
+    # S3 uyumlu sunucularda (moto, minio) IllegalLocationConstraintException verir
+    admin = boto3.client(
+        's3',
+        endpoint_url=ENDPOINT,
+        aws_access_key_id=os.environ["R2_ACCESS_KEY_ID"],
+        aws_secret_access_key=os.environ["R2_SECRET_ACCESS_KEY"],
+        region_name='us-east-1'
+    )
+    try:
+        admin.create_bucket(Bucket=R2_BUCKET_NAME)
+    except ClientError as e:
+        if e.response["Error"]["Code"] not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+            raise
+
+    temp_dir = tempfile.mkdtemp(prefix="cdn_bench_")
+    try:
+        print(f"📦 Test dosyaları hazırlanıyor: 1 x {LARGE_MB} MB + {SMALL_COUNT} x {SMALL_MB} MB")
+        large = os.path.join(temp_dir, "large.mp4")
+        make_file(large, LARGE_MB)
+        small = []
+        for i in range(SMALL_COUNT):
+            path = os.path.join(temp_dir, f"small_{i}.mp4")
+            make_file(path, SMALL_MB)
+            small.append((path, SMALL_MB))
+
+        scenarios = [("legacy", upload_legacy), ("pooled", upload_pooled), ("multipart", upload_multipart)]
+        results = []
+        for name, upload in scenarios:
+            print(f"\n🚀 {name}...")
+            large_time = run(name, upload, [(large, LARGE_MB)])
+            small_time = run(name, upload, small)
+            results.append((name, large_time, small_time))
+
+        print(f"\n📊 SONUÇLAR ({ENDPOINT})")
+        print(f"   {'yol':<10} {'büyük dosya':>14} {'MB/s':>8} {'küçük dosyalar':>16} {'dosya/s':>8}")
+        for name, large_time, small_time in results:
+            print(f"   {name:<10} {large_time:>13.2f}s {LARGE_MB / large_time:>8.1f} "
+                  f"{small_time:>15.2f}s {SMALL_COUNT / small_time:>8.1f}")
+
+        base_large, base_small = results[0][1], results[0][2]
+        best = results[-1]
+        print(f"\n⚡ multipart vs legacy: büyük dosya {base_large / best[1]:.2f}x, "
+              f"küçük dosyalar {base_small / best[2]:.2f}x")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Ken Burns kare motoru benchmark + kalite kontrolü
+Kullanım: python benchmark_ken_burns.py [resim_yolu] [kare_sayısı] [yön]
+
+- PIL yolu (her karede crop + LANCZOS) ile vektörize motoru fps olarak karşılaştırır
+- Vektörize kareleri alt-piksel hassas PIL referansıyla (resize box=) kıyaslar,
+  PSNR tolerans altındaysa çıkış kodu 1 döner
+"""
+
+import sys
+import os
+import time
+import numpy as np
+from PIL import Image, ImageFilter
+
+from ken_burns_engine import KenBurnsFrameEngine
+
+OUTPUT_SIZE = (1920, 1080)
+VISIBILITY_RATIO = 0.90
+MIN_PSNR_DB = 38.0
+
+
+def synthetic_image(width=1024, height=768) -> Image.Image:
+    """Dokulu test resmi (FLUX çıktı boyutu)"""
+    rng = np.random.default_rng(42)
+    noise = (rng.random((height, width, 3)) * 255).astype(np.uint8)
+    return Image.fromarray(noise).filter(ImageFilter.GaussianBlur(1.5))
+
+
+def crop_geometry(img: Image.Image, horizontal: bool):
+    """create_ken_burns_video ile aynı crop boyutları ve maksimum offset"""
+    w, h = img.size
+    if horizontal:
+        return (w * VISIBILITY_RATIO, h), (w - w * VISIBILITY_RATIO, 0)
+    return (w, h * VISIBILITY_RATIO), (0, h - h * VISIBILITY_RATIO)
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2)
+    return float('inf') if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def main():
+    if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+        img = Image.open(sys.argv[1]).convert('RGB')
+        print(f"📷 Resim: {sys.argv[1]}")
+    else:
+        img = synthetic_image()
+        print("📷 Sentetik test resmi kullanılıyor")
+
+    frame_count = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    horizontal = (sys.argv[3].lower() if len(sys.argv) > 3 else "h") in ["h", "horizontal"]
+
+    (crop_w, crop_h), (max_x, max_y) = crop_geometry(img, horizontal)
+    offsets = [(max_x * i / (frame_count - 1), max_y * i / (frame_count - 1)) for i in range(frame_count)]
+
+    print(f"   Boyut: {img.width}x{img.height}")
+    print(f"   Kare: {frame_count}")
+    print(f"   Pan: {'yatay' if horizontal else 'dikey'}")
+
+    # 1. PIL yolu (mevcut make_frame)
+    start = time.time()
+    for x, y in offsets:
+        cropped = img.crop((x, y, x + crop_w, y + crop_h))
+        np.array(cropped.resize(OUTPUT_SIZE, Image.Resampling.LANCZOS))
+    pil_time = time.time() - start
+
+    # 2. Vektörize motor (hazırlık dahil)
+    start = time.time()
+    engine = KenBurnsFrameEngine(img, crop_size=(crop_w, crop_h), output_size=OUTPUT_SIZE)
+    frames = [engine.frame(x if engine.axis == 1 else y) for x, y in offsets]
+    vec_time = time.time() - start
+
+    # 3. Kalite: alt-piksel hassas referans ile karşılaştır
+    scores = []
+    max_diff = 0
+    for (x, y), frame in zip(offsets[::max(1, frame_count // 10)], frames[::max(1, frame_count // 10)]):
+        reference = np.array(img.resize(OUTPUT_SIZE, Image.Resampling.LANCZOS, box=(x, y, x + crop_w, y + crop_h)))
+        scores.append(psnr(frame, reference))
+        max_diff = max(max_diff, int(np.abs(frame.astype(np.int16) - reference.astype(np.int16)).max()))
+    min_psnr = min(scores)
+
+    print(f"\n📊 SONUÇLAR")
+    print(f"   PIL crop+LANCZOS: {frame_count / pil_time:.1f} fps ({pil_time:.2f}s)")
+    print(f"   Vektörize motor:  {frame_count / vec_time:.1f} fps ({vec_time:.2f}s)")
+    print(f"   Hızlanma:         {pil_time / vec_time:.1f}x")
+    print(f"   Min PSNR:         {min_psnr:.1f} dB (tolerans: {MIN_PSNR_DB} dB)")
+    print(f"   Maks piksel farkı: {max_diff}")
+
+    if min_psnr < MIN_PSNR_DB:
+        print(f"❌ Kalite toleransı aşıldı!")
+        sys.exit(1)
+    print(f"✅ Kalite toleransı içinde")
+
+
+if __name__ == "__main__":
+    main()
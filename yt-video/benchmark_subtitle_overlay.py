@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Karaoke altyazı encode benchmark: libass (ass filtresi) vs sprite overlay
+Kullanım: python benchmark_subtitle_overlay.py [saniye] [genişlik]x[yükseklik] [encode]
+
+render_scene ile aynı arka plan (sentetik resim + Ken Burns filtre zinciri) ve
+aynı kelime zamanlarıyla:
+  - altyazısız (taban çizgisi)
+  - ass      : render_scene'deki mevcut yol (her karede libass)
+  - overlay  : sprite'lar soğuk cache ile (çizim dahil) ve sıcak cache ile
+1. Filtre: kareler null muxer'a yazılır (encode yok) - altyazı bindirme maliyeti
+2. Encode: render_scene ile aynı libx264 ayarları (3. argüman "encode" ise)
+Tabana göre altyazı maliyeti yazdırılır; ayrıca aynı karede iki yolun piksel
+farkı (ortalama mutlak fark, 0-255) ölçülür.
+"""
+
+import os
+import sys
+import time
+import shutil
+import random
+import tempfile
+import subprocess
+
+TMP_DIR = tempfile.mkdtemp(prefix="subtitle_bench_")
+# Soğuk cache ölçümü için sprite'lar geçici dizine
+os.environ["SUBTITLE_SPRITE_DIR"] = os.path.join(TMP_DIR, "sprites")
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+
+import numpy as np
+from PIL import Image
+
+from image_to_video import build_ken_burns_filtergraph
+from services.subtitle_service import FFMPEG_BINARY, build_word_timings, write_ass_file
+from services.subtitle_overlay import build_sprite_track, overlay_input_args, overlay_filter
+
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+WIDTH, HEIGHT = (int(v) for v in (sys.argv[2] if len(sys.argv) > 2 else "1920x1080").split("x"))
+IMAGE_PATH = os.path.join(TMP_DIR, "scene.png")
+ENCODE = len(sys.argv) > 3 and sys.argv[3] == "encode"
+FPS = 30
+WORDS_PER_MINUTE = 150
+
+VOCABULARY = ("antik", "bir", "şehir", "gizemli", "tarih", "boyunca", "insanlar", "ve", "efsane",
+              "imparatorluk", "keşif", "savaş", "deniz", "dağların", "ardında", "kayboldu", "o",
+              "gün", "sessizlik", "hazine", "yolculuk", "başladı", "karanlık", "ışık")
+
+
+def make_scene_image():
+    """Ken Burns girdisi: kare boyutundan büyük, dokulu sentetik resim"""
+    rng = np.random.default_rng(0)
+    h, w = int(HEIGHT * 1.3), int(WIDTH * 1.3)
+    gradient = np.linspace(0, 255, w, dtype=np.float32)[None, :, None] * np.array([0.3, 0.5, 0.8], dtype=np.float32)
+    noise = rng.integers(0, 60, (h, w, 1)).astype(np.float32)
+    Image.fromarray(np.clip(gradient + noise, 0, 255).astype(np.uint8)).save(IMAGE_PATH)
+
+
+def run(filter_args: list, extra_inputs: list = None, output: str = None) -> float:
+    """
+    filter_args: "[bg]" etiketli Ken Burns çıktısını işleyen filtre + map argümanları.
+    output verilirse render_scene ile aynı encoder ayarları, yoksa null muxer; süreyi döndürür.
+    """
+    if output:
+        output_args = ['-c:v', 'libx264', '-preset', 'medium', '-threads', '4', '-pix_fmt', 'yuv420p',
+                       os.path.join(TMP_DIR, output)]
+    else:
+        output_args = ['-pix_fmt', 'yuv420p', '-f', 'null', '-']
+    cmd = [
+        FFMPEG_BINARY, '-v', 'error', '-y',
+        '-framerate', str(FPS), '-i', IMAGE_PATH,
+        *(extra_inputs or []),
+        *filter_args,
+        '-t', str(SECONDS),
+        '-r', str(FPS),
+        *output_args
+    ]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=TMP_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"❌ FFmpeg hatası: {result.stderr[-300:]}")
+        sys.exit(1)
+    return time.perf_counter() - start
+
+
+def report(title: str, base: float, ass: float, overlays: list):
+    print(f"\n📊 {title} (süre | altyazı maliyeti = süre - taban)")
+    print(f"   Altyazısız:       {base:6.2f}s")
+    print(f"   ass:              {ass:6.2f}s | +{ass - base:5.2f}s")
+    for label, sprite_time, run_time, track in overlays:
+        total = sprite_time + run_time
+        speedup = f" → altyazı {(ass - base) / max(total - base, 1e-3):.1f}x ucuz" if total - base > 0 else ""
+        print(f"   {label:<17} {total:6.2f}s | +{total - base:5.2f}s "
+              f"(sprite {sprite_time:.2f}s, {track['rendered']} çizildi / {track['sprites']}){speedup}")
+
+
+def frame_at(video: str, seconds: float) -> np.ndarray:
+    path = os.path.join(TMP_DIR, f"{video}_{seconds}.png")
+    subprocess.run([FFMPEG_BINARY, '-v', 'error', '-y', '-ss', str(seconds), '-i', os.path.join(TMP_DIR, video),
+                    '-frames:v', '1', path], check=True)
+    return np.asarray(Image.open(path).convert("RGB"), dtype=np.int16)
+
+
+def main():
+    rng = random.Random(0)
+    count = max(1, int(SECONDS / 60 * WORDS_PER_MINUTE))
+    text = " ".join(rng.choice(VOCABULARY) for _ in range(count))
+    timings = build_word_timings(text, SECONDS)
+    print(f"🧪 {SECONDS:.0f}s {WIDTH}x{HEIGHT} video, {count} kelime")
+
+    try:
+        make_scene_image()
+        kb = build_ken_burns_filtergraph(IMAGE_PATH, duration=SECONDS, visibility_ratio=0.90,
+                                         pan_direction="top_to_bottom", output_size=(WIDTH, HEIGHT), fps=FPS)
+        base_args = ['-vf', kb]
+
+        write_ass_file(text, SECONDS, os.path.join(TMP_DIR, "subs.ass"), word_timings=timings)
+        ass_args = ['-vf', f"{kb},ass=subs.ass"]
+
+        # Sprite'lar: önce soğuk (çizim dahil), sonra sıcak cache
+        tracks = []
+        for label in ("overlay (soğuk)", "overlay (sıcak)"):
+            start = time.perf_counter()
+            track = build_sprite_track(timings, WIDTH, HEIGHT, os.path.join(TMP_DIR, "subs.ffconcat"))
+            tracks.append((label, time.perf_counter() - start, track))
+        overlay_args = ['-filter_complex', f"[0:v]{kb}[bg];{overlay_filter('bg', '1:v', tracks[0][2], 'v')}",
+                        '-map', '[v]']
+        overlay_inputs = overlay_input_args(tracks[0][2])
+
+        base = run(base_args)
+        ass = run(ass_args)
+        overlays = [(label, sprite_time, run(overlay_args, overlay_inputs), track)
+                    for label, sprite_time, track in tracks]
+        report("FİLTRE (encode yok)", base, ass, overlays)
+
+        if ENCODE:
+            base = run(base_args, output="base.mp4")
+            ass = run(ass_args, output="ass.mp4")
+            encode_time = run(overlay_args, overlay_inputs, output="overlay.mp4")
+            overlays = [(label, sprite_time, encode_time, track) for label, sprite_time, track in tracks]
+            report("ENCODE (libx264 medium)", base, ass, overlays)
+        else:
+            run(ass_args, output="ass.mp4")
+            run(overlay_args, overlay_inputs, output="overlay.mp4")
+
+        # Görünüm: bir kelimenin ortasındaki kare
+        probe_time = round((timings[len(timings) // 2]["start"] + timings[len(timings) // 2]["end"]) / 2, 2)
+        a, b = frame_at("ass.mp4", probe_time), frame_at("overlay.mp4", probe_time)
+        band = slice(int(HEIGHT * 0.6), HEIGHT)
+        print(f"\n🔍 {probe_time}s karesi, ass vs overlay ortalama mutlak fark: "
+              f"tüm kare {np.abs(a - b).mean():.2f}, altyazı bandı {np.abs(a[band] - b[band]).mean():.2f}")
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+ASS karaoke üretici benchmark (eski vs derlenmiş)
+Kullanım: python benchmark_subtitles.py [dakika] [tekrar]
+
+Uzun bir anlatım metni (dakikada ~150 kelime) için Dialogue satırları
+eski yöntemle (her aktif kelimede satırı baştan kurma + replace) ve
+derlenmiş yöntemle (satır başına parçalar bir kez, önek/sonek) üretilir.
+Çıktıların aynı olduğu doğrulanır (zaman damgası yuvarlaması hariç: eski
+kod santisaniyeyi keser, yeni kod en yakına yuvarlar).
+"""
+
+import io
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from services.subtitle_service import (
+    build_word_timings, format_time_ass, generate_ass_content, write_ass_events
+)
+
+MINUTES = float(sys.argv[1]) if len(sys.argv) > 1 else 15
+REPEAT = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+WORDS_PER_MINUTE = 150
+
+VOCABULARY = ("antik", "bir", "şehir", "gizemli", "tarih", "boyunca", "insanlar", "ve", "efsane",
+              "imparatorluk", "keşif", "savaş", "deniz", "dağların", "ardında", "kayboldu", "o",
+              "gün", "sessizlik", "hazine", "yolculuk", "başladı", "karanlık", "ışık")
+
+
+def legacy_format_time(seconds):
+    """Eski format_time_ass (float aritmetiği, keserek)"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    centis = int((seconds % 1) * 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def legacy_generate(word_timings: list, max_chars_per_line: int = 25, fmt=legacy_format_time) -> str:
+    """Eski generate_ass_content gövdesi (karşılaştırma için)"""
+    ass_lines = []
+    lines, current_line, current_length = [], [], 0
+    for w in word_timings:
+        word_len = len(w['text'])
+        if current_length + word_len + len(current_line) > max_chars_per_line and current_line:
+            lines.append(current_line)
+            current_line, current_length = [], 0
+        current_line.append(w)
+        current_length += word_len
+    if current_line:
+        lines.append(current_line)
+
+    for line_words in lines:
+        for i, active_word in enumerate(line_words):
+            text_parts = []
+            for j, w in enumerate(line_words):
+                if i == j:
+                    text_parts.append(f"{{\\1c&HFFFFFF&}}{{\\alpha&H00&}}{{\\3c&H000000&}}{{\\bord15}}{{\\blur5}}{w['text']}")
+                else:
+                    text_parts.append(f"{{\\1c&HFFFFFF&}}{{\\alpha&H00&}}{{\\bord0}}{{\\blur0}}{w['text']}")
+            full_line_text = " ".join(text_parts).replace("  ", " ")
+            ass_lines.append(
+                f"Dialogue: 0,{fmt(active_word['start'])},{fmt(active_word['end'])},Default,,0,0,0,,{full_line_text}"
+            )
+    return "\n".join(ass_lines)
+
+
+def best_of(fn) -> float:
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    rng = random.Random(0)
+    count = int(MINUTES * WORDS_PER_MINUTE)
+    text = " ".join(rng.choice(VOCABULARY) for _ in range(count))
+    duration = MINUTES * 60
+    timings = build_word_timings(text, duration)
+
+    print(f"🧪 {MINUTES:.0f} dakikalık anlatım: {count} kelime, en iyi {REPEAT} tekrar")
+
+    print(f"\n📊 SONUÇLAR")
+    for max_chars in (25, 60):
+        legacy = legacy_generate(timings, max_chars, fmt=format_time_ass)
+        compiled = generate_ass_content(text, duration, max_chars_per_line=max_chars)
+        if legacy != compiled:
+            print(f"❌ Derlenmiş çıktı eski çıktıyla aynı değil (satır {max_chars} karakter)")
+            sys.exit(1)
+
+        legacy_time = best_of(lambda: legacy_generate(timings, max_chars))
+        compiled_time = best_of(lambda: generate_ass_content(text, duration, max_chars_per_line=max_chars, word_timings=timings))
+        stream_time = best_of(lambda: write_ass_events(io.StringIO(), timings, max_chars))
+
+        print(f"   Satır ≤{max_chars} karakter ({len(compiled) / 1024:.0f}KB):")
+        print(f"      Eski:              {legacy_time * 1000:7.1f}ms")
+        print(f"      Derlenmiş (str):   {compiled_time * 1000:7.1f}ms  ({legacy_time / compiled_time:.1f}x)")
+        print(f"      Derlenmiş (akış):  {stream_time * 1000:7.1f}ms  ({legacy_time / stream_time:.1f}x)")
+    print("✅ Çıktılar aynı")
+
+
+if __name__ == "__main__":
+    main()
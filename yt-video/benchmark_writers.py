@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Ken Burns video yazıcıları benchmark (uçtan uca, encode dahil)
+Kullanım: python benchmark_writers.py [resim_yolu] [süre] [yön]
+
+Karşılaştırılan yollar:
+- moviepy + pil         (eski yol: her karede crop + LANCZOS, write_videofile)
+- moviepy + vectorized
+- ffmpeg_pipe + vectorized
+- filtergraph           (Python'da kare yok)
+"""
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+
+from image_to_video import create_ken_burns_video
+from benchmark_ken_burns import synthetic_image
+
+CASES = [
+    ("moviepy", "pil"),
+    ("moviepy", "vectorized"),
+    ("ffmpeg_pipe", "vectorized"),
+    ("filtergraph", None),
+]
+
+
+def main():
+    temp_dir = tempfile.mkdtemp(prefix="bench_writers_")
+
+    try:
+        if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+            image_path = sys.argv[1]
+        else:
+            image_path = os.path.join(temp_dir, "synthetic.png")
+            synthetic_image().save(image_path)
+
+        duration = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+        direction_arg = sys.argv[3].lower() if len(sys.argv) > 3 else "h"
+        pan_direction = "left_to_right" if direction_arg in ["h", "horizontal"] else "bottom_to_top"
+
+        results = []
+        for writer, engine in CASES:
+            output_path = os.path.join(temp_dir, f"{writer}_{engine}.mp4")
+            start = time.time()
+            create_ken_burns_video(
+                image_path=image_path,
+                output_path=output_path,
+                duration=duration,
+                visibility_ratio=0.90,
+                pan_direction=pan_direction,
+                engine=engine or "vectorized",
+                writer=writer
+            )
+            elapsed = time.time() - start
+            size_mb = os.path.getsize(output_path) / (1024 * 1024)
+            results.append((writer, engine or "-", elapsed, size_mb))
+
+        baseline = results[0][2]
+        print(f"\n📊 SONUÇLAR ({duration}s video, {pan_direction})")
+        print(f"{'Yazıcı':<14} {'Motor':<12} {'Süre':<10} {'Hızlanma':<10} {'Boyut':<8}")
+        print("-" * 58)
+        for writer, engine, elapsed, size_mb in results:
+            print(f"{writer:<14} {engine:<12} {f'{elapsed:.2f}s':<10} {f'{baseline / elapsed:.1f}x':<10} {size_mb:.2f} MB")
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
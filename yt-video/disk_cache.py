@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Boyut Sınırlı Disk Cache (LRU) - dizin düzeni <root>/<key[:2]>/<key><ext>
+FLUX API (sonuç cache'i) ve Video API (render cache, altyazı sprite'ları)
+arasında paylaşılır (sadece standart kütüphane).
+
+Sayaçlar ve toplam boyut <root>/stats.json'da (flock ile) tutulur: worker
+process'leri aynı sayaçları günceller, yazma başına tüm dizin gezilmez -
+dizin sadece toplam sınırı aşınca (eviction) veya sayaç yoksa gezilir.
+
+Kullanım: python disk_cache.py <dizin>   (sayaçları yazdırır)
+"""
+
+import os
+import sys
+import json
+import fcntl
+import time
+import shutil
+import threading
+
+STATS_FILE = "stats.json"
+
+
+def write_atomic(path: str, data: bytes):
+    """Geçici dosyaya yaz, sonra yerine taşı (okuyan yarım dosya görmez)"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def copy_atomic(src_path: str, path: str):
+    """Dosyayı geçici isimle kopyala, sonra yerine taşı"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class DiskLRU:
+    """
+    Tek bir cache dizini.
+
+    suffix: sadece bu uzantıyla biten dosyalar kayıt sayılır (None = .json/.tmp hariç hepsi)
+    sidecar: kayıtla birlikte silinecek yan dosya uzantısı (ör. meta ".json")
+    keep_recent_sec: son bu kadar saniyede dokunulan kayıtlar silinmez (hâlâ kullanımda
+        olabilir); sınır bu yüzden geçici olarak aşılabilir
+    """
+
+    def __init__(self, root: str, max_bytes: int, label: str, suffix: str = None, sidecar: str = None,
+                 keep_recent_sec: float = 0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.label = label
+        self.suffix = suffix
+        self.sidecar = sidecar
+        self.keep_recent_sec = keep_recent_sec
+
+    def path(self, key: str, ext: str = "") -> str:
+        return os.path.join(self.root, key[:2], f"{key}{ext}")
+
+    def _update(self, amounts: dict = None, absolute: dict = None) -> dict:
+        """stats.json'u kilit altında güncelle, yeni değerleri döndür"""
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            with open(os.path.join(self.root, STATS_FILE), 'a+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    stats = json.loads(f.read() or "{}")
+                except ValueError:
+                    stats = {}
+                for name, amount in (amounts or {}).items():
+                    stats[name] = stats.get(name, 0) + amount
+                stats.update(absolute or {})
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(stats))
+                return stats
+        except Exception as e:
+            print(f"⚠️ {self.label} sayacı yazılamadı: {e}")
+            return {}
+
+    def bump(self, counter: str, amount: int = 1):
+        self._update({counter: amount})
+
+    def counters(self) -> dict:
+        """Diskteki sayaçlar (dizin gezilmez)"""
+        try:
+            with open(os.path.join(self.root, STATS_FILE)) as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def touch(self, path: str):
+        """LRU: son kullanım"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def size_of(self, path: str) -> int:
+        """Yazmadan önce çağrılır: üzerine yazılacak kaydın boyutu (yoksa None)"""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+    def added(self, path: str, replaced_size: int = None, evict: bool = True):
+        """
+        Kayıt yazıldıktan sonra: stores/bytes/entries sayaçlarını güncelle,
+        toplam sınırı aştıysa eviction yap (evict=False: toplu yazımda çağıran
+        sonunda evict_if_needed() çağırır).
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        stats = self._update({
+            "stores": 1,
+            "bytes": size - (replaced_size or 0),
+            "entries": 0 if replaced_size is not None else 1
+        })
+        if "synced" not in stats:
+            # Sayaçlardan önce oluşmuş cache dizini - toplamları bir kez diskten say
+            self._resync(self.entries())
+        if evict:
+            self.evict_if_needed()
+
+    def evict_if_needed(self) -> int:
+        """Sayaçtaki toplam sınırı aşıyorsa eviction (aşmıyorsa dizin gezilmez)"""
+        if self.counters().get("bytes", 0) > self.max_bytes:
+            return self.evict()
+        return 0
+
+    def entries(self) -> list:
+        """[(path, size, mtime)] - dizindeki tüm kayıtlar (tam gezinti)"""
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                if self.suffix:
+                    if not name.endswith(self.suffix):
+                        continue
+                elif name.endswith((".json", ".tmp")):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _resync(self, entries: list):
+        self._update(absolute={"bytes": sum(size for _, size, _ in entries), "entries": len(entries), "synced": True})
+
+    def evict(self, max_bytes: int = None) -> int:
+        """En eski kullanılanları sil, toplam boyut sınırın altına insin (toplamlar diskten düzeltilir)"""
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        kept, removed = len(entries), 0
+        cutoff = time.time() - self.keep_recent_sec
+        for path, size, mtime in entries:
+            if total <= max_bytes or mtime > cutoff:
+                break
+            try:
+                os.remove(path)
+                if self.sidecar:
+                    sidecar_path = f"{os.path.splitext(path)[0]}{self.sidecar}"
+                    if os.path.exists(sidecar_path):
+                        os.remove(sidecar_path)
+                total -= size
+                kept -= 1
+                removed += 1
+            except OSError:
+                pass
+        self._update({"evictions": removed}, absolute={"bytes": total, "entries": kept, "synced": True})
+        if removed:
+            print(f"🧹 {self.label}: {removed} eski kayıt silindi")
+        return removed
+
+    def stats(self, counter_names: list) -> dict:
+        """Sayaçlar + hit oranı + disk kullanımı (stats.json'dan, dizin gezilmez)"""
+        counters = self.counters()
+        stats = {name: counters.get(name, 0) for name in counter_names}
+        lookups = stats.get("hits", 0) + stats.get("remote_hits", 0) + stats.get("misses", 0)
+        hits = stats.get("hits", 0) + stats.get("remote_hits", 0)
+        return {
+            **stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0,
+            "entries": counters.get("entries", 0),
+            "size_mb": round(counters.get("bytes", 0) / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024))
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python disk_cache.py <dizin>")
+        sys.exit(1)
+    print(json.dumps(DiskLRU(sys.argv[1], 0, sys.argv[1]).counters(), indent=2))
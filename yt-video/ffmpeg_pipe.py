@@ -0,0 +1,129 @@
+"""
+FFmpeg yazıcılar
+- rawvideo pipe: MoviePy write_videofile yerine kareleri doğrudan FFmpeg stdin'ine yazar
+- filtergraph: Hareketi tamamen FFmpeg filtreleriyle üretir, Python'da kare yok
+"""
+
+import subprocess
+
+# imageio-ffmpeg kullanarak FFmpeg yolunu bul (MoviePy ile aynı binary)
+try:
+    import imageio_ffmpeg
+    FFMPEG_BINARY = imageio_ffmpeg.get_ffmpeg_exe()
+except ImportError:
+    FFMPEG_BINARY = 'ffmpeg'
+
+
+def write_frames_ffmpeg(
+    frames,
+    output_path: str,
+    size: tuple,
+    fps: int = 30,
+    codec: str = 'libx264',
+    preset: str = 'medium',
+    threads: int = 4
+) -> str:
+    """
+    Kare generator'ını FFmpeg rawvideo pipe ile videoya yaz.
+    Encode ayarları MoviePy write_videofile(codec='libx264', preset='medium')
+    ile aynıdır, böylece diskteki çıktı değişmez.
+
+    Args:
+        frames: (height, width, 3) uint8 C-contiguous kareler üreten iterable.
+                Aynı buffer her karede yeniden kullanılabilir.
+        output_path: Çıktı video dosyasının yolu
+        size: (width, height)
+        fps: Saniyedeki kare sayısı
+        codec: Video codec
+        preset: Encode preset
+        threads: FFmpeg thread sayısı
+
+    Returns:
+        output_path
+    """
+    width, height = size
+    cmd = [
+        FFMPEG_BINARY, '-y',
+        '-loglevel', 'error',
+        '-f', 'rawvideo',
+        '-vcodec', 'rawvideo',
+        '-s', f'{width}x{height}',
+        '-pix_fmt', 'rgb24',
+        '-r', str(fps),
+        '-an',
+        '-i', 'pipe:',
+        '-vcodec', codec,
+        '-preset', preset,
+        '-threads', str(threads),
+        '-pix_fmt', 'yuv420p',
+        output_path
+    ]
+
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    try:
+        for frame in frames:
+            process.stdin.write(frame.data)
+    except BrokenPipeError:
+        pass
+    finally:
+        process.stdin.close()
+        stderr = process.stderr.read()
+        process.wait()
+
+    if process.returncode != 0:
+        error_msg = stderr.decode(errors='replace')
+        print(f"⚠️ FFmpeg stderr: {error_msg[-500:]}")
+        raise Exception(f"FFmpeg hatası: {error_msg[-200:]}")
+
+    return output_path
+
+
+def render_image_filtergraph(
+    image_path: str,
+    filtergraph: str,
+    output_path: str,
+    duration: float,
+    fps: int = 30,
+    codec: str = 'libx264',
+    preset: str = 'medium',
+    threads: int = 4
+) -> str:
+    """
+    Tek resmi verilen filtergraph ile videoya dönüştür.
+    Filtergraph resmi kendisi tekrarlamalıdır (loop filtresi), süre -t ile kesilir.
+    Encode ayarları write_frames_ffmpeg ile aynıdır.
+
+    Args:
+        image_path: Kaynak resim
+        filtergraph: -vf filtre zinciri (t tabanlı ifadeler kullanılabilir)
+        output_path: Çıktı video dosyasının yolu
+        duration: Video süresi (saniye)
+        fps: Saniyedeki kare sayısı
+
+    Returns:
+        output_path
+    """
+    cmd = [
+        FFMPEG_BINARY, '-y',
+        '-loglevel', 'error',
+        '-framerate', str(fps),
+        '-i', image_path,
+        '-vf', filtergraph,
+        '-t', str(duration),
+        '-r', str(fps),
+        '-an',
+        '-vcodec', codec,
+        '-preset', preset,
+        '-threads', str(threads),
+        '-pix_fmt', 'yuv420p',
+        output_path
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        print(f"⚠️ FFmpeg stderr: {result.stderr[-500:]}")
+        raise Exception(f"FFmpeg hatası: {result.stderr[-200:]}")
+
+    return output_path
@@ -10,6 +10,15 @@ import numpy as np
 from PIL import Image
 from moviepy import VideoClip
 
+from ken_burns_engine import KenBurnsFrameEngine
+from ffmpeg_pipe import write_frames_ffmpeg, render_image_filtergraph
+
+# Desteklenen video yazıcıları
+VIDEO_WRITERS = ["moviepy", "ffmpeg_pipe", "filtergraph"]
+
+# Render çıktısını değiştiren her değişiklikte artırılmalı (render cache anahtarına girer)
+RENDERER_VERSION = "kb-4"
+
 
 def create_ken_burns_video(
     image_path: str,
@@ -17,7 +26,9 @@ def create_ken_burns_video(
     duration: int = 10,
     fps: int = 30,
     visibility_ratio: float = 0.75,
-    pan_direction: str = "left_to_right"
+    pan_direction: str = "left_to_right",
+    engine: str = "vectorized",
+    writer: str = "moviepy"
 ):
     """
     Resme pan efekti uygulayarak video oluşturur.
@@ -30,6 +41,9 @@ def create_ken_burns_video(
         fps: Saniyedeki kare sayısı
         visibility_ratio: Resmin ne kadarının görüneceği (0.75 = %75)
         pan_direction: Pan yönü ("left_to_right", "right_to_left", "top_to_bottom", "bottom_to_top")
+        engine: Kare motoru ("vectorized" = NumPy alt-piksel kaydırma, "pil" = her karede crop + LANCZOS)
+        writer: Video yazıcı ("moviepy" = write_videofile, "ffmpeg_pipe" = kareleri doğrudan FFmpeg stdin'ine yaz,
+                "filtergraph" = hareketi FFmpeg scale+crop ifadeleriyle üret, engine kullanılmaz)
     """
     
     # Resmi yükle
@@ -54,20 +68,41 @@ def create_ken_burns_video(
         return max(0, min(1, t))
     
     # Sabit crop boyutları (visibility_ratio'ya göre)
-    # Yatay pan için genişlik küçültülür, dikey pan için yükseklik
-    if pan_direction in ["left_to_right", "right_to_left"]:
-        crop_width = original_width * visibility_ratio
-        crop_height = original_height  # Tam yükseklik
-        max_x_offset = original_width - crop_width
-        max_y_offset = 0
-    else:  # top_to_bottom, bottom_to_top
-        crop_width = original_width  # Tam genişlik
-        crop_height = original_height * visibility_ratio
-        max_x_offset = 0
-        max_y_offset = original_height - crop_height
+    crop_width, crop_height, max_x_offset, max_y_offset = get_crop_geometry(
+        original_width, original_height, visibility_ratio, pan_direction
+    )
     
-    def make_frame(t):
-        """Her kare için pan pozisyonu hesapla"""
+    if writer == "filtergraph":
+        print(f"🎬 Video oluşturuluyor (FFmpeg filtergraph)...")
+        print(f"   Süre: {duration} saniye")
+        print(f"   FPS: {fps}")
+        print(f"   Görünürlük: %{int(visibility_ratio * 100)}")
+        print(f"   Pan: {pan_direction}")
+        
+        filtergraph = build_pan_filtergraph(
+            original_width, original_height,
+            crop_width, crop_height,
+            output_width, output_height,
+            duration, pan_direction, fps=fps
+        )
+        
+        print(f"💾 Video kaydediliyor: {output_path}")
+        render_image_filtergraph(image_path, filtergraph, output_path, duration=duration, fps=fps)
+        
+        print(f"✅ Video başarıyla oluşturuldu: {output_path}")
+        return output_path
+    
+    # Vektörize motor: resim bir kere ölçeklenir, kareler kaydırılmış pencerelerdir
+    frame_engine = None
+    if engine == "vectorized":
+        frame_engine = KenBurnsFrameEngine(
+            img,
+            crop_size=(crop_width, crop_height),
+            output_size=(output_width, output_height)
+        )
+    
+    def make_frame(t, out=None):
+        """Her kare için pan pozisyonu hesapla (out verilirse kare oraya yazılır)"""
         # Zaman ilerlemesi (0 -> 1)
         raw_progress = t / duration
         
@@ -91,6 +126,10 @@ def create_ken_burns_video(
             x_offset = max_x_offset / 2
             y_offset = max_y_offset / 2
         
+        if frame_engine is not None:
+            offset = x_offset if frame_engine.axis == 1 else y_offset
+            return frame_engine.frame(offset, out=out)
+        
         # Float koordinatlarla high-quality crop ve resize
         left = x_offset
         top = y_offset
@@ -101,6 +140,9 @@ def create_ken_burns_video(
         cropped = img.crop((left, top, right, bottom))
         resized = cropped.resize((output_width, output_height), Image.Resampling.LANCZOS)
         
+        if out is not None:
+            np.copyto(out, np.asarray(resized))
+            return out
         return np.array(resized)
     
     # Video klip oluştur
@@ -109,6 +151,28 @@ def create_ken_burns_video(
     print(f"   FPS: {fps}")
     print(f"   Görünürlük: %{int(visibility_ratio * 100)}")
     print(f"   Pan: {pan_direction}")
+    print(f"   Motor: {engine}")
+    print(f"   Yazıcı: {writer}")
+    
+    if writer == "ffmpeg_pipe":
+        # Tek buffer tüm kareler için yeniden kullanılır
+        frame_buffer = np.empty((output_height, output_width, 3), dtype=np.uint8)
+        frame_count = int(duration * fps)
+        frames = (make_frame(i / fps, out=frame_buffer) for i in range(frame_count))
+        
+        print(f"💾 Video kaydediliyor (FFmpeg pipe): {output_path}")
+        write_frames_ffmpeg(
+            frames,
+            output_path,
+            size=(output_width, output_height),
+            fps=fps,
+            codec='libx264',
+            preset='medium',
+            threads=4
+        )
+        
+        print(f"✅ Video başarıyla oluşturuldu: {output_path}")
+        return output_path
     
     clip = VideoClip(make_frame, duration=duration)
     clip = clip.with_fps(fps)
@@ -129,6 +193,99 @@ def create_ken_burns_video(
     return output_path
 
 
+def get_crop_geometry(
+    original_width: int,
+    original_height: int,
+    visibility_ratio: float,
+    pan_direction: str
+) -> tuple:
+    """
+    Sabit crop boyutları ve maksimum offsetler.
+    Yatay pan için genişlik küçültülür, dikey pan için yükseklik.
+    
+    Returns:
+        (crop_width, crop_height, max_x_offset, max_y_offset)
+    """
+    if pan_direction in ["left_to_right", "right_to_left"]:
+        crop_width = original_width * visibility_ratio
+        crop_height = original_height  # Tam yükseklik
+        max_x_offset = original_width - crop_width
+        max_y_offset = 0
+    else:  # top_to_bottom, bottom_to_top
+        crop_width = original_width  # Tam genişlik
+        crop_height = original_height * visibility_ratio
+        max_x_offset = 0
+        max_y_offset = original_height - crop_height
+    return crop_width, crop_height, max_x_offset, max_y_offset
+
+
+def build_ken_burns_filtergraph(
+    image_path: str,
+    duration: float,
+    visibility_ratio: float = 0.75,
+    pan_direction: str = "left_to_right",
+    output_size: tuple = (1920, 1080),
+    fps: int = 30
+) -> str:
+    """Resim dosyası için Ken Burns filtre zinciri (sadece boyut okunur, resim decode edilmez)"""
+    with Image.open(image_path) as img:
+        original_width, original_height = img.size
+    
+    crop_width, crop_height, _, _ = get_crop_geometry(
+        original_width, original_height, visibility_ratio, pan_direction
+    )
+    return build_pan_filtergraph(
+        original_width, original_height,
+        crop_width, crop_height,
+        output_size[0], output_size[1],
+        duration, pan_direction, fps=fps
+    )
+
+
+def build_pan_filtergraph(
+    original_width: int,
+    original_height: int,
+    crop_width: float,
+    crop_height: float,
+    output_width: int,
+    output_height: int,
+    duration: float,
+    pan_direction: str,
+    fps: int = 30
+) -> str:
+    """
+    make_frame ile aynı lineer pan eğrisini üreten FFmpeg filtre zinciri.
+    Resim bir kere çıktı ölçeğine büyütülür (lanczos) ve loop filtresiyle
+    tekrarlanır (her karede yeniden ölçeklenmez), ardından crop penceresi
+    t tabanlı ifadeyle kaydırılır. Girdi tek kare olmalıdır (-loop 1 yok).
+    """
+    scaled_width = max(output_width, int(round(original_width * output_width / crop_width)))
+    scaled_height = max(output_height, int(round(original_height * output_height / crop_height)))
+    max_x = scaled_width - output_width
+    max_y = scaled_height - output_height
+    
+    # smooth_ease ile aynı: progress = min(1, t / duration)
+    progress = f"min(1\\,t/{duration})"
+    
+    if pan_direction == "left_to_right":
+        x_expr, y_expr = f"{max_x}*{progress}", "0"
+    elif pan_direction == "right_to_left":
+        x_expr, y_expr = f"{max_x}*(1-{progress})", "0"
+    elif pan_direction == "top_to_bottom":
+        x_expr, y_expr = "0", f"{max_y}*{progress}"
+    elif pan_direction == "bottom_to_top":
+        x_expr, y_expr = "0", f"{max_y}*(1-{progress})"
+    else:
+        x_expr, y_expr = str(max_x // 2), str(max_y // 2)
+    
+    return (
+        f"scale={scaled_width}:{scaled_height}:flags=lanczos,"
+        f"loop=loop=-1:size=1:start=0,setpts=N/{fps}/TB,"
+        f"crop={output_width}:{output_height}:x={x_expr}:y={y_expr}:exact=1,"
+        f"setsar=1"
+    )
+
+
 def get_next_filename(base_name: str, output_dir: str) -> str:
     """Sıradaki dosya adını bul (video_1.mp4, video_2.mp4, ...)"""
     counter = 1
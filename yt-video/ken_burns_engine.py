@@ -0,0 +1,148 @@
+"""
+Vektörize Ken Burns kare motoru
+
+Her karede PIL crop + LANCZOS resize yapmak yerine kaynak resim bir kere
+çıktı ölçeğine indirgenir (çalışma piramidi), sonra her kare bu büyük
+görüntünün pan ekseninde alt-piksel kaydırılmış bir penceresi olarak üretilir.
+Alt-piksel kaydırma önceden hesaplanmış ayrılabilir Lanczos ağırlıklarıyla
+NumPy'da yapılır; her faz bir kere hesaplanıp önbelleğe alınır.
+"""
+
+import numpy as np
+from PIL import Image
+
+# Lanczos çekirdek yarıçapı (3 → 6 tap, PIL LANCZOS ile aynı)
+LANCZOS_A = 3
+
+# Alt-piksel faz sayısı (16 → 1/16 piksel hassasiyet)
+DEFAULT_PHASES = 16
+
+
+def lanczos_weights(phases: int = DEFAULT_PHASES, a: int = LANCZOS_A) -> np.ndarray:
+    """
+    Her alt-piksel fazı için normalize edilmiş Lanczos ağırlık tablosu.
+
+    Returns:
+        (phases, 2a) boyutlu float32 dizi. Satır p, kaynak konumu i + p/phases
+        için i-a+1 .. i+a piksellerinin ağırlıklarıdır.
+    """
+    fractions = np.arange(phases, dtype=np.float64) / phases
+    taps = np.arange(-a + 1, a + 1, dtype=np.float64)
+    x = fractions[:, None] - taps[None, :]
+    weights = np.sinc(x) * np.sinc(x / a)
+    weights[np.abs(x) >= a] = 0.0
+    weights /= weights.sum(axis=1, keepdims=True)
+    return weights.astype(np.float32)
+
+
+def build_pyramid(img: Image.Image, target_size: tuple) -> Image.Image:
+    """
+    Resmi hedef boyuta indirge.
+    Kaynak hedefin 2 katından büyükse önce yarıya indirerek (box) iner,
+    son adımda LANCZOS ile tam hedef boyuta örnekler.
+    """
+    target_w, target_h = target_size
+    level = img
+    while level.width >= target_w * 2 and level.height >= target_h * 2:
+        level = level.reduce(2)
+    if level.size != (target_w, target_h):
+        level = level.resize((target_w, target_h), Image.Resampling.LANCZOS)
+    return level
+
+
+class KenBurnsFrameEngine:
+    """
+    Sabit boyutlu crop penceresini tek eksende kaydıran kare üretici.
+
+    Crop penceresi pan ekseninin dışında resmin tamamını kapsar
+    (create_ken_burns_video'daki gibi), bu yüzden tüm kareler aynı ölçekteki
+    tek bir görüntünün kaydırılmış pencereleridir.
+    """
+
+    def __init__(
+        self,
+        img: Image.Image,
+        crop_size: tuple,
+        output_size: tuple = (1920, 1080),
+        phases: int = DEFAULT_PHASES
+    ):
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        src_w, src_h = img.size
+        crop_w, crop_h = crop_size
+        out_w, out_h = output_size
+
+        # Pan ekseni: crop'un resimden küçük olduğu eksen (0 = dikey, 1 = yatay)
+        self.axis = 1 if crop_w < src_w else 0
+        self.output_size = output_size
+        self.phases = phases
+
+        # Tüm resmi çıktı ölçeğine bir kere örnekle
+        scaled_w = max(out_w, int(round(src_w * out_w / crop_w)))
+        scaled_h = max(out_h, int(round(src_h * out_h / crop_h)))
+        scaled = np.asarray(build_pyramid(img, (scaled_w, scaled_h)), dtype=np.float32)
+
+        # Kaynak piksel → ölçekli piksel çarpanı (pan ekseni)
+        if self.axis == 1:
+            self.scale = scaled_w / src_w
+            self.length = scaled_w
+            self.window = out_w
+        else:
+            self.scale = scaled_h / src_h
+            self.length = scaled_h
+            self.window = out_h
+
+        pad = [(0, 0), (0, 0), (0, 0)]
+        pad[self.axis] = (LANCZOS_A, LANCZOS_A)
+        self._padded = np.pad(scaled, pad, mode='edge')
+        self._weights = lanczos_weights(phases)
+        self._phase_cache = {}
+
+    def _phase_image(self, phase: int) -> np.ndarray:
+        """Verilen faz için tüm ölçekli görüntünün kaydırılmış uint8 kopyası"""
+        cached = self._phase_cache.get(phase)
+        if cached is not None:
+            return cached
+
+        weights = self._weights[phase]
+        acc = None
+        for k, w in enumerate(weights):
+            if w == 0.0:
+                continue
+            start = k + 1
+            index = [slice(None)] * 3
+            index[self.axis] = slice(start, start + self.length)
+            term = self._padded[tuple(index)] * w
+            acc = term if acc is None else np.add(acc, term, out=acc)
+
+        shifted = np.clip(acc + 0.5, 0, 255).astype(np.uint8)
+        self._phase_cache[phase] = shifted
+        return shifted
+
+    def frame(self, offset: float, out: np.ndarray = None) -> np.ndarray:
+        """
+        Pan ekseninde kaynak piksel cinsinden offset için kareyi üret.
+
+        Args:
+            offset: Kaynak piksel cinsinden pan offseti
+            out: Verilirse kare bu (height, width, 3) uint8 buffer'a yazılır
+
+        Returns:
+            (height, width, 3) uint8 kare
+        """
+        pos = max(0.0, offset * self.scale)
+        base = int(np.floor(pos))
+        phase = int(round((pos - base) * self.phases))
+        if phase == self.phases:
+            base += 1
+            phase = 0
+        base = min(base, self.length - self.window)
+
+        shifted = self._phase_image(phase)
+        index = [slice(None)] * 3
+        index[self.axis] = slice(base, base + self.window)
+        if out is not None:
+            np.copyto(out, shifted[tuple(index)])
+            return out
+        return np.ascontiguousarray(shifted[tuple(index)])
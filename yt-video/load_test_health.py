@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Yük testi: Eşzamanlı render sırasında /health yanıt süresi
+Kullanım: python load_test_health.py [api_url] [eşzamanlı_istek] [süre]
+
+Sunucu ile aynı makinede çalıştırılmalıdır (lokal dosya path'leri gönderilir).
+- Test resmi + ses üretir
+- N adet /render-scene isteğini aynı anda gönderir
+- Bu sırada /health'i sürekli yoklar ve gecikmeyi ölçer
+- Maksimum /health gecikmesi eşiği aşarsa çıkış kodu 1 döner
+"""
+
+import sys
+import os
+import time
+import subprocess
+import tempfile
+import shutil
+import threading
+import requests
+
+from ffmpeg_pipe import FFMPEG_BINARY
+from benchmark_ken_burns import synthetic_image
+
+MAX_HEALTH_LATENCY_MS = 1000
+
+
+def prepare_inputs(temp_dir: str, duration: int):
+    """Test resmi ve sine ses dosyası üret"""
+    image_path = os.path.join(temp_dir, "load_test.png")
+    audio_path = os.path.join(temp_dir, "load_test.mp3")
+    synthetic_image().save(image_path)
+    subprocess.run(
+        [FFMPEG_BINARY, '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', f'sine=d={duration}', audio_path],
+        check=True
+    )
+    return image_path, audio_path
+
+
+def main():
+    api_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duration = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    temp_dir = tempfile.mkdtemp(prefix="load_test_")
+    image_path, audio_path = prepare_inputs(temp_dir, duration)
+
+    print(f"🔥 Yük testi: {api_url}")
+    print(f"   Eşzamanlı render: {concurrency}")
+    print(f"   Sahne süresi: {duration}s")
+
+    render_times = []
+    health_latencies = []
+    done = threading.Event()
+
+    def render(i):
+        start = time.time()
+        response = requests.post(f"{api_url}/api/video/render-scene", json={
+            "image_url": image_path,
+            "audio_url": audio_path,
+            "scene_id": f"load_{i}",
+            "scene_number": i + 1,
+            "narration": "yük testi için kısa bir anlatım metni",
+            "project_id": "load_test",
+            "skip_cdn": True
+        }, timeout=600)
+        render_times.append((time.time() - start, response.json().get("success")))
+
+    def poll_health():
+        while not done.is_set():
+            start = time.time()
+            requests.get(f"{api_url}/api/video/health", timeout=30)
+            health_latencies.append((time.time() - start) * 1000)
+            time.sleep(0.1)
+
+    try:
+        poller = threading.Thread(target=poll_health)
+        poller.start()
+
+        workers = [threading.Thread(target=render, args=(i,)) for i in range(concurrency)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        done.set()
+        poller.join()
+
+        requests.post(f"{api_url}/api/video/cleanup-project", json={"project_id": "load_test"}, timeout=30)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    latencies = sorted(health_latencies)
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95)]
+
+    print(f"\n📊 SONUÇLAR")
+    print(f"   Render: {sum(1 for _, ok in render_times if ok)}/{concurrency} başarılı, "
+          f"en uzun {max(t for t, _ in render_times):.2f}s")
+    print(f"   /health örnek: {len(latencies)}")
+    print(f"   /health p50: {p50:.1f}ms  p95: {p95:.1f}ms  max: {latencies[-1]:.1f}ms")
+
+    if latencies[-1] > MAX_HEALTH_LATENCY_MS:
+        print(f"❌ /health gecikmesi eşiği aştı ({MAX_HEALTH_LATENCY_MS}ms)")
+        sys.exit(1)
+    print(f"✅ /health render sırasında yanıt vermeye devam etti")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Proje Artifact Deposu - /tmp/projects/<id>/manifest.json
+FLUX API ve Video API arasında paylaşılır (sadece standart kütüphane).
+Her artifact'in path, boyut/mtime ve CDN URL'i manifest'e yazılır (sha256
+gerektiğinde hesaplanıp saklanır);
+adımlar girdilerini HTTP yerine lokal diskten çözer, toplu upload ve
+temizlik dosya listesi yerine manifest'ten yapılır.
+
+Kullanım: python project_store.py <project_id>   (manifest'i yazdırır)
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+from contextlib import contextmanager
+
+PROJECTS_DIR = os.getenv("PROJECTS_DIR", "/tmp/projects")
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".manifest.lock"
+LOCAL_SCHEME = "local://"
+
+# Artifact tipleri
+ARTIFACT_KINDS = ["image", "audio", "video", "merged", "final", "file"]
+
+
+def project_dir(project_id) -> str:
+    """Proje dizinini oluştur/döndür"""
+    d = os.path.join(PROJECTS_DIR, str(project_id))
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def _manifest_path(project_id) -> str:
+    return os.path.join(PROJECTS_DIR, str(project_id), MANIFEST_NAME)
+
+
+@contextmanager
+def _locked(project_id):
+    """Manifest üzerinde process'ler arası kilit (FLUX API + Video API + worker'lar)"""
+    lock_path = os.path.join(project_dir(project_id), LOCK_NAME)
+    with open(lock_path, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read(project_id) -> dict:
+    try:
+        with open(_manifest_path(project_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"project_id": str(project_id), "artifacts": {}}
+
+
+def _write(project_id, manifest: dict):
+    """Atomik yazma"""
+    path = _manifest_path(project_id)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def artifact_id(kind: str, scene_number=None, path: str = None) -> str:
+    """Manifest anahtarı: "image:003", "merged:012", sahnesizler için "final:final_video.mp4" ..."""
+    if scene_number is not None:
+        return f"{kind}:{str(scene_number).zfill(3)}"
+    return f"{kind}:{os.path.basename(path)}" if path else kind
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def register(project_id, kind: str, path: str, scene_number=None, cdn_url: str = None, **extra) -> dict:
+    """
+    Artifact'i manifest'e ekle/güncelle (dosya kapandıktan sonra çağrılmalı).
+    Aynı kind + sahne (sahnesizlerde kind + dosya adı) için önceki kayıt üzerine yazılır.
+    sha256 burada hesaplanmaz (büyük videoda adımı bekletir) - artifact_sha256() ile.
+
+    Returns:
+        Artifact kaydı
+    """
+    abs_path = os.path.abspath(path)
+    st = os.stat(abs_path)
+    entry = {
+        "kind": kind,
+        "scene_number": scene_number,
+        "path": abs_path,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": None,
+        "cdn_url": cdn_url,
+        "created_at": time.time(),
+        **extra
+    }
+    with _locked(project_id):
+        manifest = _read(project_id)
+        manifest["artifacts"][artifact_id(kind, scene_number, abs_path)] = entry
+        _write(project_id, manifest)
+    return entry
+
+
+def _is_current(entry: dict) -> bool:
+    """Kayıttaki dosya hâlâ diskte ve değişmemiş mi?"""
+    try:
+        st = os.stat(entry["path"])
+    except OSError:
+        return False
+    return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+
+
+def _update_entry(project_id, path: str, size: int = None, mtime_ns: int = None, **fields) -> bool:
+    """Path'e göre kaydın alanlarını güncelle (size/mtime_ns verilirse dosya manifest'tekiyle aynı olmalı)"""
+    abs_path = os.path.abspath(path)
+    with _locked(project_id):
+        manifest = _read(project_id)
+        for entry in manifest["artifacts"].values():
+            if entry["path"] != abs_path:
+                continue
+            if size is not None and (entry["size"], entry["mtime_ns"]) != (size, mtime_ns):
+                return False
+            entry.update(fields)
+            _write(project_id, manifest)
+            return True
+    return False
+
+
+def artifact_sha256(project_id, entry: dict) -> str:
+    """Kaydın sha256'sı - ilk istendiğinde hesaplanır, dosya değişmediyse manifest'e yazılır"""
+    if entry.get("sha256"):
+        return entry["sha256"]
+    digest = file_sha256(entry["path"])
+    if not _is_current(entry):
+        # Kayıttan sonra (veya hesaplarken) değişmiş - bu kayda ait değil, saklanmaz
+        return digest
+    _update_entry(project_id, entry["path"], entry["size"], entry["mtime_ns"], sha256=digest)
+    entry["sha256"] = digest
+    return digest
+
+
+def set_cdn_url(project_id, path: str, cdn_url: str, size: int = None, mtime_ns: int = None) -> bool:
+    """
+    Yüklenen dosyanın CDN URL'ini kaydet (süren yükleme işareti temizlenir). size/mtime_ns
+    verilirse sadece yükleme anındaki dosya hâlâ manifest'tekiyle aynıysa yazılır.
+    """
+    return _update_entry(project_id, path, size, mtime_ns, cdn_url=cdn_url, upload=None)
+
+
+def set_upload(project_id, path: str, upload: dict, size: int = None, mtime_ns: int = None) -> bool:
+    """
+    Süren yüklemeyi işaretle ({"pid", "key", "started_at"}; None = temizle).
+    Diğer process'ler aynı dosyayı tekrar yüklemek yerine bitmesini bekleyebilir.
+    """
+    return _update_entry(project_id, path, size, mtime_ns, upload=upload)
+
+
+def get(project_id, kind: str, scene_number) -> dict:
+    """Sahne artifact kaydı (yoksa veya dosya değiştiyse None)"""
+    entry = _read(project_id)["artifacts"].get(artifact_id(kind, scene_number))
+    return entry if entry and _is_current(entry) else None
+
+
+def find_by_path(project_id, path: str) -> dict:
+    """Path'e göre güncel artifact kaydı (yoksa None)"""
+    abs_path = os.path.abspath(path)
+    for entry in _read(project_id)["artifacts"].values():
+        if entry["path"] == abs_path:
+            return entry if _is_current(entry) else None
+    return None
+
+
+def list_artifacts(project_id, kinds: list = None, with_sha256: bool = False) -> list:
+    """Diskte mevcut artifact'ler (sahne sırasıyla; with_sha256: eksik sha256'lar hesaplanır)"""
+    entries = [e for e in _read(project_id)["artifacts"].values()
+               if (not kinds or e["kind"] in kinds) and _is_current(e)]
+    if with_sha256:
+        for entry in entries:
+            artifact_sha256(project_id, entry)
+    return sorted(entries, key=lambda e: (e["scene_number"] is None, e["scene_number"] or 0, e["kind"]))
+
+
+def resolve(ref: str, project_id=None) -> str:
+    """
+    Girdi referansını lokal dosyaya çöz - HTTP'ye gerek kalmasın.
+    - "/tmp/..." veya "./..." → olduğu gibi
+    - "local:///tmp/..."     → path
+    - CDN URL                → manifest'te aynı URL'in güncel lokal kopyası varsa onun path'i
+
+    Returns:
+        Lokal path veya None (indirilmesi gerekiyor)
+    """
+    if not ref:
+        return None
+    if ref.startswith(LOCAL_SCHEME):
+        return ref[len(LOCAL_SCHEME):]
+    if ref.startswith("/") or ref.startswith("./"):
+        return ref
+    if project_id is None or not os.path.exists(_manifest_path(project_id)):
+        return None
+    for entry in _read(project_id)["artifacts"].values():
+        if entry.get("cdn_url") == ref and _is_current(entry):
+            return entry["path"]
+    return None
+
+
+def remove_project(project_id) -> bool:
+    """Proje dizinini manifest ile birlikte sil"""
+    d = os.path.join(PROJECTS_DIR, str(project_id))
+    if not os.path.exists(d):
+        return False
+    shutil.rmtree(d)
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python project_store.py <project_id>")
+        sys.exit(1)
+    print(json.dumps(_read(sys.argv[1]), indent=2))